@@ -103,11 +103,13 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hashcode: int = None) -> None:
+        """Initialize node given a key, value and optional cached hash code."""
         self.key = key
         self.value = value
         self.next = next
+        self.hashcode = hashcode
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -141,7 +143,7 @@ class LinkedListIterator:
 class LinkedList:
     """
     Class implementing a Singly Linked List
-    Supported methods are: insert, remove, contains, length, iterator
+    Supported methods are: insert, insert_node, remove, remove_node, contains, length, iterator
     """
 
     def __init__(self) -> None:
@@ -168,9 +170,15 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hashcode: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hashcode)
+        self._size += 1
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node at front of the list without copying it."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
     def remove(self, key: str) -> bool:
@@ -178,6 +186,13 @@ class LinkedList:
         Remove first node with matching key.
         Return True if removal was successful, False otherwise.
         """
+        return self.remove_node(key) is not None
+
+    def remove_node(self, key: str) -> SLNode:
+        """
+        Unlink first node with matching key and return it,
+        or None if no match.
+        """
         previous, node = None, self._head
         while node:
 
@@ -187,10 +202,10 @@ class LinkedList:
                 else:
                     self._head = node.next
                 self._size -= 1
-                return True
+                return node
 
             previous, node = node, node.next
-        return False
+        return None
 
     def contains(self, key: str) -> SLNode:
         """Return node with matching key, or None if no match"""
@@ -210,11 +225,14 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
+    def __init__(self, key: str, value: object, hashcode: int = None) -> None:
         """Initialize an entry for use in a hash map."""
         self.key = key
         self.value = value
 
+        # Full hash code of the key, cached so a resize never re-hashes it
+        self.hashcode = hashcode
+
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
 
@@ -0,0 +1,91 @@
+# Course: CS261 - Data Structures
+# Description:Compares the per-key cost of single-operation loops with the batched
+# put_many / get_many / remove_many APIs on every engine.
+# The batched calls size the table once and hash all keys in one pass, which
+# uses the vectorized FNV-1a when NumPy is installed.
+#
+# Usage: python bench_bulk.py [number_of_keys] [hash_function_name]
+
+import sys
+import time
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_swiss
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+    ('hash_map_compact', hash_map_compact.HashMap),
+    ('hash_map_rh', hash_map_rh.HashMap),
+    ('hash_map_swiss', hash_map_swiss.HashMap),
+)
+
+
+def timed(function) -> float:
+    """
+    Runs a function once and returns the elapsed time in seconds.
+
+    :param function: Callable taking no arguments.
+    :return: Elapsed seconds.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def single(engine, function: str, keys: list) -> tuple:
+    """
+    Times put, get and remove issued one key at a time.
+
+    :param engine: The HashMap class.
+    :param function: Name of the hash function.
+    :param keys: Keys to insert, look up and remove.
+    :return: Tuple of (put, get, remove) seconds.
+    """
+    m = engine(11, function)
+
+    def puts():
+        for key in keys:
+            m.put(key, key)
+
+    def gets():
+        for key in keys:
+            m.get(key)
+
+    def removes():
+        for key in keys:
+            m.remove(key)
+
+    return timed(puts), timed(gets), timed(removes)
+
+
+def batched(engine, function: str, keys: list) -> tuple:
+    """
+    Times put_many, get_many and remove_many over the whole key list.
+
+    :param engine: The HashMap class.
+    :param function: Name of the hash function.
+    :param keys: Keys to insert, look up and remove.
+    :return: Tuple of (put, get, remove) seconds.
+    """
+    m = engine(11, function)
+    return (timed(lambda: m.put_many(keys, keys)),
+            timed(lambda: m.get_many(keys)),
+            timed(lambda: m.remove_many(keys)))
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    function = sys.argv[2] if len(sys.argv) > 2 else 'fnv1a'
+    keys = ['key' + str(i) for i in range(n)]
+
+    print(f"{n} keys, hash function {function}, nanoseconds per key")
+    print(f"{'engine':<18}{'mode':<8}{'put':>8}{'get':>8}{'remove':>8}")
+    for name, engine in ENGINES:
+        for mode, run in (('single', single), ('batched', batched)):
+            put, get, remove = run(engine, function, keys)
+            print(f"{name:<18}{mode:<8}{put / n * 1e9:>8.0f}{get / n * 1e9:>8.0f}{remove / n * 1e9:>8.0f}")
@@ -0,0 +1,53 @@
+# Course: CS261 - Data Structures
+# Description:Cold-start cost of building a map from a snapshot of N items.
+# "put loop" grows the map from its default capacity one put() at a time, paying
+# for every intermediate resize; "from_items" picks the final capacity up front
+# and places all items in a single pass.
+#
+# Usage: python bench_bulk_load.py [number_of_items ...]
+
+import sys
+import time
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_swiss
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+    ('hash_map_compact', hash_map_compact.HashMap),
+    ('hash_map_rh', hash_map_rh.HashMap),
+    ('hash_map_swiss', hash_map_swiss.HashMap),
+)
+
+
+def put_loop(engine, items: list):
+    """Builds a map from the default capacity with one put() per item."""
+    m = engine(11, 'fnv1a')
+    for key, value in items:
+        m.put(key, value)
+    return m
+
+
+def bulk_load(engine, items: list):
+    """Builds a map with from_items()."""
+    return engine.from_items(items, 'fnv1a')
+
+
+if __name__ == "__main__":
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 400_000]
+    print(f"{'engine':<18}{'items':>9}{'put loop s':>12}{'from_items s':>14}{'speedup':>9}")
+    for n in sizes:
+        items = [('key' + str(i), i) for i in range(n)]
+        for name, engine in ENGINES:
+            start = time.perf_counter()
+            put_loop(engine, items)
+            loop = time.perf_counter() - start
+            start = time.perf_counter()
+            bulk_load(engine, items)
+            bulk = time.perf_counter() - start
+            print(f"{name:<18}{n:>9}{loop:>12.2f}{bulk:>14.2f}{loop / bulk:>8.1f}x")
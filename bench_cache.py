@@ -0,0 +1,48 @@
+# Course: CS261 - Data Structures
+# Description:Hit rate and throughput of the cache policies (cache.py) on a Zipfian
+# trace: every operation is a get() of a key drawn with probability proportional to
+# 1 / rank ** s, followed by a put() on a miss, as a read-through cache would do.
+# Each policy is run with room for 1% and 10% of the keys. The trace is generated
+# before timing, so "ops/s" covers only the cache.
+#
+# Usage: python bench_cache.py [number_of_keys] [operations] [zipf_exponent]
+
+import itertools
+import random
+import sys
+import time
+
+from cache import CACHE_POLICIES, Cache
+
+
+def zipf_trace(keys: int, operations: int, exponent: float, seed: int = 1) -> list:
+    """Draws keys with Zipfian popularity; rank 1 is the most popular key."""
+    weights = itertools.accumulate(1 / rank ** exponent for rank in range(1, keys + 1))
+    names = ['key' + str(i) for i in random.Random(seed).sample(range(keys), keys)]
+    return random.Random(seed).choices(names, cum_weights=list(weights), k=operations)
+
+
+def run(policy: str, capacity: int, trace: list) -> tuple:
+    """Replays a trace as a read-through cache; returns (hit rate, ops/s)."""
+    c = Cache(capacity, policy=policy, function='fnv1a')
+    start = time.perf_counter()
+    for key in trace:
+        if c.get(key) is None:
+            c.put(key, key)
+    elapsed = time.perf_counter() - start
+    return c.counters()['hit_rate'], len(trace) / elapsed
+
+
+if __name__ == "__main__":
+
+    keys = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    operations = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    exponent = float(sys.argv[3]) if len(sys.argv) > 3 else 0.99
+    trace = zipf_trace(keys, operations, exponent)
+    print(f"{keys} keys, {operations} operations, zipf s={exponent}")
+    print(f"{'policy':<8}{'capacity':>10}{'hit rate':>10}{'ops/s':>12}")
+    for fraction in (0.01, 0.1):
+        capacity = max(1, int(keys * fraction))
+        for policy in CACHE_POLICIES:
+            rate, throughput = run(policy, capacity, trace)
+            print(f"{policy:<8}{capacity:>10}{rate:>10.3f}{throughput:>12,.0f}")
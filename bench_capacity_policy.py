@@ -0,0 +1,80 @@
+# Course: CS261 - Data Structures
+# Description:Cost of each capacity policy (see capacity_policy) in the separate
+# chaining and open addressing engines: finding the next capacity on its own,
+# a full resize of a filled map, growing a map from the default capacity one put()
+# at a time, and looking keys up. "probes" is the average hash_map_oa probe length
+# of a hit, which shows whether the low bits kept by power-of-two tables are
+# well distributed.
+#
+# Usage: python bench_capacity_policy.py [number_of_keys] [hash_function_name]
+
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from capacity_policy import CAPACITY_POLICIES
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+)
+
+
+def per_call(function, repeat: int) -> float:
+    """
+    Runs a function repeatedly and returns the mean time of one call.
+
+    :param function: Callable taking no arguments.
+    :param repeat: Number of calls.
+    :return: Seconds per call.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def measure(engine, policy: str, function: str, keys: list, misses: list) -> str:
+    """
+    Formats the cost of one engine under one capacity policy.
+
+    :param engine: The HashMap class.
+    :param policy: The capacity policy.
+    :param function: Name of the hash function.
+    :param keys: Keys to insert and look up.
+    :param misses: Keys absent from the map.
+    :return: The formatted report columns.
+    """
+    m = engine(11, function, capacity_policy=policy)
+    start = time.perf_counter()
+    for key in keys:
+        m.put(key, key)
+    grow = time.perf_counter() - start
+
+    capacity = m.get_capacity()
+    next_us = per_call(lambda: m._round_capacity(capacity * 2, growth=True), 200) * 1e6
+    resize_ms = per_call(lambda: m.resize_table(capacity * 2), 1) * 1e3
+
+    hit_ns = per_call(lambda: [m.get(key) for key in keys], 1) / len(keys) * 1e9
+    miss_ns = per_call(lambda: [m.get(key) for key in misses], 1) / len(misses) * 1e9
+    probes = ''
+    if hasattr(m, 'probe_length'):
+        probes = f"{sum(m.probe_length(key) for key in keys) / len(keys):.2f}"
+    return (f"{capacity:>10}{next_us:>9.1f}{resize_ms:>11.0f}{grow:>8.2f}"
+            f"{hit_ns:>8.0f}{miss_ns:>9.0f}{probes:>8}")
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    function = sys.argv[2] if len(sys.argv) > 2 else 'fnv1a'
+    keys = ['key' + str(i) for i in range(n)]
+    misses = ['missing' + str(i) for i in range(n)]
+
+    print(f"{n} keys, hash function {function}")
+    print(f"{'engine':<14}{'policy':<13}{'capacity':>10}{'next us':>9}{'resize ms':>11}"
+          f"{'grow s':>8}{'hit ns':>8}{'miss ns':>9}{'probes':>8}")
+    for name, engine in ENGINES:
+        for policy in CAPACITY_POLICIES:
+            print(f"{name:<14}{policy:<13}{measure(engine, policy, function, keys, misses)}")
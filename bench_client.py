@@ -0,0 +1,114 @@
+# Course: CS261 - Data Structures
+# Description:Round trips saved by the client library (kv_client.py). Starts a local
+# kv_server.py and reads the same keys with each way the clients can issue calls:
+# one blocking call per round trip, a Pipeline, MGET, several threads with and
+# without a batch window, and AsyncClient awaiting calls one at a time or gathering
+# them. "trips" is the number of batches written to the server.
+#
+# Usage: python bench_client.py [number_of_reads] [batch_size]
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from kv_client import AsyncClient, Client
+
+THREADS = 8
+
+
+def start_server() -> tuple:
+    """Starts kv_server.py on a free port; returns (process, address)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    server = subprocess.Popen([sys.executable, os.path.join(here, 'kv_server.py'), '--port', '0'],
+                              stdout=subprocess.PIPE, text=True)
+    host, port = server.stdout.readline().split()[-1].rsplit(':', 1)
+    return server, (host, int(port))
+
+
+def single(client: Client, keys: list, batch: int) -> None:
+    for key in keys:
+        client.get(key)
+
+
+def pipelined(client: Client, keys: list, batch: int) -> None:
+    for i in range(0, len(keys), batch):
+        pipeline = client.pipeline()
+        for key in keys[i:i + batch]:
+            pipeline.get(key)
+        pipeline.execute()
+
+
+def bulk(client: Client, keys: list, batch: int) -> None:
+    for i in range(0, len(keys), batch):
+        client.mget(keys[i:i + batch])
+
+
+def threaded(client: Client, keys: list, batch: int) -> None:
+    threads = [threading.Thread(target=single, args=(client, keys[t::THREADS], batch))
+               for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+async def awaited(client: AsyncClient, keys: list, batch: int) -> None:
+    for key in keys:
+        await client.get(key)
+
+
+async def gathered(client: AsyncClient, keys: list, batch: int) -> None:
+    for i in range(0, len(keys), batch):
+        await asyncio.gather(*[client.get(key) for key in keys[i:i + batch]])
+
+
+def run_sync(address, run, keys: list, batch: int, window: float = None) -> tuple:
+    """Times one synchronous case; returns (seconds, round trips)."""
+    with Client(address, THREADS, batch_window=window) as client:
+        client.get(keys[0])
+        client.round_trips = 0
+        start = time.perf_counter()
+        run(client, keys, batch)
+        return time.perf_counter() - start, client.round_trips
+
+
+def run_async(address, run, keys: list, batch: int) -> tuple:
+    """Times one asyncio case; returns (seconds, round trips)."""
+    async def main():
+        async with AsyncClient(address) as client:
+            start = time.perf_counter()
+            await run(client, keys, batch)
+            return time.perf_counter() - start, client.round_trips
+    return asyncio.run(main())
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    server, address = start_server()
+    try:
+        keys = ['key' + str(i) for i in range(n)]
+        with Client(address) as client:
+            for i in range(0, n, 1000):
+                client.mput((key, b'x' * 32) for key in keys[i:i + 1000])
+        cases = (
+            ('one call per trip', lambda: run_sync(address, single, keys, batch)),
+            (f'pipeline of {batch}', lambda: run_sync(address, pipelined, keys, batch)),
+            (f'mget of {batch}', lambda: run_sync(address, bulk, keys, batch)),
+            (f'{THREADS} threads', lambda: run_sync(address, threaded, keys, batch)),
+            (f'{THREADS} threads, 0.2 ms window', lambda: run_sync(address, threaded, keys, batch, 0.0002)),
+            ('async, awaited', lambda: run_async(address, awaited, keys, batch)),
+            (f'async, gather {batch}', lambda: run_async(address, gathered, keys, batch)),
+        )
+        print(f"{n} GETs against a local server over tcp loopback")
+        print(f"{'client':<26}{'ops/s':>10}{'trips':>8}{'ops/trip':>10}")
+        for name, case in cases:
+            seconds, trips = case()
+            print(f"{name:<26}{n / seconds:>10,.0f}{trips:>8}{n / trips:>10.1f}")
+    finally:
+        server.terminate()
+        server.wait()
@@ -0,0 +1,94 @@
+# Course: CS261 - Data Structures
+# Description:Multi-threaded throughput of the striped-lock HashMap against a separate
+# chaining HashMap behind one global lock. Every thread runs the same mix of gets,
+# puts and increments over its own share of a common key space; the total number of
+# operations is fixed, so ideal scaling shows as ops/s growing with the thread count.
+# On builds with the GIL only one thread runs Python code at a time, so neither map
+# can scale there; the table then shows the cost of striping against one lock.
+#
+# Usage: python bench_concurrent.py [operations] [keys] [stripes]
+
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import hash_map_concurrent
+import hash_map_sc
+
+THREADS = (1, 2, 4, 8, 16, 32)
+
+
+class GlobalLockMap:
+    """hash_map_sc.HashMap with every call serialized by one lock."""
+
+    def __init__(self, capacity: int, function) -> None:
+        self._map = hash_map_sc.HashMap(capacity, function)
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        with self._lock:
+            return self._map.increment(key, delta)
+
+
+def worker(m, operations: int, keys: list, seed: int) -> None:
+    """Runs 80% gets, 10% puts and 10% increments over random keys."""
+    rnd = random.Random(seed)
+    for key in rnd.choices(keys, k=operations):
+        op = rnd.random()
+        if op < 0.8:
+            m.get(key)
+        elif op < 0.9:
+            m.put(key, 0)
+        else:
+            m.increment(key)
+
+
+def run(make, threads: int, operations: int, keys: list) -> float:
+    """
+    Times a fixed number of operations split across a number of threads.
+
+    :param make: Builds the empty map.
+    :param threads: Number of threads.
+    :param operations: Total number of operations.
+    :param keys: The key space.
+    :return: Operations per second.
+    """
+    m = make()
+    for key in keys:
+        m.put(key, 0)
+    share = operations // threads
+    with ThreadPoolExecutor(threads) as pool:
+        start = time.perf_counter()
+        futures = [pool.submit(worker, m, share, keys, seed) for seed in range(threads)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - start
+    return share * threads / elapsed
+
+
+if __name__ == "__main__":
+
+    operations = int(sys.argv[1]) if len(sys.argv) > 1 else 400_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 50_000
+    stripes = int(sys.argv[3]) if len(sys.argv) > 3 else hash_map_concurrent.DEFAULT_STRIPES
+    keys = ['key' + str(i) for i in range(distinct)]
+    gil = getattr(sys, '_is_gil_enabled', lambda: True)()
+
+    print(f"{operations} operations over {distinct} keys, {stripes} stripes, "
+          f"GIL {'enabled' if gil else 'disabled'}, operations per second")
+    print(f"{'threads':>7}{'global lock':>14}{'striped':>14}{'ratio':>8}")
+    for threads in THREADS:
+        single = run(lambda: GlobalLockMap(11, 'fnv1a'), threads, operations, keys)
+        striped = run(lambda: hash_map_concurrent.HashMap(11, 'fnv1a', stripes),
+                      threads, operations, keys)
+        print(f"{threads:>7}{single:>14.0f}{striped:>14.0f}{striped / single:>7.2f}x")
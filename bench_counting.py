@@ -0,0 +1,64 @@
+# Course: CS261 - Data Structures
+# Description:Counting throughput of the read-modify-write API. "lookup+put" counts
+# occurrences the way find_mode used to (contains_key, then get, then put, so every
+# element hashes and probes its key up to three times); "increment" hashes and probes
+# once per element. The last row times find_mode itself, which now uses increment
+# (on the default hash_function_1).
+#
+# Usage: python bench_counting.py [number_of_elements] [distinct_keys]
+
+import random
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from a6_include import DynamicArray
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+)
+
+
+def count_lookup_put(m, words: list) -> None:
+    """Counts words with separate contains_key, get and put calls."""
+    for word in words:
+        if not m.contains_key(word):
+            m.put(word, 1)
+        else:
+            m.put(word, m.get(word) + 1)
+
+
+def count_increment(m, words: list) -> None:
+    """Counts words with one increment call per word."""
+    for word in words:
+        m.increment(word)
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    rnd = random.Random(0)
+    vocabulary = ['word' + str(i) for i in range(distinct)]
+    # skewed frequencies, like words in text
+    words = rnd.choices(vocabulary, weights=[1 / (i + 1) for i in range(distinct)], k=n)
+
+    print(f"{n} elements, {distinct} distinct keys, fnv1a, elements per second")
+    print(f"{'engine':<14}{'lookup+put':>12}{'increment':>12}{'speedup':>9}")
+    for name, engine in ENGINES:
+        m = engine(11, 'fnv1a')
+        start = time.perf_counter()
+        count_lookup_put(m, words)
+        old = time.perf_counter() - start
+        m = engine(11, 'fnv1a')
+        start = time.perf_counter()
+        count_increment(m, words)
+        new = time.perf_counter() - start
+        print(f"{name:<14}{n / old:>12.0f}{n / new:>12.0f}{old / new:>8.2f}x")
+
+    da = DynamicArray(words)
+    start = time.perf_counter()
+    hash_map_sc.find_mode(da)
+    print(f"{'find_mode':<14}{'':>12}{n / (time.perf_counter() - start):>12.0f}")
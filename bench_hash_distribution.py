@@ -0,0 +1,94 @@
+# Course: CS261 - Data Structures
+# Description:Distribution and collision report for the registered hash functions.
+# Each key set is hashed into a prime table holding one key per bucket on average
+# (the SC map's resize threshold) and the report lists:
+#   max     longest chain
+#   empty   share of empty buckets (about 36.8% for a uniform hash)
+#   chi2    chi-square of the bucket counts per degree of freedom (about 1.0 for a uniform hash)
+#   dup64   distinct keys sharing the same full hash code
+#   keys/s  hashing throughput
+# The batched FNV-1a row is included when NumPy is installed.
+#
+# Usage: python bench_hash_distribution.py [number_of_keys] [key_file ...]
+# Each key file holds one key per line and is reported as its own key set.
+
+import itertools
+import random
+import sys
+import time
+import uuid
+
+from hash_functions import HASH_FUNCTIONS, fnv1a, hash_batch, np
+
+
+def key_sets(n: int, files: list) -> dict:
+    """
+    Builds the key sets to compare.
+
+    :param n: Number of keys per generated set.
+    :param files: Paths of files with one key per line.
+    :return: Dictionary mapping a set name to a list of distinct keys.
+    """
+    rnd = random.Random(261)
+    letters = 'abcdefghij'
+    anagrams = itertools.islice(itertools.permutations(letters), n)
+    sets = {
+        'sequential': ['key' + str(i) for i in range(n)],
+        'numeric': [str(i * 7919) for i in range(n)],
+        'paths': [f"user/{i // 10}/session/{i % 10}" for i in range(n)],
+        'anagrams': [''.join(p) for p in anagrams],
+        'uuid': [str(uuid.UUID(int=rnd.getrandbits(128))) for _ in range(n)],
+    }
+    for path in files:
+        with open(path, encoding='utf-8') as f:
+            sets[path] = list(dict.fromkeys(line.rstrip('\n') for line in f))
+    return sets
+
+
+def next_prime(n: int) -> int:
+    """Return the smallest prime greater than or equal to n."""
+    candidate = max(n, 2)
+    while any(candidate % factor == 0 for factor in range(2, int(candidate ** 0.5) + 1)):
+        candidate += 1
+    return candidate
+
+
+def report(name: str, keys: list, hashes: list, seconds: float) -> str:
+    """
+    Formats one row of the report.
+
+    :param name: Name of the hash function.
+    :param keys: The hashed keys.
+    :param hashes: Hash codes of the keys.
+    :param seconds: Time spent hashing.
+    :return: The formatted row.
+    """
+    n = len(keys)
+    buckets = next_prime(n)
+    counts = [0] * buckets
+    for h in hashes:
+        counts[h % buckets] += 1
+    expected = n / buckets
+    chi2 = sum((c - expected) ** 2 for c in counts) / expected / (buckets - 1)
+    empty = counts.count(0) / buckets
+    duplicates = n - len(set(hashes))
+    rate = n / seconds if seconds else float('inf')
+    return (f"  {name:<18}{max(counts):>6}{empty:>8.1%}{chi2:>10.2f}"
+            f"{duplicates:>8}{rate:>12,.0f}")
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    functions = dict(HASH_FUNCTIONS)
+    for set_name, keys in key_sets(n, sys.argv[2:]).items():
+        print(f"\n{set_name} ({len(keys)} keys)")
+        print(f"  {'function':<18}{'max':>6}{'empty':>8}{'chi2':>10}{'dup64':>8}{'keys/s':>12}")
+        for name, function in functions.items():
+            start = time.perf_counter()
+            hashes = [function(key) for key in keys]
+            print(report(name, keys, hashes, time.perf_counter() - start))
+        if np is not None:
+            start = time.perf_counter()
+            hashes = hash_batch(fnv1a, keys)
+            print(report('fnv1a (batch)', keys, hashes, time.perf_counter() - start))
@@ -0,0 +1,62 @@
+# Course: CS261 - Data Structures
+# Description:Exact against approximate (Space-Saving) streaming top-k on a skewed
+# stream with many distinct keys. "counters" is the memory each summary holds;
+# "recall" is the share of the true top 100 keys reported in its top 100, and
+# "max err" the largest over-estimate observed, next to the guaranteed n / capacity.
+#
+# Usage: python bench_heavy_hitters.py [number_of_elements] [tail_key_space]
+
+import random
+import sys
+import time
+
+from heavy_hitters import ExactTopK, SpaceSaving
+
+TOP = 100
+
+
+def stream(n: int, distinct: int, seed: int = 0):
+    """
+    Generates a stream without materializing it: half of the elements follow a
+    Zipf-like law over a few keys, the other half are drawn uniformly from a
+    large key space, so most of them occur once.
+
+    :param n: Number of elements.
+    :param distinct: Size of the uniform key space.
+    :param seed: Random seed.
+    :return: Generator of keys.
+    """
+    rnd = random.Random(seed)
+    for _ in range(n):
+        if rnd.random() < 0.5:
+            yield 'user' + str(int(rnd.paretovariate(1.0)))
+        else:
+            yield 'user' + str(rnd.randrange(distinct))
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000_000
+
+    start = time.perf_counter()
+    exact = ExactTopK('fnv1a')
+    exact.update(stream(n, distinct))
+    elapsed = time.perf_counter() - start
+    truth = {key: count for key, count, _ in exact.items()}
+    top = {key for key, _, _ in exact.top(TOP)}
+
+    print(f"{n} elements, {len(truth)} distinct keys, top {TOP}")
+    print(f"{'summary':<22}{'seconds':>9}{'counters':>10}{'recall':>8}{'max err':>9}{'bound':>9}")
+    print(f"{'exact':<22}{elapsed:>9.2f}{len(truth):>10}{1:>8.2f}{0:>9}{0:>9}")
+
+    for capacity in (200, 1000, 5000):
+        start = time.perf_counter()
+        summary = SpaceSaving(capacity, 'fnv1a')
+        summary.update(stream(n, distinct))
+        elapsed = time.perf_counter() - start
+        reported = summary.top(TOP)
+        recall = len(top & {key for key, _, _ in reported}) / TOP
+        max_error = max(count - truth[key] for key, count, _ in summary.items())
+        print(f"{'space-saving ' + str(capacity):<22}{elapsed:>9.2f}{capacity:>10}{recall:>8.2f}"
+              f"{max_error:>9}{summary.error_bound():>9.0f}")
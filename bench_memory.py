@@ -0,0 +1,47 @@
+# Course: CS261 - Data Structures
+# Description:Compares the memory cost per key of the HashEntry based open addressing
+# HashMap (hash_map_oa) with the array-backed layout (hash_map_compact).
+# Keys are created before tracing starts, so only the table itself is measured.
+# The built-in hash is used so that the layouts, not hash quality, are compared.
+#
+# Usage: python bench_memory.py [number_of_keys ...]
+
+import sys
+import tracemalloc
+
+import hash_map_compact
+import hash_map_oa
+
+ENGINES = (
+    ('hash_map_oa', hash_map_oa.HashMap),
+    ('hash_map_compact', hash_map_compact.HashMap),
+)
+
+
+def bytes_per_key(engine, keys: list) -> tuple[float, float]:
+    """
+    Builds a map holding every key and measures its memory footprint.
+
+    :param engine: The HashMap class to measure.
+    :param keys: The keys to insert; every key maps to the same value.
+    :return: Tuple of (retained bytes per key, peak bytes per key).
+    """
+    tracemalloc.start()
+    m = engine(11, hash)
+    for key in keys:
+        m.put(key, 1)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del m
+    return current / len(keys), peak / len(keys)
+
+
+if __name__ == "__main__":
+
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    print(f"{'engine':<18}{'keys':>10}{'bytes/key':>12}{'peak/key':>12}")
+    for n in sizes:
+        keys = ['key' + str(i) for i in range(n)]
+        for name, engine in ENGINES:
+            current, peak = bytes_per_key(engine, keys)
+            print(f"{name:<18}{n:>10}{current:>12.1f}{peak:>12.1f}")
@@ -0,0 +1,78 @@
+# Course: CS261 - Data Structures
+# Description:Startup time and working set of the memory-mapped table against
+# rebuilding an in-memory map. Both start from data already on disk: "mmap" opens a
+# hash_map_mmap table file; "rebuild" unpickles the same pairs and loads them into a
+# hash_map_oa map with from_items(). Each is measured in a fresh process, which then
+# looks up a sample of random keys. "RSS MiB" is the growth of the process's resident
+# memory (anonymous plus file-backed pages, Linux only) over both steps. For "mmap"
+# it grows with the number of lookups, not with the table: the kernel maps the
+# page cache around each faulting page (64 KiB by default), and those pages are
+# shared with other processes and can be reclaimed, unlike the rebuilt heap.
+#
+# Usage: python bench_mmap.py [number_of_keys] [lookups]
+
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import hash_map_mmap
+import hash_map_oa
+
+
+def resident_kib() -> int:
+    """Returns the resident memory of this process in KiB, from /proc."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def child(mode: str, directory: str, n: int, lookups: int) -> None:
+    """Opens or rebuilds the map, does the lookups and prints the measurements."""
+    keys = ['key' + str(i) for i in random.Random(1).sample(range(n), lookups)]
+    before = resident_kib()
+    start = time.perf_counter()
+    if mode == 'mmap':
+        m = hash_map_mmap.HashMap(os.path.join(directory, 'table.kv'), readonly=True)
+    else:
+        with open(os.path.join(directory, 'pairs.pickle'), 'rb') as file:
+            pairs = pickle.load(file)
+        m = hash_map_oa.HashMap.from_items(pairs, 'fnv1a', len(pairs))
+        del pairs
+    opened = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    done = time.perf_counter()
+    print(opened - start, (done - opened) / lookups, (resident_kib() - before) / 1024)
+
+
+if __name__ == "__main__":
+
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], int(sys.argv[4]), int(sys.argv[5]))
+        sys.exit()
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000
+    with tempfile.TemporaryDirectory(dir='.') as directory:
+        pairs = [('key' + str(i), 'value' + str(i)) for i in range(n)]
+        start = time.perf_counter()
+        with hash_map_mmap.HashMap(os.path.join(directory, 'table.kv'), 2 * n + 1, 'fnv1a') as m:
+            for key, value in pairs:
+                m.put(key, value)
+        built = time.perf_counter() - start
+        with open(os.path.join(directory, 'pairs.pickle'), 'wb') as file:
+            pickle.dump(pairs, file, pickle.HIGHEST_PROTOCOL)
+        size = os.path.getsize(os.path.join(directory, 'table.kv')) / 2 ** 20
+        print(f"{n} keys, table file {size:.1f} MiB built in {built:.1f} s, {lookups} random lookups")
+        print(f"{'startup':<10}{'open s':>10}{'lookup us':>11}{'RSS MiB':>10}")
+        for mode in ('mmap', 'rebuild'):
+            out = subprocess.run([sys.executable, __file__, '--child', mode, directory, str(n), str(lookups)],
+                                 capture_output=True, text=True, check=True).stdout.split()
+            opened, lookup, rss = map(float, out)
+            print(f"{mode:<10}{opened:>10.4f}{lookup * 1e6:>11.1f}{rss:>10.1f}")
@@ -0,0 +1,60 @@
+# Course: CS261 - Data Structures
+# Description:Probe lengths and lookup cost of quadratic probing (hash_map_oa, which
+# must stay below a load of 0.5) against Robin Hood probing (hash_map_rh) filled
+# to loads between 0.5 and 0.9. "slots/key" is the table size paid per stored key.
+#
+# Usage: python bench_probe_lengths.py [number_of_keys]
+
+import sys
+import time
+
+import hash_map_oa
+import hash_map_rh
+
+
+def summarize(m, hits: list, misses: list) -> str:
+    """
+    Formats probe lengths and lookup times of one filled map.
+
+    :param m: The map to measure.
+    :param hits: Keys present in the map.
+    :param misses: Keys absent from the map.
+    :return: The formatted report columns.
+    """
+    hit = [m.probe_length(key) for key in hits]
+    miss = [m.probe_length(key) for key in misses]
+    start = time.perf_counter()
+    for key in hits:
+        m.get(key)
+    hit_ns = (time.perf_counter() - start) / len(hits) * 1e9
+    start = time.perf_counter()
+    for key in misses:
+        m.get(key)
+    miss_ns = (time.perf_counter() - start) / len(misses) * 1e9
+    return (f"{m.table_load():>6.2f}{m.get_capacity() / m.get_size():>11.2f}"
+            f"{sum(hit) / len(hit):>9.2f}{max(hit):>6}"
+            f"{sum(miss) / len(miss):>9.2f}{max(miss):>6}"
+            f"{hit_ns:>9.0f}{miss_ns:>9.0f}")
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    keys = ['key' + str(i) for i in range(n)]
+    misses = ['missing' + str(i) for i in range(n)]
+
+    print(f"{n} keys, fnv1a")
+    print(f"{'engine':<22}{'load':>6}{'slots/key':>11}{'hit avg':>9}{'max':>6}"
+          f"{'miss avg':>9}{'max':>6}{'hit ns':>9}{'miss ns':>9}")
+
+    m = hash_map_oa.HashMap(2 * n, 'fnv1a')
+    for key in keys:
+        m.put(key, key)
+    print(f"{'oa quadratic':<22}{summarize(m, keys, misses)}")
+
+    for load in (0.5, 0.7, 0.8, 0.9):
+        # size the table for the target load and keep put() from growing it
+        m = hash_map_rh.HashMap(int(n / load), 'fnv1a', load_factor=0.99)
+        for key in keys:
+            m.put(key, key)
+        print(f"{'rh robin hood':<22}{summarize(m, keys, misses)}")
@@ -0,0 +1,71 @@
+# Course: CS261 - Data Structures
+# Description:Measures the per-call latency distribution of put() while a map grows
+# from its default capacity, with and without incremental rehashing.
+# The full resize paid by a single put() shows up in the p999 and max columns.
+# The cyclic garbage collector is paused while measuring, since its full passes
+# over millions of nodes would otherwise dominate the tail.
+#
+# Usage: python bench_resize_latency.py [number_of_puts]
+
+import gc
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+
+
+def percentile(samples: list, fraction: float) -> int:
+    """
+    Returns the sample at the given fraction of an already sorted list.
+
+    :param samples: Sorted latency samples.
+    :param fraction: Fraction between 0 and 1.
+    :return: The sample at that rank.
+    """
+    return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+
+def put_latencies(m, keys: list) -> list:
+    """
+    Puts every key into the map and records each call's latency.
+
+    :param m: The map to fill.
+    :param keys: The keys to insert.
+    :return: Sorted list of latencies in nanoseconds.
+    """
+    clock = time.perf_counter_ns
+    samples = []
+    gc.disable()
+    try:
+        for key in keys:
+            start = clock()
+            m.put(key, key)
+            samples.append(clock() - start)
+    finally:
+        gc.enable()
+    samples.sort()
+    return samples
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    keys = ['key' + str(i) for i in range(n)]
+    cases = (
+        ('hash_map_sc', 'full', lambda: hash_map_sc.HashMap(11, hash)),
+        ('hash_map_sc', 'incremental', lambda: hash_map_sc.HashMap(11, hash, incremental=True)),
+        ('hash_map_oa', 'full', lambda: hash_map_oa.HashMap(11, hash)),
+        ('hash_map_oa', 'incremental', lambda: hash_map_oa.HashMap(11, hash, incremental=True)),
+    )
+
+    print(f"{n} puts, latency in microseconds")
+    print(f"{'engine':<14}{'mode':<13}{'p50':>8}{'p99':>8}{'p999':>9}{'max':>11}{'total s':>9}")
+    for name, mode, make in cases:
+        samples = put_latencies(make(), keys)
+        print(f"{name:<14}{mode:<13}"
+              f"{percentile(samples, 0.5) / 1000:>8.1f}"
+              f"{percentile(samples, 0.99) / 1000:>8.1f}"
+              f"{percentile(samples, 0.999) / 1000:>9.1f}"
+              f"{samples[-1] / 1000:>11.1f}"
+              f"{sum(samples) / 1e9:>9.2f}")
@@ -0,0 +1,87 @@
+# Course: CS261 - Data Structures
+# Description:Cost and output of sampled latency tracing (map_stats.Sampler) on
+# hash_map_sc and hash_map_oa. Each engine runs the same puts (growing the table from
+# its initial capacity), gets and removes without a sampler and with samplers of 1 in
+# 1000, 1 in 100 and every call; the first row is the baseline the others are
+# compared with. A final run samples every call of each engine into a JSON lines
+# hook and compares the latency of the puts that started a resize with the rest,
+# which is the slow tail the histograms show. With --prometheus the last sampler is
+# printed in the Prometheus text format.
+#
+# Usage: python bench_sampling.py [number_of_keys] [--prometheus]
+
+import gc
+import io
+import json
+import random
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+from map_stats import JsonLinesWriter, Sampler, prometheus_text
+
+
+def workload(m, keys: list, lookups: list) -> float:
+    """Puts every key, looks up others, removes half; returns ops/s."""
+    start = time.perf_counter()
+    for key in keys:
+        m.put(key, key)
+    for key in lookups:
+        m.get(key)
+    for key in keys[::2]:
+        m.remove(key)
+    return (len(keys) + len(lookups) + len(keys[::2])) / (time.perf_counter() - start)
+
+
+def sampled(engine, every: int | None):
+    """Returns a new map with a sampler of 1 in every calls, or none."""
+    gc.collect()
+    m = engine(11, 'fnv1a')
+    if every is not None:
+        m.set_sampler(Sampler(every, seed=1))
+    return m
+
+
+if __name__ == "__main__":
+
+    arguments = [argument for argument in sys.argv[1:] if not argument.startswith('--')]
+    n = int(arguments[0]) if arguments else 50_000
+    rnd = random.Random(1)
+    keys = ['key' + str(i) for i in range(n)]
+    rnd.shuffle(keys)
+    lookups = rnd.choices(keys, k=n)
+    rates = (None, 1000, 100, 1)
+
+    print(f"{'engine':<14}{'sampling':<10}{'ops/s':>11}{'vs none':>9}")
+    for engine in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        # best of five interleaved runs, to keep scheduling noise out of the ratios
+        best = dict.fromkeys(rates, 0.0)
+        for _ in range(5):
+            for every in rates:
+                best[every] = max(best[every], workload(sampled(engine, every), keys, lookups))
+        for every in rates:
+            label = 'none' if every is None else f"1/{every}"
+            print(f"{engine.__module__:<14}{label:<10}{best[every]:>11,.0f}"
+                  f"{best[every] / best[None]:>9.2f}")
+
+    print(f"\n{'engine':<14}{'puts':<10}{'samples':>9}{'p50 us':>9}{'p99 us':>9}{'max us':>9}")
+    for engine in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        lines = io.StringIO()
+        sampler = Sampler(1, [JsonLinesWriter(lines, {'engine': engine.__module__})])
+        m = engine(11, 'fnv1a')
+        m.set_sampler(sampler)
+        workload(m, keys, lookups)
+        puts = [json.loads(line) for line in lines.getvalue().splitlines()]
+        puts = [sample for sample in puts if sample['operation'] == 'put']
+        for label, resized in (('resizing', True), ('other', False)):
+            latencies = sorted(sample['latency_ns'] for sample in puts
+                               if sample['resized'] == resized)
+            print(f"{engine.__module__:<14}{label:<10}{len(latencies):>9}"
+                  f"{latencies[len(latencies) // 2] / 1e3:>9.1f}"
+                  f"{latencies[len(latencies) * 99 // 100] / 1e3:>9.1f}"
+                  f"{latencies[-1] / 1e3:>9.1f}")
+
+    if '--prometheus' in sys.argv:
+        print()
+        print(prometheus_text(sampler, labels={'engine': engine.__module__}), end='')
@@ -0,0 +1,135 @@
+# Course: CS261 - Data Structures
+# Description:Load generator for kv_server.py. Starts a local server in a separate
+# process, loads it with keys using MPUT, then runs a closed-loop workload of 90% GET
+# and 10% PUT over those keys from a growing number of connections. Every connection
+# keeps `depth` requests in flight: it sends a batch of that many frames in one write
+# and waits for all of their replies before sending the next, so depth 1 is one round
+# trip per request. A request's latency runs from the write of its batch to the
+# arrival of its reply. The load generator shares the machine with the server, so
+# on few cores it takes part of the server's CPU.
+#
+# Usage: python bench_server.py [seconds_per_run] [number_of_keys] [--unix]
+
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import kv_protocol
+from kv_protocol import GET, MPUT, PUT, decode_frames, encode_frame
+
+CONNECTIONS = (1, 4, 16, 64)
+DEPTHS = (1, 16)
+
+
+async def connect(address):
+    """Opens a connection to a (host, port) pair or a Unix socket path."""
+    if isinstance(address, str):
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def read_replies(reader, buffer: bytearray, count: int) -> list:
+    """Reads until count reply frames have arrived; returns their arrival times."""
+    times = []
+    while len(times) < count:
+        data = await reader.read(65536)
+        if not data:
+            raise ConnectionError("server closed the connection")
+        buffer += data
+        frames, consumed = decode_frames(buffer)
+        del buffer[:consumed]
+        now = time.perf_counter()
+        for code, items in frames:
+            if code != kv_protocol.STATUS_OK:
+                raise RuntimeError(items[0].decode())
+            times.append(now)
+    return times
+
+
+async def client(address, keys: list, depth: int, deadline: float, seed: int, latencies: list) -> int:
+    """Runs batches until the deadline; returns the number of requests completed."""
+    reader, writer = await connect(address)
+    rnd = random.Random(seed)
+    buffer = bytearray()
+    done = 0
+    while time.perf_counter() < deadline:
+        frames = []
+        for key in rnd.choices(keys, k=depth):
+            if rnd.random() < 0.9:
+                frames.append(encode_frame(GET, (key,)))
+            else:
+                frames.append(encode_frame(PUT, (key, b'x' * 32)))
+        start = time.perf_counter()
+        writer.write(b''.join(frames))
+        for arrived in await read_replies(reader, buffer, depth):
+            latencies.append(arrived - start)
+        done += depth
+    writer.close()
+    await writer.wait_closed()
+    return done
+
+
+async def load(address, keys: list) -> None:
+    """Loads the keys in MPUT batches of 1000."""
+    reader, writer = await connect(address)
+    for i in range(0, len(keys), 1000):
+        batch = keys[i:i + 1000]
+        writer.write(encode_frame(MPUT, [item for key in batch for item in (key, b'x' * 32)]))
+    await read_replies(reader, bytearray(), (len(keys) + 999) // 1000)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(address, keys: list, connections: int, depth: int, seconds: float) -> tuple:
+    """Runs one cell of the table; returns (ops/s, sorted latencies)."""
+    latencies = []
+    start = time.perf_counter()
+    deadline = start + seconds
+    counts = await asyncio.gather(*[client(address, keys, depth, deadline, seed, latencies)
+                                    for seed in range(connections)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return sum(counts) / elapsed, latencies
+
+
+def start_server(unix: str | None) -> tuple:
+    """Starts kv_server.py; returns (process, address)."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(here, 'kv_server.py')]
+    command += ['--unix', unix] if unix else ['--port', '0']
+    server = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = server.stdout.readline().split()[-1]
+    if unix:
+        return server, unix
+    host, port = line.rsplit(':', 1)
+    return server, (host, int(port))
+
+
+if __name__ == "__main__":
+
+    arguments = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    seconds = float(arguments[0]) if arguments else 2
+    n = int(arguments[1]) if len(arguments) > 1 else 10_000
+    with tempfile.TemporaryDirectory() as directory:
+        unix = os.path.join(directory, 'kv.sock') if '--unix' in sys.argv else None
+        server, address = start_server(unix)
+        try:
+            keys = ['key' + str(i) for i in range(n)]
+            asyncio.run(load(address, keys))
+            print(f"{n} keys, 90% GET / 10% PUT, {seconds:g} s per run, "
+                  f"{'unix socket' if unix else 'tcp loopback'}")
+            print(f"{'conns':>6}{'depth':>7}{'ops/s':>10}{'p50 us':>9}{'p99 us':>9}{'p99.9 us':>10}")
+            for depth in DEPTHS:
+                for connections in CONNECTIONS:
+                    rate, latencies = asyncio.run(run(address, keys, connections, depth, seconds))
+                    n_lat = len(latencies)
+                    print(f"{connections:>6}{depth:>7}{rate:>10,.0f}{latencies[n_lat // 2] * 1e6:>9.0f}"
+                          f"{latencies[n_lat * 99 // 100] * 1e6:>9.0f}"
+                          f"{latencies[n_lat * 999 // 1000] * 1e6:>10.0f}")
+        finally:
+            server.terminate()
+            server.wait()
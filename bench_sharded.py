@@ -0,0 +1,89 @@
+# Course: CS261 - Data Structures
+# Description:Throughput scaling of the multi-process stores by process count.
+# "sharded" loads and then reads a key set through ShardedMap.put_many / get_many
+# in batches; "in-process" is one hash_map_sc.HashMap doing the same batches in the
+# calling process. "frozen" starts that many reader processes that all look keys up
+# in one FrozenTable shared memory segment, and reports their combined lookups per
+# second. Scaling needs as many free cores as processes; os.cpu_count() is printed.
+#
+# Usage: python bench_sharded.py [number_of_keys] [batch_size]
+
+import multiprocessing
+import os
+import sys
+import time
+
+import hash_map_sc
+from frozen_table import FrozenTable
+from sharded_map import ShardedMap
+
+PROCESSES = (1, 2, 4, 8)
+
+
+def load_and_read(m, keys: list, batch: int) -> float:
+    """
+    Puts every key in batches, then gets every key in batches.
+
+    :param m: A map with put_many and get_many.
+    :param keys: The keys.
+    :param batch: Number of keys per call.
+    :return: Operations per second.
+    """
+    start = time.perf_counter()
+    for i in range(0, len(keys), batch):
+        chunk = keys[i:i + batch]
+        m.put_many(chunk, range(i, i + len(chunk)))
+    for i in range(0, len(keys), batch):
+        m.get_many(keys[i:i + batch])
+    return 2 * len(keys) / (time.perf_counter() - start)
+
+
+def read_frozen(name: str, keys: list, barrier, results) -> None:
+    """Looks every key up in an attached FrozenTable once the barrier opens."""
+    table = FrozenTable.attach(name)
+    barrier.wait()
+    start = time.perf_counter()
+    for key in keys:
+        table.get(key)
+    results.put((start, time.perf_counter()))
+    table.close()
+
+
+def frozen_readers(table: FrozenTable, readers: int, keys: list) -> float:
+    """
+    Runs reader processes against one frozen table.
+
+    :param table: The table.
+    :param readers: Number of reader processes.
+    :param keys: Keys every reader looks up.
+    :return: Combined lookups per second, from the first start to the last finish.
+    """
+    barrier = multiprocessing.Barrier(readers)
+    results = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=read_frozen,
+                                         args=(table.get_name(), keys, barrier, results))
+                 for _ in range(readers)]
+    for process in processes:
+        process.start()
+    spans = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+    elapsed = max(end for _, end in spans) - min(start for start, _ in spans)
+    return readers * len(keys) / elapsed
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    keys = ['key' + str(i) for i in range(n)]
+
+    print(f"{n} keys, batches of {batch}, fnv1a, {os.cpu_count()} CPUs, operations per second")
+    baseline = load_and_read(hash_map_sc.HashMap(11, 'fnv1a'), keys, batch)
+    print(f"{'processes':>9}{'in-process':>13}{'sharded':>11}{'frozen':>11}")
+    with FrozenTable.build(((key, i) for i, key in enumerate(keys)), 'fnv1a') as table:
+        for processes in PROCESSES:
+            with ShardedMap(processes, 'hash_map_sc', 'fnv1a') as m:
+                sharded = load_and_read(m, keys, batch)
+            frozen = frozen_readers(table, processes, keys)
+            print(f"{processes:>9}{baseline:>13.0f}{sharded:>11.0f}{frozen:>11.0f}")
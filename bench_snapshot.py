@@ -0,0 +1,59 @@
+# Course: CS261 - Data Structures
+# Description:Save and load throughput of the binary snapshot format (HashMap.save /
+# HashMap.load, see snapshot.py) against pickling the whole map object, with the
+# size of each file. Values are short strings and ints.
+#
+# Usage: python bench_snapshot.py [number_of_keys]
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+import hash_map_oa
+import hash_map_sc
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+)
+
+
+def timed(function) -> tuple:
+    """Runs a function and returns (result, seconds)."""
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def pickle_save(m, path: str) -> None:
+    """Pickles a whole map."""
+    with open(path, 'wb') as file:
+        pickle.dump(m, file, pickle.HIGHEST_PROTOCOL)
+
+
+def pickle_load(path: str):
+    """Unpickles a whole map."""
+    with open(path, 'rb') as file:
+        return pickle.load(file)
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    sys.setrecursionlimit(100_000)
+    print(f"{n} keys, fnv1a")
+    print(f"{'engine':<14}{'format':<10}{'save s':>9}{'load s':>9}{'MiB':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name, engine in ENGINES:
+            m = engine.from_items((('key' + str(i), 'value' + str(i) if i % 2 else i)
+                                   for i in range(n)), 'fnv1a', n)
+            for label, save, load in (('pickle', pickle_save, pickle_load),
+                                      ('snapshot', engine.save, engine.load)):
+                path = os.path.join(directory, name + '.' + label)
+                _, saved = timed(lambda: save(m, path))
+                loaded, elapsed = timed(lambda: load(path))
+                assert loaded.get_size() == n
+                size = os.path.getsize(path) / 2 ** 20
+                print(f"{name:<14}{label:<10}{saved:>9.2f}{elapsed:>9.2f}{size:>8.1f}")
@@ -0,0 +1,76 @@
+# Course: CS261 - Data Structures
+# Description:Cost and output of the statistics of hash_map_sc and hash_map_oa
+# (map_stats.py). Each engine runs the same puts, gets and removes three times: on a
+# map that never had statistics, on one whose statistics were enabled and then
+# disabled again, and on one collecting them. The first two should be equally fast,
+# since disabling removes the counting methods. The last section prints the stats()
+# of maps filled with a weak and a good hash function, where the weak one shows up
+# as long chains and probe sequences.
+#
+# Usage: python bench_stats.py [number_of_keys]
+
+import gc
+import random
+import sys
+import time
+
+import hash_map_oa
+import hash_map_sc
+
+
+def workload(m, keys: list, lookups: list) -> float:
+    """Puts every key, looks up others, removes half; returns ops/s."""
+    start = time.perf_counter()
+    for key in keys:
+        m.put(key, key)
+    for key in lookups:
+        m.get(key)
+    for key in keys[::2]:
+        m.remove(key)
+    return (len(keys) + len(lookups) + len(keys[::2])) / (time.perf_counter() - start)
+
+
+def fresh(engine, mode: str):
+    """Returns a new map with statistics off, disabled after use, or on."""
+    gc.collect()
+    m = engine(11, 'fnv1a', collect_stats=mode != 'off')
+    if mode == 'disabled':
+        m.disable_stats()
+    return m
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    rnd = random.Random(1)
+    keys = ['key' + str(i) for i in range(n)]
+    rnd.shuffle(keys)
+    lookups = rnd.choices(keys, k=n) + ['missing' + str(i) for i in range(n // 4)]
+    modes = ('off', 'disabled', 'on')
+
+    print(f"{'engine':<14}{'stats':<10}{'ops/s':>11}{'vs off':>8}")
+    for engine in (hash_map_sc.HashMap, hash_map_oa.HashMap):
+        # best of five interleaved runs, to keep scheduling noise out of the ratios
+        rates = dict.fromkeys(modes, 0.0)
+        for _ in range(5):
+            for mode in modes:
+                rates[mode] = max(rates[mode], workload(fresh(engine, mode), keys, lookups))
+        for mode in modes:
+            print(f"{engine.__module__:<14}{mode:<10}{rates[mode]:>11,.0f}"
+                  f"{rates[mode] / rates['off']:>8.2f}")
+
+    print(f"\n{'engine':<14}{'function':<17}{'histogram':<15}{'mean':>6}{'p50':>5}"
+          f"{'p99':>5}{'max':>5}{'hit rate':>10}{'resizes':>9}{'purges':>8}")
+    sample = keys[:n // 5]
+    lookups = rnd.choices(sample, k=len(sample)) + lookups[-len(sample) // 4:]
+    for engine, histograms in ((hash_map_sc.HashMap, ('chain_length',)),
+                               (hash_map_oa.HashMap, ('put_probes', 'get_probes'))):
+        for function in ('hash_function_1', 'fnv1a'):
+            m = engine(11, function, collect_stats=True)
+            workload(m, sample, lookups)
+            stats = m.stats()
+            for histogram in histograms:
+                h = stats[histogram]
+                print(f"{engine.__module__:<14}{function:<17}{histogram:<15}{h['mean']:>6.2f}"
+                      f"{h['p50']:>5}{h['p99']:>5}{h['max']:>5}{stats['hit_rate']:>10.2f}"
+                      f"{stats['resizes']:>9}{stats['purges']:>8}")
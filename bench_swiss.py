@@ -0,0 +1,70 @@
+# Course: CS261 - Data Structures
+# Description:Lookup cost of the Swiss-table engine (hash_map_swiss) against the
+# other open addressing engines. Keys are a str subclass that counts calls to
+# __eq__, so "eq/hit" and "eq/miss" give the key-equality checks each lookup makes;
+# the control-byte tags let most misses finish without comparing any key.
+#
+# Usage: python bench_swiss.py [number_of_keys]
+
+import sys
+import time
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_rh
+import hash_map_swiss
+
+ENGINES = (
+    ('hash_map_oa', hash_map_oa.HashMap),
+    ('hash_map_compact', hash_map_compact.HashMap),
+    ('hash_map_rh', hash_map_rh.HashMap),
+    ('hash_map_swiss', hash_map_swiss.HashMap),
+)
+
+
+class CountingKey(str):
+    """A str key that counts how often it is compared for equality."""
+    compares = 0
+
+    def __eq__(self, other) -> bool:
+        CountingKey.compares += 1
+        return str.__eq__(self, other)
+
+    __hash__ = str.__hash__
+
+
+def lookups(m, keys: list) -> tuple:
+    """
+    Looks up every key once.
+
+    :param m: The filled map.
+    :param keys: Keys to look up.
+    :return: Tuple of (nanoseconds per key, key comparisons per key).
+    """
+    CountingKey.compares = 0
+    start = time.perf_counter()
+    for key in keys:
+        m.contains_key(key)
+    elapsed = time.perf_counter() - start
+    return elapsed / len(keys) * 1e9, CountingKey.compares / len(keys)
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    keys = [CountingKey('key' + str(i)) for i in range(n)]
+    misses = [CountingKey('missing' + str(i)) for i in range(n)]
+    plain_keys = [str(key) for key in keys]
+
+    print(f"{n} keys, fnv1a")
+    print(f"{'engine':<18}{'load':>6}{'hit ns':>9}{'eq/hit':>8}{'miss ns':>9}{'eq/miss':>9}"
+          f"{'get_many ns':>13}")
+    for name, engine in ENGINES:
+        m = engine.from_items([(key, key) for key in keys], 'fnv1a')
+        hit_ns, hit_eq = lookups(m, keys)
+        miss_ns, miss_eq = lookups(m, misses)
+        start = time.perf_counter()
+        m.get_many(plain_keys)
+        many_ns = (time.perf_counter() - start) / n * 1e9
+        print(f"{name:<18}{m.table_load():>6.2f}{hit_ns:>9.0f}{hit_eq:>8.2f}"
+              f"{miss_ns:>9.0f}{miss_eq:>9.2f}{many_ns:>13.0f}")
@@ -0,0 +1,78 @@
+# Course: CS261 - Data Structures
+# Description:Sustained insert/delete churn against the open addressing maps.
+# The number of live keys stays constant while every step inserts a new key
+# and removes an old one, so tombstones pile up until put() purges them, by
+# growing the table while a quarter or more of it is live and in place after that.
+# Probe lengths of successful and unsuccessful lookups are reported right
+# before and right after each automatic purge.
+#
+# Usage: python bench_tombstone_churn.py [live_keys] [purges]
+
+import random
+import sys
+
+import hash_map_compact
+import hash_map_oa
+
+
+def probe_stats(m, hits: list, misses: list) -> str:
+    """
+    Summarizes the probe lengths of the given lookups.
+
+    :param m: The map to probe.
+    :param hits: Keys present in the map.
+    :param misses: Keys absent from the map.
+    :return: Formatted average and maximum probe lengths.
+    """
+    hit = [m.probe_length(key) for key in hits]
+    miss = [m.probe_length(key) for key in misses]
+    return (f"hit avg {sum(hit) / len(hit):5.2f} max {max(hit):3}  "
+            f"miss avg {sum(miss) / len(miss):5.2f} max {max(miss):3}")
+
+
+def churn(engine, live: int, purges: int, seed: int = 0) -> None:
+    """
+    Runs the churn workload until the given number of purges happened.
+
+    :param engine: The HashMap class to exercise.
+    :param live: Number of live keys kept in the map.
+    :param purges: Number of automatic purges to report.
+    :param seed: Seed for choosing the removed keys.
+    :return: None
+    """
+    rnd = random.Random(seed)
+    m = engine(11, hash)
+    keys = ['key' + str(i) for i in range(live)]
+    for key in keys:
+        m.put(key, key)
+    misses = ['missing' + str(i) for i in range(1000)]
+    step = live
+    seen = 0
+    while seen < purges:
+        # the next put crosses the combined threshold and purges first
+        purging = (m.get_size() + m.get_tombstone_count()) / m.get_capacity() >= 0.5
+        if purging:
+            hits = rnd.sample(keys, min(1000, len(keys)))
+            print(f"  step {step:>8}  before: tombstones {m.get_tombstone_count():>6}  "
+                  f"{probe_stats(m, hits, misses)}")
+        key = 'key' + str(step)
+        m.put(key, key)
+        if purging:
+            print(f"  step {step:>8}  after:  tombstones {m.get_tombstone_count():>6}  "
+                  f"{probe_stats(m, hits, misses)}")
+            seen += 1
+        index = rnd.randrange(len(keys))
+        keys[index], keys[-1] = keys[-1], keys[index]
+        m.remove(keys.pop())
+        keys.append(key)
+        step += 1
+
+
+if __name__ == "__main__":
+
+    live = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    purges = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    for name, engine in (('hash_map_oa', hash_map_oa.HashMap),
+                         ('hash_map_compact', hash_map_compact.HashMap)):
+        print(f"{name}: {live} live keys")
+        churn(engine, live, purges)
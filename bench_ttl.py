@@ -0,0 +1,111 @@
+# Course: CS261 - Data Structures
+# Description:Memory and latency of expiry-heavy churn. Each mode runs for a fixed time,
+# inserting a stream of new session keys with a TTL, reading a few recent ones, and
+# never touching most keys again, so expired keys are reclaimed only by the mode's
+# cleanup:
+#
+#   lazy      ExpiringMap without a sweeper; only keys that are read again expire
+#   sweeper   ExpiringMap with its adaptive background sweeper (see expiring_map.py)
+#   scan      a plain hash_map_oa map plus a dict of deadlines, with an external loop
+#             that walks every key and calls remove() on the expired ones each interval
+#
+# "keys" is the most keys stored at once and "MiB" the growth of resident memory
+# (Linux only); the latencies are of single put/get calls, including any cleanup
+# that runs inline.
+#
+# Usage: python bench_ttl.py [seconds] [ttl_seconds]
+
+import random
+import sys
+import time
+
+import hash_map_oa
+from expiring_map import ExpiringMap
+
+INTERVAL = 0.1
+
+
+def resident_kib() -> int:
+    """Returns the resident memory of this process in KiB, from /proc."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+class ScanMap:
+    """hash_map_oa.HashMap whose expired keys are removed by a periodic full scan."""
+
+    def __init__(self) -> None:
+        self._map = hash_map_oa.HashMap(11, 'fnv1a')
+        self._deadlines = {}
+        self._next_scan = time.monotonic() + INTERVAL
+
+    def put(self, key: str, value: object, ttl: float) -> None:
+        self._scan()
+        self._map.put(key, value)
+        self._deadlines[key] = time.monotonic() + ttl
+
+    def get(self, key: str) -> object:
+        self._scan()
+        return self._map.get(key)
+
+    def get_size(self) -> int:
+        return self._map.get_size()
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> None:
+        now = time.monotonic()
+        if now < self._next_scan:
+            return
+        self._next_scan = now + INTERVAL
+        for key in list(self._map.keys()):
+            if self._deadlines[key] <= now:
+                self._map.remove(key)
+                del self._deadlines[key]
+
+
+def run(mode: str, seconds: float, ttl: float) -> tuple:
+    """Runs the churn for one mode; returns (max keys, MiB, sorted latencies)."""
+    if mode == 'scan':
+        m = ScanMap()
+    else:
+        m = ExpiringMap(11, 'fnv1a', interval=INTERVAL if mode == 'sweeper' else None)
+    rnd = random.Random(1)
+    before = resident_kib()
+    latencies = []
+    most = 0
+    i = 0
+    clock = time.perf_counter
+    end = clock() + seconds
+    while clock() < end:
+        key = 'session' + str(i)
+        start = clock()
+        m.put(key, i, ttl * (0.5 + rnd.random()))
+        latencies.append(clock() - start)
+        if i and rnd.random() < 0.2:
+            start = clock()
+            m.get('session' + str(i - rnd.randrange(min(i, 1000))))
+            latencies.append(clock() - start)
+        if not i % 1000:
+            most = max(most, m.get_size())
+        i += 1
+    m.close()
+    latencies.sort()
+    return most, (resident_kib() - before) / 1024, latencies
+
+
+if __name__ == "__main__":
+
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    ttl = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    print(f"{seconds:g} s of churn per mode, TTL {ttl / 2:g}-{ttl * 1.5:g} s, cleanup every {INTERVAL} s")
+    print(f"{'mode':<9}{'ops':>10}{'keys':>9}{'MiB':>8}{'p50 us':>8}{'p99 us':>8}{'max ms':>8}")
+    for mode in ('lazy', 'sweeper', 'scan'):
+        most, mib, latencies = run(mode, seconds, ttl)
+        n = len(latencies)
+        print(f"{mode:<9}{n:>10}{most:>9}{mib:>8.1f}{latencies[n // 2] * 1e6:>8.1f}"
+              f"{latencies[n * 99 // 100] * 1e6:>8.1f}{latencies[-1] * 1e3:>8.1f}")
@@ -0,0 +1,66 @@
+# Course: CS261 - Data Structures
+# Description:Full-scan cost of the lazy items() view against get_keys_and_values(),
+# which copies every pair into a new DynamicArray first. "peak KiB" is the largest
+# amount of memory allocated during the scan (tracemalloc), i.e. what the scan adds
+# on top of the map itself.
+#
+# Usage: python bench_views.py [number_of_keys]
+
+import sys
+import time
+import tracemalloc
+
+import hash_map_oa
+import hash_map_sc
+
+ENGINES = (
+    ('hash_map_sc', hash_map_sc.HashMap),
+    ('hash_map_oa', hash_map_oa.HashMap),
+)
+
+
+def scan_copy(m) -> int:
+    """Sums the values of a map through get_keys_and_values()."""
+    total = 0
+    pairs = m.get_keys_and_values()
+    for i in range(pairs.length()):
+        total += pairs[i][1]
+    return total
+
+
+def scan_view(m) -> int:
+    """Sums the values of a map through the items() view."""
+    total = 0
+    for _, value in m.items():
+        total += value
+    return total
+
+
+def measure(scan, m) -> tuple:
+    """
+    Times one scan, then repeats it under tracemalloc to find its peak allocation.
+
+    :param scan: The scan function.
+    :param m: The map to scan.
+    :return: Tuple of (seconds, peak KiB).
+    """
+    start = time.perf_counter()
+    scan(m)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    scan(m)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{n} keys")
+    print(f"{'engine':<14}{'scan':<22}{'seconds':>9}{'peak KiB':>11}")
+    for name, engine in ENGINES:
+        m = engine.from_items((('key' + str(i), i) for i in range(n)), 'fnv1a', n)
+        for label, scan in (('get_keys_and_values', scan_copy), ('items()', scan_view)):
+            elapsed, peak = measure(scan, m)
+            print(f"{name:<14}{label:<22}{elapsed:>9.3f}{peak:>11.0f}")
@@ -0,0 +1,90 @@
+# Course: CS261 - Data Structures
+# Description:Write throughput of DurableMap under each fsync policy, next to the
+# unlogged engine. "1 thread" times single put() calls; "8 threads" runs the same
+# number of puts from 8 threads, where the 'always' policy shares fsyncs between
+# waiting writers (group commit); "put_many" writes batches of 100 pairs, each
+# synced once. The unlogged engine is not thread-safe, so it has no "8 threads"
+# figure. fsync cost depends entirely on the device under the log directory, so
+# pass a directory on the disk of interest.
+#
+# Usage: python bench_wal.py [number_of_puts] [log_directory]
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import hash_map_sc
+from write_ahead_log import SYNC_POLICIES, DurableMap
+
+THREADS = 8
+BATCH = 100
+
+
+def single(m, keys: list) -> None:
+    """Puts every key with one call each."""
+    for i, key in enumerate(keys):
+        m.put(key, i)
+
+
+def threaded(m, keys: list) -> None:
+    """Puts every key from THREADS threads, each owning a slice of the keys."""
+    def work(part: list) -> None:
+        for key in part:
+            m.put(key, 0)
+
+    threads = [threading.Thread(target=work, args=(keys[t::THREADS],)) for t in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def batched(m, keys: list) -> None:
+    """Puts every key in batches of BATCH pairs."""
+    for i in range(0, len(keys), BATCH):
+        chunk = keys[i:i + BATCH]
+        m.put_many(chunk, range(len(chunk)))
+
+
+def measure(directory: str, sync: str, write, keys: list) -> float:
+    """
+    Times one way of writing into a new log.
+
+    :param directory: Directory for the log.
+    :param sync: The fsync policy, or None for the unlogged engine.
+    :param write: single, threaded or batched.
+    :param keys: The keys to write.
+    :return: Puts per second.
+    """
+    if sync is None:
+        m = hash_map_sc.HashMap(11, 'fnv1a')
+        start = time.perf_counter()
+        write(m, keys)
+        return len(keys) / (time.perf_counter() - start)
+    path = os.path.join(directory, sync + '.wal')
+    m = DurableMap(path, hash_map_sc.HashMap, 'fnv1a', sync)
+    start = time.perf_counter()
+    write(m, keys)
+    elapsed = time.perf_counter() - start
+    m.close()
+    os.remove(path)
+    return len(keys) / elapsed
+
+
+if __name__ == "__main__":
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    keys = ['key' + str(i) for i in range(n)]
+    with tempfile.TemporaryDirectory(dir=sys.argv[2] if len(sys.argv) > 2 else None) as directory:
+        print(f"{n} puts, log in {directory}, puts per second")
+        print(f"{'policy':<10}{'1 thread':>11}{f'{THREADS} threads':>11}{'put_many':>11}")
+        for sync in (None,) + SYNC_POLICIES:
+            row = f"{sync or 'no log':<10}"
+            for write in (single, threaded, batched):
+                if sync is None and write is threaded:
+                    row += f"{'-':>11}"
+                else:
+                    row += f"{measure(directory, sync, write, keys):>11.0f}"
+            print(row)
@@ -0,0 +1,326 @@
+# Course: CS261 - Data Structures
+# Description:Workload suite comparing every engine with each other and with dict.
+# Each named workload is a deterministic list of operations (seeded), optionally run
+# after preloading keys, and is replayed against every engine twice:
+#
+#   timed     ops/s over the whole replay, and p50 / p99 latency of single operations
+#             (each timed with perf_counter_ns, which adds its own ~0.1 us)
+#   traced    under tracemalloc, for the peak memory allocated by the engine while
+#             preloading and replaying (dict reports its own allocations too), and
+#             counting resizes as changes of get_capacity() (sys.getsizeof for dict)
+#
+# Workloads:
+#
+#   uniform_reads   gets of preloaded keys, uniformly at random
+#   zipf_reads      gets of preloaded keys with Zipfian popularity (s=0.99)
+#   insert_heavy    puts of new keys from empty, with 10% gets of inserted keys
+#   delete_churn    a preloaded map where each step removes a random key and inserts a
+#                   new one, so the size is constant and open addressing tables fill
+#                   with tombstones
+#   mixed_90_10     90% gets and 10% puts (updates and inserts) on a preloaded map
+#   long_keys       gets of preloaded 200-1000 character keys
+#   anagram_keys    puts then gets of distinct permutations of one word, always hashed
+#                   with hash_function_1, for which every anagram collides
+#
+# Engines that lack put / get / remove are listed as skipped. Results are printed as a
+# table and, with --json, written to a file; --compare reads an earlier file and
+# exits with status 1 if any workload's ops/s fell by more than --tolerance.
+#
+# Usage: python bench_workloads.py [--keys N] [--function NAME] [--only WORKLOAD ...]
+#                                  [--engines ENGINE ...] [--seed N] [--json PATH]
+#                                  [--compare PATH] [--tolerance 0.1]
+
+import argparse
+import importlib
+import itertools
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+GET = 0
+PUT = 1
+REMOVE = 2
+
+ENGINES = ('dict', 'hash_map_sc', 'hash_map_oa', 'hash_map_compact', 'hash_map_rh',
+           'hash_map_swiss', 'hash_map_final')
+
+
+class DictMap:
+    """dict behind the put / get / remove API, as the baseline."""
+
+    def __init__(self, capacity: int, function) -> None:
+        self._dict = {}
+
+    def put(self, key: str, value: object) -> None:
+        self._dict[key] = value
+
+    def get(self, key: str) -> object:
+        return self._dict.get(key)
+
+    def remove(self, key: str) -> None:
+        self._dict.pop(key, None)
+
+    def get_capacity(self) -> int:
+        return sys.getsizeof(self._dict)
+
+
+def load_engine(name: str):
+    """
+    Returns the map class of an engine.
+
+    :param name: 'dict' or the name of an engine module.
+    :return: The class, or a string saying why the engine cannot run the suite.
+    """
+    if name == 'dict':
+        return DictMap
+    engine = importlib.import_module(name).HashMap
+    missing = [method for method in ('put', 'get', 'remove') if not hasattr(engine, method)]
+    if missing:
+        return f"HashMap has no {', '.join(missing)}"
+    return engine
+
+
+# ------------------------------------------------------------------ #
+# workloads: each returns (keys to preload, list of (operation, key) pairs, function)
+
+
+def _keys(count: int, prefix: str = 'key') -> list:
+    return [prefix + str(i) for i in range(count)]
+
+
+def uniform_reads(n: int, rnd: random.Random, function: str) -> tuple:
+    keys = _keys(n)
+    return keys, [(GET, key) for key in rnd.choices(keys, k=2 * n)], function
+
+
+def zipf_reads(n: int, rnd: random.Random, function: str) -> tuple:
+    keys = _keys(n)
+    weights = list(itertools.accumulate(1 / rank ** 0.99 for rank in range(1, n + 1)))
+    ranked = rnd.sample(keys, n)
+    return keys, [(GET, key) for key in rnd.choices(ranked, cum_weights=weights, k=2 * n)], function
+
+
+def insert_heavy(n: int, rnd: random.Random, function: str) -> tuple:
+    ops = []
+    for i in range(n):
+        ops.append((PUT, 'key' + str(i)))
+        if rnd.random() < 0.1:
+            ops.append((GET, 'key' + str(rnd.randrange(i + 1))))
+    return [], ops, function
+
+
+def delete_churn(n: int, rnd: random.Random, function: str) -> tuple:
+    keys = _keys(n)
+    live = list(keys)
+    ops = []
+    for i in range(2 * n):
+        index = rnd.randrange(len(live))
+        ops.append((REMOVE, live[index]))
+        live[index] = 'new' + str(i)
+        ops.append((PUT, live[index]))
+    return keys, ops, function
+
+
+def mixed_90_10(n: int, rnd: random.Random, function: str) -> tuple:
+    keys = _keys(n)
+    ops = []
+    inserted = n
+    for _ in range(2 * n):
+        if rnd.random() < 0.9:
+            ops.append((GET, 'key' + str(rnd.randrange(inserted))))
+        elif rnd.random() < 0.5:
+            ops.append((PUT, 'key' + str(rnd.randrange(inserted))))
+        else:
+            ops.append((PUT, 'key' + str(inserted)))
+            inserted += 1
+    return keys, ops, function
+
+
+def long_keys(n: int, rnd: random.Random, function: str) -> tuple:
+    count = max(1, n // 4)
+    keys = [str(i) + '-' + 'x' * rnd.randrange(200, 1000) for i in range(count)]
+    return keys, [(GET, key) for key in rnd.choices(keys, k=2 * count)], function
+
+
+def anagram_keys(n: int, rnd: random.Random, function: str) -> tuple:
+    # every key has the same letters, so hash_function_1 puts them all in one bucket
+    count = max(1, n // 20)
+    keys = []
+    for letters in itertools.permutations('abcdefghij'):
+        keys.append(''.join(letters))
+        if len(keys) == count:
+            break
+    rnd.shuffle(keys)
+    ops = [(PUT, key) for key in keys] + [(GET, key) for key in rnd.sample(keys, count)]
+    return [], ops, 'hash_function_1'
+
+
+WORKLOADS = {
+    'uniform_reads': uniform_reads,
+    'zipf_reads': zipf_reads,
+    'insert_heavy': insert_heavy,
+    'delete_churn': delete_churn,
+    'mixed_90_10': mixed_90_10,
+    'long_keys': long_keys,
+    'anagram_keys': anagram_keys,
+}
+
+
+# ------------------------------------------------------------------ #
+
+
+def replay(m, ops: list, latencies: list = None) -> None:
+    """Runs operations against a map, recording each one's latency if asked to."""
+    get, put, remove = m.get, m.put, m.remove
+    if latencies is None:
+        for op, key in ops:
+            if op == GET:
+                get(key)
+            elif op == PUT:
+                put(key, 1)
+            else:
+                remove(key)
+        return
+    clock = time.perf_counter_ns
+    record = latencies.append
+    for op, key in ops:
+        start = clock()
+        if op == GET:
+            get(key)
+        elif op == PUT:
+            put(key, 1)
+        else:
+            remove(key)
+        record(clock() - start)
+
+
+def preloaded(engine, function: str, keys: list):
+    """Returns a new map holding the keys."""
+    m = engine(11, function)
+    for key in keys:
+        m.put(key, 0)
+    return m
+
+
+def timed(engine, function: str, keys: list, ops: list) -> dict:
+    """Replays a workload for ops/s and latency percentiles."""
+    m = preloaded(engine, function, keys)
+    start = time.perf_counter()
+    replay(m, ops)
+    elapsed = time.perf_counter() - start
+    m = preloaded(engine, function, keys)
+    latencies = []
+    replay(m, ops, latencies)
+    latencies.sort()
+    return {
+        'ops_per_sec': len(ops) / elapsed,
+        'p50_ns': latencies[len(latencies) // 2],
+        'p99_ns': latencies[len(latencies) * 99 // 100],
+    }
+
+
+def traced(engine, function: str, keys: list, ops: list) -> dict:
+    """Replays a workload for peak memory and the number of resizes."""
+    steps = [[(PUT, key)] for key in keys] + [[op] for op in ops]
+    tracemalloc.start()
+    try:
+        m = engine(11, function)
+        capacity = m.get_capacity()
+        resizes = 0
+        for step in steps:
+            replay(m, step)
+            if m.get_capacity() != capacity:
+                capacity = m.get_capacity()
+                resizes += 1
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'peak_bytes': peak, 'resizes': resizes}
+
+
+def git_revision() -> str | None:
+    """Returns the checked-out commit, or None outside a git repository."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: list, path: str, tolerance: float) -> bool:
+    """Prints ops/s against an earlier run; returns False if anything regressed."""
+    with open(path) as file:
+        before = {(r['workload'], r['engine']): r for r in json.load(file)['results']}
+    ok = True
+    print(f"\nagainst {path} (tolerance {tolerance:.0%})")
+    for result in results:
+        old = before.get((result['workload'], result['engine']))
+        if old is None:
+            continue
+        ratio = result['ops_per_sec'] / old['ops_per_sec']
+        regressed = ratio < 1 - tolerance
+        ok = ok and not regressed
+        if regressed or ratio > 1 + tolerance:
+            print(f"  {result['workload']:<15}{result['engine']:<18}{ratio:>7.2f}x"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Run the engine workload suite.")
+    parser.add_argument('--keys', type=int, default=20_000, help="base number of keys")
+    parser.add_argument('--function', default='fnv1a', help="hash function of every workload "
+                                                            "but anagram_keys")
+    parser.add_argument('--only', nargs='+', choices=WORKLOADS, default=list(WORKLOADS))
+    parser.add_argument('--engines', nargs='+', choices=ENGINES, default=list(ENGINES))
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', metavar='PATH', help="write the results to a JSON file")
+    parser.add_argument('--compare', metavar='PATH', help="compare with an earlier JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    arguments = parser.parse_args()
+
+    engines = {name: load_engine(name) for name in arguments.engines}
+    skipped = {name: reason for name, reason in engines.items() if isinstance(reason, str)}
+    for name, reason in skipped.items():
+        print(f"skipping {name}: {reason}")
+
+    results = []
+    print(f"{'workload':<15}{'engine':<18}{'ops':>8}{'ops/s':>11}{'p50 ns':>9}{'p99 ns':>9}"
+          f"{'peak KiB':>10}{'resizes':>9}")
+    for workload in arguments.only:
+        keys, ops, function = WORKLOADS[workload](arguments.keys, random.Random(arguments.seed),
+                                                  arguments.function)
+        for name, engine in engines.items():
+            if name in skipped:
+                continue
+            result = {'workload': workload, 'engine': name, 'function': function,
+                      'preload': len(keys), 'ops': len(ops)}
+            result.update(timed(engine, function, keys, ops))
+            result.update(traced(engine, function, keys, ops))
+            results.append(result)
+            print(f"{workload:<15}{name:<18}{len(ops):>8}{result['ops_per_sec']:>11,.0f}"
+                  f"{result['p50_ns']:>9}{result['p99_ns']:>9}"
+                  f"{result['peak_bytes'] / 1024:>10,.0f}{result['resizes']:>9}")
+
+    if arguments.json:
+        report = {
+            'meta': {
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'revision': git_revision(),
+                'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+                'keys': arguments.keys,
+                'seed': arguments.seed,
+            },
+            'skipped': skipped,
+            'results': results,
+        }
+        with open(arguments.json, 'w') as file:
+            json.dump(report, file, indent=2)
+    if arguments.compare and not compare(results, arguments.compare, arguments.tolerance):
+        sys.exit(1)
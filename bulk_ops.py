@@ -0,0 +1,112 @@
+# Course: CS261 - Data Structures
+# Description:Bulk operations shared by the in-memory engines (hash_map_sc, hash_map_oa,
+# hash_map_compact, hash_map_rh and hash_map_swiss), which inherit them from BulkOps:
+#
+#   from_items   builds a map sized up front for all of its pairs
+#   put_many     sizes the table once for a batch, then inserts it
+#   get_many     looks up a batch of keys
+#   remove_many  removes a batch of keys
+#
+# Every batch is hashed in one pass with hash_functions.hash_batch(), which uses a
+# vectorized hash when one is available. An engine provides the pieces that differ:
+#
+#   _bulk_capacity(expected_size, **options)   classmethod; the capacity that holds
+#                                              expected_size pairs without resizing,
+#                                              given every constructor option and
+#                                              ignoring those it does not use
+#   _hash_batch(keys)                          the hash codes its _insert / _delete
+#                                              expect; defaults to _hash_function
+#   _get_hashed(key, hashcode)                 the value of a key, or None
+#   _reserve(count), _insert(key, value, hashcode), _delete(key, hashcode)
+
+from itertools import islice
+
+from a6_include import hash_function_1
+from hash_functions import hash_batch
+
+# number of pairs handed to put_many() at a time by from_items()
+BULK_CHUNK = 4096
+
+
+class BulkOps:
+    """Batched construction, insertion, lookup and removal; see the module description."""
+
+    @classmethod
+    def from_items(cls, items, function=hash_function_1, expected_size: int = None,
+                   **options):
+        """
+        Builds a map from (key, value) pairs without intermediate resizes.
+        The final capacity is chosen up front by the engine's sizing rule,
+        then the pairs are placed in a single pass through put_many().
+
+        :param items: Iterable of (key, value) pairs.
+        :param function: The hash function applied to keys, or a registered name.
+        :param expected_size: Number of pairs, if known. When given, items is
+            consumed lazily in chunks instead of being materialized first.
+        :param options: Further constructor arguments of the engine, e.g.
+            capacity_policy or load_factor.
+        :return: The populated map.
+        """
+        if expected_size is None:
+            items = list(items)
+            expected_size = len(items)
+        m = cls(cls._bulk_capacity(expected_size, **options), function, **options)
+        items = iter(items)
+        while True:
+            chunk = list(islice(items, BULK_CHUNK))
+            if not chunk:
+                return m
+            m.put_many([pair[0] for pair in chunk], [pair[1] for pair in chunk])
+
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Hashes a batch of keys.
+
+        :param keys: The keys.
+        :return: Their hash codes, as _insert() and _delete() take them.
+        """
+        return hash_batch(self._hash_function, keys)
+
+    def put_many(self, keys, values) -> None:
+        """
+        Inserts or updates many key-value pairs at once. The table is sized once
+        for the whole batch (assuming every key is new) and the keys are hashed
+        in a single batched pass, using a vectorized hash when one is available.
+
+        :param keys: Sequence or iterator of keys.
+        :param values: Sequence or iterator of values, one per key.
+        :return: None
+        """
+        keys, values = list(keys), list(values)
+        if len(keys) != len(values):
+            raise ValueError("put_many() needs exactly one value per key")
+        self._reserve(self._size + len(keys))
+        hashes = self._hash_batch(keys)
+        insert = self._insert
+        for i in range(len(keys)):
+            insert(keys[i], values[i], hashes[i])
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of many keys, hashing them in a single batched pass.
+
+        :param keys: Sequence or iterator of keys.
+        :return: The value of each key, or None for keys that are not found.
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+        get = self._get_hashed
+        return [get(keys[i], hashes[i]) for i in range(len(keys))]
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes many keys, hashing them in a single batched pass.
+
+        :param keys: Sequence or iterator of keys.
+        :return: For each key, True if it was present and removed, False otherwise.
+        """
+        keys = list(keys)
+        hashes = self._hash_batch(keys)
+        delete = self._delete
+        # engines return the removed node or entry, or a bool
+        return [bool(delete(keys[i], hashes[i])) for i in range(len(keys))]
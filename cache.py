@@ -0,0 +1,409 @@
+# Course: CS261 - Data Structures
+# Description:Bounded cache built on the engines. Cache keeps its pairs in an engine
+# (hash_map_sc by default) whose values are small entry records, and evicts when a
+# put would exceed a maximum number of entries, an approximate byte budget, or both.
+# Every policy does O(1) bookkeeping per operation:
+#
+#   'lru'    a doubly linked list in recency order; hits move to the front and the
+#            back is evicted
+#   'lfu'    a list of frequency buckets, each holding its entries in recency order
+#            (Shah, Mitra and Matani, 2010); a hit moves its entry to the next bucket
+#            and the least recent entry of the lowest bucket is evicted
+#   'clock'  a circular array of entries with a reference bit each; hits only set the
+#            bit and the hand clears bits until it finds an entry to evict, so gets
+#            do not touch any list (amortized O(1))
+#
+# The size of an entry is sys.getsizeof(key) + sys.getsizeof(value) unless a sizeof
+# function is given; nested objects are not followed, so byte budgets are approximate.
+# A value larger than the whole budget is not stored. Hits, misses and evictions are
+# counted; see counters().
+
+import sys
+
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1
+
+CACHE_POLICIES = ('lru', 'lfu', 'clock')
+
+
+class _Entry:
+    """A cached pair and the bookkeeping of every policy."""
+
+    __slots__ = ('key', 'value', 'size', 'prev', 'next', 'bucket', 'referenced', 'slot')
+
+    def __init__(self, key: str, value: object, size: int) -> None:
+        self.key = key
+        self.value = value
+        self.size = size
+        self.prev = self.next = None
+        self.bucket = None
+        self.referenced = False
+        self.slot = -1
+
+
+class _Ring:
+    """Circular doubly linked list with a sentinel; entries or buckets link in."""
+
+    def __init__(self) -> None:
+        self.prev = self.next = self
+
+    def is_empty(self) -> bool:
+        return self.next is self
+
+    def push_front(self, node) -> None:
+        node.prev, node.next = self, self.next
+        self.next.prev = node
+        self.next = node
+
+    @staticmethod
+    def unlink(node) -> None:
+        node.prev.next = node.next
+        node.next.prev = node.prev
+        node.prev = node.next = None
+
+
+class _LRU:
+    """Least recently used: one list, most recent first."""
+
+    def __init__(self) -> None:
+        self._list = _Ring()
+
+    def insert(self, entry: _Entry) -> None:
+        self._list.push_front(entry)
+
+    def touch(self, entry: _Entry) -> None:
+        _Ring.unlink(entry)
+        self._list.push_front(entry)
+
+    def remove(self, entry: _Entry) -> None:
+        _Ring.unlink(entry)
+
+    def victim(self, spare: _Entry) -> _Entry:
+        victim = self._list.prev
+        return victim.prev if victim is spare else victim
+
+
+class _Bucket(_Ring):
+    """Entries used the same number of times, most recent first."""
+
+    def __init__(self, frequency: int) -> None:
+        super().__init__()
+        self.frequency = frequency
+        # neighbouring buckets, in increasing frequency
+        self.lower = self.higher = None
+
+
+class _LFU:
+    """Least frequently used, least recent first among equals."""
+
+    def __init__(self) -> None:
+        # sentinel bucket; its higher neighbour has the lowest frequency
+        self._buckets = _Bucket(0)
+        self._buckets.lower = self._buckets.higher = self._buckets
+
+    def _bucket_after(self, bucket: _Bucket, frequency: int) -> _Bucket:
+        """Returns the bucket of a frequency, creating it right after bucket."""
+        higher = bucket.higher
+        if higher is not self._buckets and higher.frequency == frequency:
+            return higher
+        new = _Bucket(frequency)
+        new.lower, new.higher = bucket, higher
+        bucket.higher = higher.lower = new
+        return new
+
+    def _leave(self, entry: _Entry) -> None:
+        """Unlinks an entry from its bucket, dropping the bucket if it empties."""
+        bucket = entry.bucket
+        _Ring.unlink(entry)
+        if bucket.is_empty():
+            bucket.lower.higher = bucket.higher
+            bucket.higher.lower = bucket.lower
+        entry.bucket = None
+
+    def insert(self, entry: _Entry) -> None:
+        entry.bucket = self._bucket_after(self._buckets, 1)
+        entry.bucket.push_front(entry)
+
+    def touch(self, entry: _Entry) -> None:
+        bucket = entry.bucket
+        # the bucket is still linked while its successor is looked up
+        target = self._bucket_after(bucket, bucket.frequency + 1)
+        self._leave(entry)
+        entry.bucket = target
+        target.push_front(entry)
+
+    def remove(self, entry: _Entry) -> None:
+        self._leave(entry)
+
+    def victim(self, spare: _Entry) -> _Entry:
+        bucket = self._buckets.higher
+        victim = bucket.prev
+        if victim is spare:
+            victim = victim.prev if victim.prev is not bucket else bucket.higher.prev
+        return victim
+
+
+class _Clock:
+    """Second chance: a hand sweeps a circular array of reference bits."""
+
+    def __init__(self) -> None:
+        self._slots = []
+        self._free = []
+        self._hand = 0
+
+    def insert(self, entry: _Entry) -> None:
+        if self._free:
+            entry.slot = self._free.pop()
+            self._slots[entry.slot] = entry
+        else:
+            entry.slot = len(self._slots)
+            self._slots.append(entry)
+
+    def touch(self, entry: _Entry) -> None:
+        entry.referenced = True
+
+    def remove(self, entry: _Entry) -> None:
+        self._slots[entry.slot] = None
+        self._free.append(entry.slot)
+        entry.slot = -1
+
+    def victim(self, spare: _Entry) -> _Entry:
+        slots = self._slots
+        while True:
+            if self._hand >= len(slots):
+                self._hand = 0
+            entry = slots[self._hand]
+            self._hand += 1
+            if entry is None or entry is spare:
+                continue
+            if not entry.referenced:
+                return entry
+            entry.referenced = False
+
+
+# each policy offers insert, touch (on a hit or an update), remove, and victim(spare),
+# which picks the entry to evict next, never spare
+_POLICIES = {'lru': _LRU, 'lfu': _LFU, 'clock': _Clock}
+
+
+def default_sizeof(key: str, value: object) -> int:
+    """
+    Approximates the memory held by a pair, without following nested objects.
+
+    :param key: The key.
+    :param value: The value.
+    :return: Size in bytes.
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+
+
+class Cache:
+    def __init__(self, max_entries: int = None, max_bytes: int = None, policy: str = 'lru',
+                 function=hash_function_1, engine=hash_map_sc.HashMap, sizeof=None) -> None:
+        """
+        Initialize an empty cache; at least one of the two limits is required
+
+        :param max_entries: The maximum number of entries, or None.
+        :param max_bytes: The approximate byte budget, or None.
+        :param policy: One of CACHE_POLICIES.
+        :param function: The hash function applied to keys, or a registered name.
+        :param engine: The engine class, constructed as engine(11, function).
+        :param sizeof: Maps (key, value) to a size in bytes; default_sizeof if None.
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"unknown cache policy {policy!r}, "
+                             f"expected one of {', '.join(CACHE_POLICIES)}")
+        if max_entries is None and max_bytes is None:
+            raise ValueError("a cache needs max_entries, max_bytes or both")
+        if (max_entries is not None and max_entries < 1) or (max_bytes is not None and max_bytes < 1):
+            raise ValueError("cache limits must be positive")
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._policy_name = policy
+        self._policy = _POLICIES[policy]()
+        self._map = engine(11, function)
+        self._sizeof = sizeof or default_sizeof
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get_size(self) -> int:
+        """
+        Return the number of cached entries
+        """
+        return self._map.get_size()
+
+    def get_bytes(self) -> int:
+        """
+        Return the approximate bytes held by the cached entries
+        """
+        return self._bytes
+
+    def get_policy(self) -> str:
+        """
+        Return the eviction policy
+        """
+        return self._policy_name
+
+    def counters(self) -> dict:
+        """
+        Returns the hit, miss and eviction counts since the cache was created or
+        the counters were reset, and the hit rate of get().
+
+        :return: Dictionary with keys hits, misses, evictions and hit_rate.
+        """
+        lookups = self._hits + self._misses
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+        }
+
+    def reset_counters(self) -> None:
+        """
+        Sets the hit, miss and eviction counts back to zero.
+
+        :return: None
+        """
+        self._hits = self._misses = self._evictions = 0
+
+    # ------------------------------------------------------------------ #
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Retrieves a cached value, counting a hit or a miss; a hit marks the entry
+        as used for the eviction policy.
+
+        :param key: The key to search for.
+        :param default: The value returned on a miss.
+        :return: The cached value, or default.
+        """
+        entry = self._map.get(key)
+        if entry is None:
+            self._misses += 1
+            return default
+        self._hits += 1
+        self._policy.touch(entry)
+        return entry.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a key is cached, without counting a lookup or marking it as used.
+
+        :param key: The key to check for.
+        :return: True if the key is cached, False otherwise.
+        """
+        return self._map.contains_key(key)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Caches a pair, then evicts entries chosen by the policy until the cache
+        is within its limits again. Replacing a value marks the entry as used.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        size = self._sizeof(key, value)
+        if self._max_bytes is not None and size > self._max_bytes:
+            # it could never fit; drop any older value rather than keep a stale one
+            self.remove(key)
+            return
+        entry = self._map.get(key)
+        if entry is not None:
+            self._bytes += size - entry.size
+            entry.value, entry.size = value, size
+            self._policy.touch(entry)
+        else:
+            entry = _Entry(key, value, size)
+            self._map.put(key, entry)
+            self._policy.insert(entry)
+            self._bytes += size
+        self._evict(entry)
+
+    def _evict(self, keep: _Entry) -> None:
+        """
+        Evicts entries until both limits hold. Each policy's victim() passes over
+        the entry just written, which fits the limits on its own.
+
+        :param keep: The entry just written.
+        :return: None
+        """
+        while ((self._max_entries is not None and self._map.get_size() > self._max_entries)
+               or (self._max_bytes is not None and self._bytes > self._max_bytes)):
+            victim = self._policy.victim(keep)
+            self._drop(victim)
+            self._evictions += 1
+
+    def _drop(self, entry: _Entry) -> None:
+        """
+        Removes an entry from the map and the policy.
+
+        :param entry: The entry to remove.
+        :return: None
+        """
+        self._map.remove(entry.key)
+        self._policy.remove(entry)
+        self._bytes -= entry.size
+
+    def remove(self, key: str) -> None:
+        """
+        Removes a cached pair; this is not counted as an eviction.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        entry = self._map.get(key)
+        if entry is not None:
+            self._drop(entry)
+
+    def clear(self) -> None:
+        """
+        Removes every cached pair; the counters are kept.
+
+        :return: None
+        """
+        self._map.clear()
+        self._policy = _POLICIES[self._policy_name]()
+        self._bytes = 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of the cached keys and values.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        pairs = self._map.get_keys_and_values()
+        out = DynamicArray()
+        for i in range(pairs.length()):
+            key, entry = pairs[i]
+            out.append((key, entry.value))
+        return out
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    for policy in CACHE_POLICIES:
+        print(f"\n{policy} with 3 entries")
+        print("-" * (len(policy) + 15))
+        c = Cache(3, policy=policy)
+        for key in ('a', 'b', 'c'):
+            c.put(key, key.upper())
+        c.get('a')
+        c.get('a')
+        c.get('b')
+        c.put('d', 'D')
+        print(sorted(pair[0] for pair in (c.get_keys_and_values()[i] for i in range(c.get_size()))),
+              c.counters())
+
+    print("\nbyte budget")
+    print("-----------")
+    c = Cache(max_bytes=1000)
+    for i in range(100):
+        c.put('key' + str(i), 'x' * 50)
+    print(c.get_size(), c.get_bytes(), c.counters()['evictions'])
@@ -0,0 +1,110 @@
+# Course: CS261 - Data Structures
+# Description:Capacity policies shared by the separate chaining (hash_map_sc) and
+# open addressing (hash_map_oa) engines. A policy decides which table sizes a map
+# uses and how hash codes are turned into slot indices:
+#
+#   'prime'        prime capacities found by trial division (the original behaviour)
+#   'prime_table'  prime capacities looked up in GROWTH_PRIMES, a precomputed chain
+#                  of primes where each is the smallest prime >= twice the previous,
+#                  so finding the next capacity costs a binary search over 40 entries
+#   'pow2'         power-of-two capacities. Hash codes are passed through
+#                  hash_functions.mix64() so their low bits, which are all a
+#                  power-of-two modulus keeps, are well distributed
+#
+# Only growth steps look up GROWTH_PRIMES: a capacity chosen by the caller or computed
+# by bulk loading is rounded to the next prime under 'prime_table' as under 'prime',
+# since the next table entry can be almost twice as large. Growing a default map
+# (capacity 11) follows the same capacities under both policies.
+#
+# next_prime() and is_prime() are the trial division of the 'prime' policy, for the
+# engines that always use prime capacities (hash_map_compact, hash_map_rh).
+
+from bisect import bisect_left
+
+CAPACITY_POLICIES = ('prime', 'prime_table', 'pow2')
+
+# GROWTH_PRIMES[i + 1] is the smallest prime >= 2 * GROWTH_PRIMES[i]
+GROWTH_PRIMES = (
+    2, 5, 11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853, 25717, 51437,
+    102877, 205759, 411527, 823117, 1646237, 3292489, 6584983, 13169977,
+    26339969, 52679969, 105359939, 210719881, 421439783, 842879579,
+    1685759167, 3371518343, 6743036717, 13486073473, 26972146961,
+    53944293929, 107888587883, 215777175787, 431554351609, 863108703229,
+    1726217406467,
+)
+
+
+def check_capacity_policy(policy: str) -> str:
+    """
+    Validates the name of a capacity policy.
+
+    :param policy: One of CAPACITY_POLICIES.
+    :return: The policy name.
+    """
+    if policy not in CAPACITY_POLICIES:
+        raise ValueError(f"unknown capacity policy {policy!r}, "
+                         f"expected one of {', '.join(CAPACITY_POLICIES)}")
+    return policy
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Determines whether a number is prime, by trial division.
+
+    :param capacity: The number.
+    :return: True if it is prime.
+    """
+    if capacity == 2 or capacity == 3:
+        return True
+
+    if capacity == 1 or capacity % 2 == 0:
+        return False
+
+    factor = 3
+    while factor ** 2 <= capacity:
+        if capacity % factor == 0:
+            return False
+        factor += 2
+
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Returns the smallest odd prime that is at least the given capacity,
+    as HashMap._next_prime() of hash_map_sc and hash_map_oa does.
+
+    :param capacity: The requested capacity.
+    :return: A prime capacity.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def next_table_prime(capacity: int) -> int:
+    """
+    Returns the smallest prime of GROWTH_PRIMES that is at least the given capacity.
+
+    :param capacity: The requested capacity.
+    :return: A prime capacity.
+    """
+    i = bisect_left(GROWTH_PRIMES, capacity)
+    if i == len(GROWTH_PRIMES):
+        raise ValueError(f"capacity {capacity} is beyond the growth prime table")
+    return GROWTH_PRIMES[i]
+
+
+def next_power_of_two(capacity: int) -> int:
+    """
+    Returns the smallest power of two that is at least the given capacity.
+
+    :param capacity: The requested capacity.
+    :return: A power-of-two capacity.
+    """
+    return 1 << max(capacity - 1, 0).bit_length()
+
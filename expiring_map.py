@@ -0,0 +1,425 @@
+# Course: CS261 - Data Structures
+# Description:Map with per-key expiry. ExpiringMap.put(key, value, ttl=seconds) stores a
+# pair that disappears once its time to live has passed; expiry works as in Redis:
+#
+#   lazy     get(), contains_key() and friends treat an expired key as absent and
+#            remove it when they run into it
+#   active   every interval a sweep samples SWEEP_SAMPLES keys that carry a TTL,
+#            removes the expired ones, and samples again while more than SWEEP_REPEAT
+#            of a sample had expired, for at most SWEEP_SLICE seconds; the interval
+#            halves (down to min_interval) each time a sweep runs out of time, and
+#            doubles (up to interval) each time one does not, so the sweeps take at
+#            most SWEEP_SLICE / min_interval of the CPU
+#
+# so keys that are never read again are still reclaimed, a little at a time, instead
+# of by an external loop that walks the table and calls remove() on each key. Keys with
+# a TTL are also kept in an array, which is what makes sampling them O(1).
+#
+# A due sweep runs inside whichever put() or lookup comes next, like Redis's expire
+# cycle runs inside its event loop; a background thread runs it only when the map is
+# idle. Under the GIL a second thread adds no parallelism, and one that waits for the
+# lock while calls keep taking it starves, and slows those calls, too.
+#
+# Pairs live in an engine (hash_map_oa by default) whose values are small item records.
+# Every method takes one lock, so the map may be shared by threads. get_size() counts
+# expired keys that have not been removed yet, like Redis's DBSIZE.
+
+import random
+import threading
+import time
+
+import hash_map_oa
+from a6_include import DynamicArray, hash_function_1
+
+# keys checked per sample
+SWEEP_SAMPLES = 20
+# sample again while more than this fraction of a sample had expired
+SWEEP_REPEAT = 0.25
+# longest a sweep may run, in seconds
+SWEEP_SLICE = 0.001
+
+
+class _Item:
+    """A stored pair, its deadline and its position among the keys with a TTL."""
+
+    __slots__ = ('key', 'value', 'deadline', 'slot')
+
+    def __init__(self, key: str, value: object) -> None:
+        self.key = key
+        self.value = value
+        self.deadline = None
+        self.slot = -1
+
+
+class ExpiringMap:
+    def __init__(self, capacity: int = 11, function=hash_function_1, engine=hash_map_oa.HashMap,
+                 interval: float = 0.1, min_interval: float = 0.005, clock=time.monotonic,
+                 seed: int = None) -> None:
+        """
+        Initialize an empty map. Sweeps, and the idle sweeper thread, start with the first TTL
+
+        :param capacity: The initial capacity of the engine.
+        :param function: The hash function applied to keys, or a registered name.
+        :param engine: The engine class, constructed as engine(capacity, function).
+        :param interval: Seconds between sweeps when few keys are expiring, or None
+            to leave expired keys that are never read to sweep().
+        :param min_interval: The shortest interval the sweeper adapts down to.
+        :param clock: Returns the current time in seconds; TTLs are relative to it.
+        :param seed: Seed of the sampling, for repeatable sweeps.
+        """
+        self._map = engine(capacity, function)
+        self._volatile = []
+        self._clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._interval = interval
+        self._min_interval = min_interval
+        # seconds between sweeps, and perf_counter() time of the next one
+        self._period = interval
+        self._next_sweep = None
+        self._sweeper = None
+        self._closed = threading.Event()
+        self._expired_lazy = 0
+        self._expired_swept = 0
+        self._sweeps = 0
+
+    def get_size(self) -> int:
+        """
+        Return the number of stored keys, including expired keys not yet removed
+        """
+        return self._map.get_size()
+
+    def counters(self) -> dict:
+        """
+        Returns the number of keys with a TTL, of expired keys removed when they were
+        read and by the sweeper, and of sweeps run.
+
+        :return: Dictionary with keys volatile, expired_lazy, expired_swept and sweeps.
+        """
+        with self._lock:
+            return {
+                'volatile': len(self._volatile),
+                'expired_lazy': self._expired_lazy,
+                'expired_swept': self._expired_swept,
+                'sweeps': self._sweeps,
+            }
+
+    # ------------------------------------------------------------------ #
+
+    def _set_deadline(self, item: _Item, deadline: float | None) -> None:
+        """
+        Gives an item a deadline, or none, keeping the array of keys with a TTL
+        in step. Must be called with the lock held.
+
+        :param item: The item.
+        :param deadline: The clock time the item expires at, or None.
+        :return: None
+        """
+        if deadline is not None and item.slot == -1:
+            item.slot = len(self._volatile)
+            self._volatile.append(item)
+            if self._next_sweep is None and self._interval is not None:
+                self._next_sweep = time.perf_counter() + self._period
+        elif deadline is None and item.slot != -1:
+            self._forget(item)
+        item.deadline = deadline
+
+    def _forget(self, item: _Item) -> None:
+        """
+        Removes an item from the array of keys with a TTL by moving the last one
+        into its place. Must be called with the lock held.
+
+        :param item: The item.
+        :return: None
+        """
+        last = self._volatile.pop()
+        if last is not item:
+            last.slot = item.slot
+            self._volatile[item.slot] = last
+        item.slot = -1
+
+    def _drop(self, item: _Item) -> None:
+        """
+        Removes an item from the engine and the array. Must be called with the lock held.
+
+        :param item: The item.
+        :return: None
+        """
+        self._map.remove(item.key)
+        if item.slot != -1:
+            self._forget(item)
+
+    def _live(self, key: str) -> _Item | None:
+        """
+        Looks up a key, removing it if it has expired, after running a due sweep.
+        Must be called with the lock held.
+
+        :param key: The key.
+        :return: The item, or None if the key is absent or has expired.
+        """
+        if self._next_sweep is not None and time.perf_counter() >= self._next_sweep:
+            self._sweep_due()
+        item = self._map.get(key)
+        if item is not None and item.deadline is not None and item.deadline <= self._clock():
+            self._drop(item)
+            self._expired_lazy += 1
+            return None
+        return item
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Inserts or updates a pair. As with Redis SET, an update without a TTL makes
+        the key persistent again.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :param ttl: Seconds until the key expires, or None to keep it until removed.
+        :return: None
+        """
+        if ttl is not None and ttl <= 0:
+            self.remove(key)
+            return
+        with self._lock:
+            if self._next_sweep is not None and time.perf_counter() >= self._next_sweep:
+                self._sweep_due()
+            item = self._map.get(key)
+            if item is None:
+                item = _Item(key, value)
+                self._map.put(key, item)
+            else:
+                item.value = value
+            self._set_deadline(item, None if ttl is None else self._clock() + ttl)
+        if ttl is not None:
+            self._start_sweeper()
+
+    def expire(self, key: str, ttl: float | None) -> bool:
+        """
+        Sets or clears the TTL of a stored key.
+
+        :param key: The key.
+        :param ttl: Seconds until the key expires, or None to make it persistent.
+        :return: True if the key was present, False otherwise.
+        """
+        with self._lock:
+            item = self._live(key)
+            if item is None:
+                return False
+            if ttl is not None and ttl <= 0:
+                self._drop(item)
+                return True
+            self._set_deadline(item, None if ttl is None else self._clock() + ttl)
+        if ttl is not None:
+            self._start_sweeper()
+        return True
+
+    def ttl(self, key: str) -> float | None:
+        """
+        Returns the seconds a key has left to live.
+
+        :param key: The key.
+        :return: The remaining seconds, or None if the key is persistent or absent.
+        """
+        with self._lock:
+            item = self._live(key)
+            if item is None or item.deadline is None:
+                return None
+            return item.deadline - self._clock()
+
+    def get(self, key: str, default: object = None) -> object:
+        """
+        Retrieves the value of a key that has not expired.
+
+        :param key: The key to search for.
+        :param default: The value returned if the key is absent or expired.
+        :return: The value, or default.
+        """
+        with self._lock:
+            item = self._live(key)
+            return default if item is None else item.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if a key is present and has not expired.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        with self._lock:
+            return self._live(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the pair associated with the given key, if any.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        with self._lock:
+            item = self._map.get(key)
+            if item is not None:
+                self._drop(item)
+
+    def clear(self) -> None:
+        """
+        Removes every pair.
+
+        :return: None
+        """
+        with self._lock:
+            self._map.clear()
+            self._volatile = []
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of the keys and values that have
+        not expired.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        with self._lock:
+            now = self._clock()
+            pairs = self._map.get_keys_and_values()
+            out = DynamicArray()
+            for i in range(pairs.length()):
+                key, item = pairs[i]
+                if item.deadline is None or item.deadline > now:
+                    out.append((key, item.value))
+            return out
+
+    # ------------------------------------------------------------------ #
+
+    def _sample(self) -> float:
+        """
+        Checks up to SWEEP_SAMPLES random keys with a TTL and removes the expired ones.
+        Must be called with the lock held.
+
+        :return: The fraction of the sample that had expired, 0.0 if there is no key
+            with a TTL.
+        """
+        volatile = self._volatile
+        count = min(SWEEP_SAMPLES, len(volatile))
+        if not count:
+            return 0.0
+        now = self._clock()
+        expired = 0
+        for _ in range(count):
+            if not volatile:
+                break
+            item = volatile[self._random.randrange(len(volatile))]
+            if item.deadline <= now:
+                self._drop(item)
+                expired += 1
+        self._expired_swept += expired
+        return expired / count
+
+    def _sweep(self, budget: float | None) -> tuple[int, bool]:
+        """
+        Samples keys with a TTL, removing the expired ones, for as long as more than
+        SWEEP_REPEAT of each sample had expired and the time budget lasts. Must be
+        called with the lock held.
+
+        :param budget: The most seconds to spend, or None for no limit.
+        :return: Tuple of (keys removed, True if the budget ran out).
+        """
+        before = self._expired_swept
+        start = time.perf_counter()
+        exhausted = False
+        while self._sample() > SWEEP_REPEAT:
+            if budget is not None and time.perf_counter() - start >= budget:
+                exhausted = True
+                break
+        self._sweeps += 1
+        return self._expired_swept - before, exhausted
+
+    def _sweep_due(self) -> None:
+        """
+        Runs a scheduled sweep and schedules the next one, sooner if this one ran
+        out of time and later if it did not. Must be called with the lock held.
+
+        :return: None
+        """
+        _, exhausted = self._sweep(SWEEP_SLICE)
+        if exhausted:
+            self._period = max(self._min_interval, self._period / 2)
+        else:
+            self._period = min(self._interval, self._period * 2)
+        self._next_sweep = time.perf_counter() + self._period
+
+    def sweep(self, budget: float = None) -> int:
+        """
+        Runs one active expiry cycle now, whatever the schedule.
+
+        :param budget: The most seconds to spend, or None for no limit.
+        :return: The number of keys removed.
+        """
+        with self._lock:
+            return self._sweep(budget)[0]
+
+    def _sweep_when_idle(self) -> None:
+        """
+        Background loop that runs due sweeps no call has picked up; it skips a sweep
+        rather than wait for a busy lock.
+
+        :return: None
+        """
+        while not self._closed.wait(self._period):
+            if (self._next_sweep is not None and time.perf_counter() >= self._next_sweep
+                    and self._lock.acquire(blocking=False)):
+                try:
+                    self._sweep_due()
+                finally:
+                    self._lock.release()
+
+    def _start_sweeper(self) -> None:
+        """
+        Starts the sweeper thread if there should be one and it is not running.
+
+        :return: None
+        """
+        if self._sweeper is None and self._interval is not None and not self._closed.is_set():
+            with self._lock:
+                if self._sweeper is None:
+                    self._sweeper = threading.Thread(target=self._sweep_when_idle,
+                                                     name='ttl-sweeper', daemon=True)
+                    self._sweeper.start()
+
+    def close(self) -> None:
+        """
+        Stops the idle sweeper thread; calls still run due sweeps.
+
+        :return: None
+        """
+        self._closed.set()
+        if self._sweeper is not None:
+            self._sweeper.join()
+
+    def __enter__(self) -> "ExpiringMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nlazy expiry")
+    print("-----------")
+    now = [0.0]
+    m = ExpiringMap(interval=None, clock=lambda: now[0])
+    m.put('session', 'alice', ttl=30)
+    m.put('config', 'on')
+    now[0] = 29.0
+    print(m.get('session'), round(m.ttl('session'), 3), m.ttl('config'))
+    now[0] = 30.0
+    print(m.get('session'), m.contains_key('config'), m.get_size())
+
+    print("\nsweeper")
+    print("-------")
+    with ExpiringMap(interval=0.01) as m:
+        for i in range(2000):
+            m.put('key' + str(i), i, ttl=0.05 if i % 4 else None)
+        time.sleep(0.5)
+        print(m.get_size(), m.counters())
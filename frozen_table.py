@@ -0,0 +1,260 @@
+# Course: CS261 - Data Structures
+# Description:Read-only open addressing table stored in a multiprocessing.shared_memory
+# segment. One process builds the table once; any process can then attach the segment
+# by name and look keys up directly in the shared bytes, without IPC and without
+# holding its own copy of the data. Meant for read-mostly data next to a ShardedMap
+# (sharded_map.py): changing a frozen table means building a new one.
+#
+# Segment layout (little-endian):
+#
+#   header  magic b'KVFT', format version, capacity, size, hash function name
+#   slots   capacity x (mixed hash u64, pair offset u64, key length u32, value length u32);
+#           a pair offset of 0 marks an empty slot
+#   pairs   for every key, its UTF-8 bytes followed by its pickled value
+#
+# The capacity is a power of two, at least twice the number of keys, and slots are
+# probed triangularly from mix64(hash) like the 'pow2' capacity policy. Keys are
+# str; values are any picklable object and are unpickled by every get().
+# The hash function is stored by name, so it must be registered in hash_functions,
+# and 'builtin' is refused because its string hashes differ between processes.
+
+import pickle
+import struct
+import sys
+from multiprocessing import parent_process, resource_tracker, shared_memory
+
+from capacity_policy import next_power_of_two
+from hash_functions import get_hash_function, mix64, persistent_name
+
+MAGIC = b'KVFT'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sIQQ32s')
+SLOT = struct.Struct('<QQII')
+
+# names of the segments created by this process, see _attach()
+_created = set()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """
+    Attaches an existing segment. Before Python 3.13 attaching registers the segment
+    with the resource tracker of the process, which unlinks it when that process
+    exits; processes that are neither its creator nor started from it by
+    multiprocessing (which share the creator's tracker) unregister it again.
+
+    :param name: The name of the segment.
+    :return: The attached segment.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, track=False)
+    segment = shared_memory.SharedMemory(name)
+    if name not in _created and parent_process() is None:
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+class FrozenTable:
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool) -> None:
+        """
+        Wraps a segment holding a frozen table; use build() or attach()
+
+        :param segment: The shared memory segment.
+        :param owner: True for the process that created the segment.
+        """
+        magic, version, capacity, size, function = HEADER.unpack_from(segment.buf, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            segment.close()
+            raise ValueError(f"shared memory segment {segment.name!r} is not a frozen table")
+        self._segment = segment
+        self._buf = segment.buf
+        self._owner = owner
+        self._capacity = capacity
+        self._size = size
+        self._function_name = function.rstrip(b'\0').decode('ascii')
+        self._hash_function = get_hash_function(self._function_name)
+
+    @classmethod
+    def build(cls, items, function='fnv1a', name: str = None) -> "FrozenTable":
+        """
+        Builds a frozen table in a new shared memory segment. The calling process
+        owns the segment and should unlink() it once no process needs it.
+
+        :param items: Iterable of (key, value) pairs; a later pair replaces an
+            earlier one with the same key.
+        :param function: A hash function registered in hash_functions, or its name.
+        :param name: The name of the segment, or None for a random one.
+        :return: The table, attached in this process.
+        """
+        function_name = persistent_name(function)
+        hash_function = get_hash_function(function_name)
+        pairs = {}
+        for key, value in items:
+            pairs[key] = (key.encode('utf-8'), pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+
+        capacity = next_power_of_two(max(2 * len(pairs), 1))
+        mask = capacity - 1
+        data = HEADER.size + capacity * SLOT.size
+        segment = shared_memory.SharedMemory(
+            name, create=True, size=data + sum(len(k) + len(v) for k, v in pairs.values()))
+        _created.add(segment.name)
+        buf = segment.buf
+        HEADER.pack_into(buf, 0, MAGIC, FORMAT_VERSION, capacity, len(pairs),
+                         function_name.encode('ascii'))
+        # a new segment is zero-filled, so every slot starts empty
+        offset = data
+        for key, (key_bytes, value_bytes) in pairs.items():
+            hashcode = mix64(hash_function(key))
+            index = hashcode & mask
+            j = 1
+            while SLOT.unpack_from(buf, HEADER.size + index * SLOT.size)[1]:
+                index = (index + j) & mask
+                j += 1
+            SLOT.pack_into(buf, HEADER.size + index * SLOT.size,
+                           hashcode, offset, len(key_bytes), len(value_bytes))
+            end = offset + len(key_bytes)
+            buf[offset:end] = key_bytes
+            buf[end:end + len(value_bytes)] = value_bytes
+            offset = end + len(value_bytes)
+        return cls(segment, True)
+
+    @classmethod
+    def attach(cls, name: str) -> "FrozenTable":
+        """
+        Attaches a frozen table built by any process.
+
+        :param name: The name of its segment, see get_name().
+        :return: The table.
+        """
+        return cls(_attach(name), False)
+
+    def get_name(self) -> str:
+        """
+        Return the name other processes attach the table by
+        """
+        return self._segment.name
+
+    def get_size(self) -> int:
+        """
+        Return the number of keys
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return the number of slots
+        """
+        return self._capacity
+
+    def _find(self, key: str) -> tuple:
+        """
+        Probes for a key in the shared slots.
+
+        :param key: The key to search for.
+        :return: The (hash, offset, key length, value length) slot of the key, or None.
+        """
+        buf = self._buf
+        mask = self._capacity - 1
+        hashcode = mix64(self._hash_function(key))
+        key_bytes = key.encode('utf-8')
+        index = hashcode & mask
+        j = 1
+        while True:
+            slot = SLOT.unpack_from(buf, HEADER.size + index * SLOT.size)
+            if not slot[1]:
+                return None
+            if slot[0] == hashcode and slot[2] == len(key_bytes) \
+                    and buf[slot[1]:slot[1] + slot[2]] == key_bytes:
+                return slot
+            index = (index + j) & mask
+            j += 1
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        slot = self._find(key)
+        if slot is None:
+            return None
+        start = slot[1] + slot[2]
+        return pickle.loads(self._buf[start:start + slot[3]])
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the table contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._find(key) is not None
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of a batch of keys.
+
+        :param keys: Iterable of keys.
+        :return: List of values (None for missing keys), in the order of keys.
+        """
+        get = self.get
+        return [get(key) for key in keys]
+
+    def items(self):
+        """
+        Iterate over the (key, value) pairs in slot order
+        """
+        buf = self._buf
+        for index in range(self._capacity):
+            _, offset, key_length, value_length = SLOT.unpack_from(buf, HEADER.size + index * SLOT.size)
+            if offset:
+                end = offset + key_length
+                yield str(buf[offset:end], 'utf-8'), pickle.loads(buf[end:end + value_length])
+
+    def close(self) -> None:
+        """
+        Detaches the table from this process; the segment stays available to others.
+
+        :return: None
+        """
+        if self._buf is not None:
+            self._buf.release()
+            self._buf = None
+            self._segment.close()
+
+    def unlink(self) -> None:
+        """
+        Detaches the table and destroys its segment. Only the process that built
+        the table may do so; processes still attached keep their mapping.
+
+        :return: None
+        """
+        if not self._owner:
+            raise RuntimeError("only the process that built a frozen table can unlink it")
+        self.close()
+        self._segment.unlink()
+        _created.discard(self._segment.name)
+
+    def __enter__(self) -> "FrozenTable":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nbuild and attach")
+    print("----------------")
+    with FrozenTable.build((('key' + str(i), i * i) for i in range(1000)), 'fnv1a') as table:
+        other = FrozenTable.attach(table.get_name())
+        print(table.get_size(), table.get_capacity(), other.get('key12'),
+              other.get('missing'), other.contains_key('key999'))
+        other.close()
@@ -0,0 +1,331 @@
+# Course: CS261 - Data Structures
+# Description:Registry of hash functions accepted by the HashMap engines.
+# Besides the two sample functions from a6_include, it provides well distributed
+# 64-bit hashes: FNV-1a, a seeded SipHash-2-4 and a wrapper around the built-in hash.
+# FNV-1a also has a vectorized NumPy implementation that hashes a whole batch of
+# keys at once; hash_batch() uses it when NumPy is installed and a function offers it.
+#
+# Every engine accepts either a callable or one of the registered names, e.g.
+# HashMap(11, 'fnv1a').
+#
+# mix64() scrambles an existing hash code so that its low bits are usable on their
+# own, which tables indexed by a bit mask (power-of-two capacities) rely on.
+
+from a6_include import hash_function_1, hash_function_2
+
+try:
+    import numpy as np
+except ImportError:  # the batched fast path is optional
+    np = None
+
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+
+FNV_OFFSET_BASIS = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+
+# fnv1a_batch() hashes longer keys one at a time: each byte position of the batch
+# costs one NumPy step, which a few long keys alone would not pay back
+BATCH_MAX_LENGTH = 256
+
+
+def _to_bytes(key) -> bytes:
+    """
+    Returns the bytes that are hashed for a key.
+
+    :param key: A str, bytes or any other object (hashed through str()).
+    :return: The key as bytes.
+    """
+    if isinstance(key, str):
+        return key.encode('utf-8')
+    if isinstance(key, (bytes, bytearray)):
+        return bytes(key)
+    return str(key).encode('utf-8')
+
+
+def fnv1a(key) -> int:
+    """
+    64-bit FNV-1a hash of the UTF-8 encoding of a key.
+
+    :param key: The key to hash.
+    :return: Unsigned 64-bit hash code.
+    """
+    h = FNV_OFFSET_BASIS
+    for byte in _to_bytes(key):
+        h = ((h ^ byte) * FNV_PRIME) & MASK_64
+    return h
+
+
+def fnv1a_batch(keys):
+    """
+    Vectorized 64-bit FNV-1a over a batch of keys; requires NumPy.
+    The keys are concatenated longest first, so the keys still long enough at
+    byte position c form a prefix, and each step gathers byte c of those keys
+    straight from the concatenation; memory stays proportional to the total
+    length of the keys. Keys over BATCH_MAX_LENGTH bytes are hashed by fnv1a().
+
+    :param keys: Sequence of keys.
+    :return: numpy.ndarray of uint64 hash codes, in the order of keys.
+    """
+    if np is None:
+        raise ImportError("fnv1a_batch requires numpy")
+    encoded = [_to_bytes(key) for key in keys]
+    n = len(encoded)
+    lengths = np.fromiter(map(len, encoded), dtype=np.int64, count=n)
+    hashes = np.full(n, FNV_OFFSET_BASIS, dtype=np.uint64)
+    if n == 0:
+        return hashes
+
+    long_keys = np.flatnonzero(lengths > BATCH_MAX_LENGTH)
+    for i in long_keys.tolist():
+        hashes[i] = fnv1a(encoded[i])
+    # longest keys first, so the keys still active at position c form a prefix
+    order = np.argsort(-lengths, kind='stable')[len(long_keys):]
+    if order.size == 0:
+        return hashes
+    lengths = lengths[order]
+    flat = np.frombuffer(b''.join(encoded[i] for i in order.tolist()), dtype=np.uint8)
+    starts = np.cumsum(lengths) - lengths
+    width = int(lengths[0])
+
+    # number of keys longer than each position
+    active = np.searchsorted(-lengths, -np.arange(width), side='left')
+    prime = np.uint64(FNV_PRIME)
+    sorted_hashes = hashes[order]
+    for column in range(width):
+        count = active[column]
+        sorted_hashes[:count] = (sorted_hashes[:count] ^ flat[starts[:count] + column]) * prime
+    hashes[order] = sorted_hashes
+    return hashes
+
+
+fnv1a.batch = fnv1a_batch
+
+
+def _rotl(x: int, bits: int) -> int:
+    """Rotate a 64-bit integer left by the given number of bits."""
+    return ((x << bits) | (x >> (64 - bits))) & MASK_64
+
+
+def siphash_2_4(data: bytes, k0: int, k1: int) -> int:
+    """
+    SipHash-2-4 of a byte string under the 128-bit key (k0, k1).
+
+    :param data: The bytes to hash.
+    :param k0: Low 64 bits of the key.
+    :param k1: High 64 bits of the key.
+    :return: Unsigned 64-bit hash code.
+    """
+    v0 = k0 ^ 0x736F6D6570736575
+    v1 = k1 ^ 0x646F72616E646F6D
+    v2 = k0 ^ 0x6C7967656E657261
+    v3 = k1 ^ 0x7465646279746573
+
+    def rounds(v0, v1, v2, v3, count):
+        for _ in range(count):
+            v0 = (v0 + v1) & MASK_64
+            v1 = _rotl(v1, 13) ^ v0
+            v0 = _rotl(v0, 32)
+            v2 = (v2 + v3) & MASK_64
+            v3 = _rotl(v3, 16) ^ v2
+            v0 = (v0 + v3) & MASK_64
+            v3 = _rotl(v3, 21) ^ v0
+            v2 = (v2 + v1) & MASK_64
+            v1 = _rotl(v1, 17) ^ v2
+            v2 = _rotl(v2, 32)
+        return v0, v1, v2, v3
+
+    length = len(data)
+    end = length - length % 8
+    for i in range(0, end, 8):
+        m = int.from_bytes(data[i:i + 8], 'little')
+        v3 ^= m
+        v0, v1, v2, v3 = rounds(v0, v1, v2, v3, 2)
+        v0 ^= m
+
+    m = ((length & 0xFF) << 56) | int.from_bytes(data[end:], 'little')
+    v3 ^= m
+    v0, v1, v2, v3 = rounds(v0, v1, v2, v3, 2)
+    v0 ^= m
+
+    v2 ^= 0xFF
+    v0, v1, v2, v3 = rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def make_siphash(seed: int = 0):
+    """
+    Builds a SipHash-2-4 key hash function for a given seed.
+    The default seed keeps hash codes stable across processes; pass a secret
+    seed to protect a map that stores untrusted keys against collision attacks.
+
+    :param seed: Up to 128 bits of key material.
+    :return: Function mapping a key to an unsigned 64-bit hash code.
+    """
+    k0 = seed & MASK_64
+    k1 = (seed >> 64) & MASK_64
+
+    def siphash(key) -> int:
+        return siphash_2_4(_to_bytes(key), k0, k1)
+
+    return siphash
+
+
+siphash = make_siphash()
+
+
+def builtin_hash(key) -> int:
+    """
+    The built-in hash() folded to an unsigned 64-bit integer.
+    String hashes are randomized per process unless PYTHONHASHSEED is set,
+    so these hash codes must not be persisted.
+
+    :param key: The key to hash.
+    :return: Unsigned 64-bit hash code.
+    """
+    return hash(key) & MASK_64
+
+
+def mix64(hashcode: int) -> int:
+    """
+    Scrambles a hash code with the splitmix64 finalizer, so that every output
+    bit depends on every input bit, even for weak hash functions.
+
+    :param hashcode: The hash code of a key.
+    :return: Unsigned 64-bit mixed hash.
+    """
+    z = hashcode & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+def mix64_batch(hashes):
+    """
+    Vectorized mix64() over a uint64 NumPy array; requires NumPy.
+
+    :param hashes: numpy.ndarray of uint64 hash codes.
+    :return: numpy.ndarray of uint64 mixed hashes.
+    """
+    z = hashes.copy()
+    z ^= z >> np.uint64(30)
+    z *= np.uint64(0xBF58476D1CE4E5B9)
+    z ^= z >> np.uint64(27)
+    z *= np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return z
+
+
+def mixed(function):
+    """
+    Wraps a hash function so that its hash codes pass through mix64().
+    A vectorized implementation of the function is wrapped as well.
+
+    :param function: A hash function, or the name of a registered one.
+    :return: The wrapped hash function.
+    """
+    function = get_hash_function(function)
+
+    def mixed_function(key) -> int:
+        return mix64(function(key))
+
+    batch = getattr(function, 'batch', None)
+    if batch is not None:
+        mixed_function.batch = lambda keys: mix64_batch(batch(keys))
+    return mixed_function
+
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': fnv1a,
+    'siphash': siphash,
+    'builtin': builtin_hash,
+}
+
+
+def register_hash_function(name: str, function) -> None:
+    """
+    Adds a hash function to the registry. A vectorized implementation can be
+    attached as function.batch; it must return the same codes as function.
+
+    :param name: The name engines accept in place of the function.
+    :param function: Callable mapping a key to a non-negative integer.
+    :return: None
+    """
+    HASH_FUNCTIONS[name] = function
+
+
+def get_hash_function(function):
+    """
+    Resolves a hash function given either a callable or a registered name.
+
+    :param function: A callable, or the name of a registered function.
+    :return: The hash function.
+    """
+    if callable(function):
+        return function
+    try:
+        return HASH_FUNCTIONS[function]
+    except KeyError:
+        raise ValueError(f"unknown hash function {function!r}; "
+                         f"registered: {', '.join(HASH_FUNCTIONS)}") from None
+
+
+def persistent_name(function) -> str:
+    """
+    Returns the registered name of a hash function, for storage next to hash codes
+    that other processes, or later runs, will compare against.
+
+    :param function: A registered hash function, or its name.
+    :return: The registered name.
+    """
+    if not callable(function):
+        get_hash_function(function)
+        name = function
+    else:
+        names = [name for name, registered in HASH_FUNCTIONS.items() if registered is function]
+        if not names:
+            raise ValueError("hash codes can only be stored for a function registered in hash_functions")
+        name = names[0]
+    if name == 'builtin':
+        raise ValueError("builtin hashes differ between processes; use 'fnv1a' or 'siphash'")
+    return name
+
+
+def hash_batch(function, keys) -> list:
+    """
+    Hashes a batch of keys, using the function's vectorized implementation
+    when it has one and NumPy is available.
+
+    :param function: A hash function, or the name of a registered one.
+    :param keys: Sequence of keys.
+    :return: List of hash codes, in the order of keys.
+    """
+    function = get_hash_function(function)
+    batch = getattr(function, 'batch', None)
+    if batch is not None and np is not None:
+        return batch(keys).tolist()
+    return [function(key) for key in keys]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nanagrams")
+    print("--------")
+    for name, function in HASH_FUNCTIONS.items():
+        print(f"{name:<16}", [function(key) % 11 for key in ('abc', 'bca', 'cab')])
+
+    print("\nSipHash-2-4 reference vectors")
+    print("-----------------------------")
+    k0 = int.from_bytes(bytes(range(8)), 'little')
+    k1 = int.from_bytes(bytes(range(8, 16)), 'little')
+    print(hex(siphash_2_4(b'', k0, k1)), hex(0x726FDB47DD0E0E31))
+    print(hex(siphash_2_4(bytes(range(15)), k0, k1)), hex(0xA129CA6149BE45E5))
+
+    print("\nbatched FNV-1a")
+    print("--------------")
+    keys = ['', 'a', 'key1', 'some longer key', 'ключ']
+    print(hash_batch('fnv1a', keys) == [fnv1a(key) for key in keys])
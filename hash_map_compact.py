@@ -0,0 +1,434 @@
+# Course: CS261 - Data Structures
+# Description:Array-backed variant of the open addressing HashMap in hash_map_oa.
+# Instead of one HashEntry object per slot, the table is stored as parallel arrays:
+# a list of keys, a list of values, an unsigned 64-bit array of cached hash codes
+# and a one-byte-per-slot state array (empty, live or tombstone).
+# The public API (put, get, remove, contains_key, get_keys_and_values, iteration,
+# resize_table, table_load, empty_buckets, clear) matches hash_map_oa.HashMap.
+
+from array import array
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from bulk_ops import BulkOps
+from capacity_policy import is_prime, next_prime
+from hash_functions import get_hash_function, hash_batch
+
+# slot states stored in the state array
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# cached hash codes are kept as unsigned 64-bit integers
+HASH_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+class HashMap(BulkOps):
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that uses quadratic probing
+        for collision resolution and parallel arrays for storage
+
+        :param capacity: The initial number of slots, rounded up to a prime.
+        :param function: The hash function applied to keys,
+            or the name of one registered in hash_functions.
+        """
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+        self._tombstones = 0
+
+    @classmethod
+    def _bulk_capacity(cls, expected_size: int, **options) -> int:
+        """
+        Returns the capacity from_items() builds a map of the given size with:
+        twice the size, so the load factor stays below 0.5.
+
+        :param expected_size: The number of pairs.
+        :param options: The constructor arguments, which do not affect it.
+        :return: The requested capacity, rounded up to a prime by the constructor.
+        """
+        return max(2 * expected_size, 1)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            state = self._states[i]
+            if state == EMPTY:
+                entry = None
+            else:
+                entry = f"K: {self._keys[i]} V: {self._values[i]} TS: {state == TOMBSTONE}"
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage arrays with empty arrays of the given capacity.
+
+        :param capacity: The number of slots to allocate.
+        :return: None
+        """
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = array('Q', bytes(8 * capacity))
+        self._states = bytearray(capacity)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """
+        Return the number of tombstones in the table
+        """
+        return self._tombstones
+
+    # ------------------------------------------------------------------ #
+
+    def _find_slot(self, key: str, hashcode: int) -> int:
+        """
+        Finds the slot holding the live entry for the given key.
+
+        :param key: The key to search for.
+        :param hashcode: The masked hash code of the key.
+        :return: The slot index, or -1 if the key is not present.
+        """
+        states = self._states
+        hashes = self._hashes
+        keys = self._keys
+        capacity = self._capacity
+        initial = hashcode % capacity
+        index = initial
+        j = 1
+        while states[index] != EMPTY:
+            if states[index] == LIVE and hashes[index] == hashcode and keys[index] == key:
+                return index
+            if j > capacity // 2:
+                # every distinct quadratic probe position has been visited
+                return -1
+            index = (initial + j * j) % capacity
+            j += 1
+        return -1
+
+    def probe_length(self, key: str) -> int:
+        """
+        Counts the slots a lookup of the given key inspects,
+        including the slot that ends the search.
+
+        :param key: The key to look up.
+        :return: The number of slots inspected.
+        """
+        hashcode = self._hash_function(key) & HASH_MASK
+        initial = hashcode % self._capacity
+        index = initial
+        j = 1
+        while self._states[index] != EMPTY:
+            if self._states[index] == LIVE and self._hashes[index] == hashcode and self._keys[index] == key:
+                break
+            if j > self._capacity // 2:
+                break
+            index = (initial + j * j) % self._capacity
+            j += 1
+        return j
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair in the hash map.
+        The table grows once live entries reach a load of 0.5. When live entries
+        plus tombstones reach it first, the tombstones are purged in place if live
+        entries fill less than a quarter of the table, and the table grows otherwise.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        if self.table_load() >= 0.5:
+            self.resize_table(self._capacity * 2)
+        elif (self._size + self._tombstones) / self._capacity >= 0.5:
+            # a purge at the same capacity leaves room for few inserts when many
+            # entries are live, and would be repeated soon after; grow instead
+            if self.table_load() < 0.25:
+                self.purge_tombstones()
+            else:
+                self.resize_table(self._capacity * 2)
+        self._insert(key, value, self._hash_function(key) & HASH_MASK)
+
+    def _insert(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Inserts or updates a pair whose masked hash code is already known,
+        without checking the load factor.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :param hashcode: The masked hash code of the key.
+        :return: None
+        """
+        states = self._states
+        capacity = self._capacity
+        initial = hashcode % capacity
+        index = initial
+        free = -1
+        j = 1
+        while states[index] != EMPTY:
+            if states[index] == LIVE:
+                if self._hashes[index] == hashcode and self._keys[index] == key:
+                    self._values[index] = value
+                    return
+            elif free == -1:
+                free = index
+            if j > capacity // 2:
+                # every distinct quadratic probe position has been visited
+                break
+            index = (initial + j * j) % capacity
+            j += 1
+        if free != -1:
+            index = free
+            self._tombstones -= 1
+        self._keys[index] = key
+        self._values[index] = value
+        self._hashes[index] = hashcode
+        states[index] = LIVE
+        self._size += 1
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of entries
+        without put() having to resize it or purge tombstones. Growth at least
+        doubles the capacity, so repeated small reservations stay amortized.
+
+        :param count: The number of entries the table must hold.
+        :return: None
+        """
+        if count * 2 > self._capacity:
+            self._rehash(next_prime(max(count, self._capacity) * 2))
+        elif (count + self._tombstones) * 2 > self._capacity:
+            # as in put(), only purge in place when a quarter or less is live
+            self._rehash(self._capacity if count * 4 < self._capacity
+                         else next_prime(self._capacity * 2))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the internal hash map table to the specified capacity.
+        Live entries are placed directly from their cached hash codes.
+
+        :param new_capacity: The new capacity for the hash map table.
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+        elif is_prime(new_capacity):
+            capacity = new_capacity
+        else:
+            capacity = next_prime(new_capacity)
+
+        # keep growing until the load stays below 0.5 while re-inserting
+        while self._size and (self._size - 1) / capacity >= 0.5:
+            capacity = next_prime(capacity * 2)
+
+        self._rehash(capacity)
+
+    def purge_tombstones(self) -> None:
+        """
+        Rebuilds the table in place at its current capacity, dropping every
+        tombstone so probe sequences only pass over live entries.
+
+        :return: None
+        """
+        self._rehash(self._capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Moves every live entry into new arrays of the given prime capacity,
+        placing it from its cached hash code.
+
+        :param capacity: The prime capacity of the new table.
+        :return: None
+        """
+        old_keys, old_values = self._keys, self._values
+        old_hashes, old_states = self._hashes, self._states
+        self._capacity = capacity
+        self._allocate(capacity)
+        keys, values = self._keys, self._values
+        hashes, states = self._hashes, self._states
+        for i in range(len(old_states)):
+            if old_states[i] != LIVE:
+                continue
+            hashcode = old_hashes[i]
+            initial = hashcode % capacity
+            index = initial
+            j = 1
+            while states[index] != EMPTY:
+                index = (initial + j * j) % capacity
+                j += 1
+            keys[index] = old_keys[i]
+            values[index] = old_values[i]
+            hashes[index] = hashcode
+            states[index] = LIVE
+        self._tombstones = 0
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the current load factor of the hash map.
+
+        :return: The load factor as a float.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Counts and returns the number of empty buckets (null or tombstone) in the hash map.
+
+        :return: The count of empty buckets.
+        """
+        return self._capacity - self._size
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        index = self._find_slot(key, self._hash_function(key) & HASH_MASK)
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the hash map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._find_slot(key, self._hash_function(key) & HASH_MASK) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._delete(key, self._hash_function(key) & HASH_MASK)
+
+    def _delete(self, key: str, hashcode: int) -> bool:
+        """
+        Removes the entry for a key whose masked hash code is already known.
+
+        :param key: The key to remove.
+        :param hashcode: The masked hash code of the key.
+        :return: True if the key was present, False otherwise.
+        """
+        index = self._find_slot(key, hashcode)
+        if index == -1:
+            return False
+        # drop the references so removed keys and values can be collected
+        self._keys[index] = None
+        self._values[index] = None
+        self._states[index] = TOMBSTONE
+        self._tombstones += 1
+        self._size -= 1
+        return True
+
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Hashes a batch of keys, masked like the hash codes put() stores.
+
+        :param keys: The keys.
+        :return: Their masked hash codes.
+        """
+        return [hashcode & HASH_MASK for hashcode in hash_batch(self._hash_function, keys)]
+
+    def _get_hashed(self, key: str, hashcode: int) -> object:
+        """
+        Retrieves the value of a key whose masked hash code is already known.
+
+        :param key: The key to search for.
+        :param hashcode: The masked hash code of the key.
+        :return: The value, or None if the key is not found.
+        """
+        index = self._find_slot(key, hashcode)
+        return self._values[index] if index != -1 else None
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the hash map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        arr = DynamicArray()
+        for i in range(self._capacity):
+            if self._states[i] == LIVE:
+                arr.append((self._keys[i], self._values[i]))
+        return arr
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, removing all key-value pairs.
+
+        :return: None
+        """
+        self.__init__(self._capacity, self._hash_function)
+
+    def __iter__(self):
+        """
+        Iterate over the live entries as HashEntry objects,
+        matching the items produced by hash_map_oa.HashMap
+        """
+        for i in range(self._capacity):
+            if self._states[i] == LIVE:
+                yield HashEntry(self._keys[i], self._values[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('missing'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    m.remove('21')
+    result = not m.contains_key('21')
+    for key in keys[2:]:
+        result &= m.contains_key(str(key))
+        result &= not m.contains_key(str(key + 1))
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\niteration example")
+    print("-----------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
@@ -0,0 +1,439 @@
+# Course: CS261 - Data Structures
+# Description:Thread-safe separate chaining HashMap for maps shared between threads.
+# Buckets are guarded by a fixed set of striped locks (bucket i by lock i % stripes),
+# so operations on buckets of different stripes run in parallel on free-threaded
+# CPython builds, instead of queueing behind one global lock. Resizing is serialized
+# by a separate resize lock and then takes every stripe lock, in order, while it
+# relinks the nodes into the new table.
+#
+# Consistency contract:
+# - put, get, contains_key, remove and the read-modify-write operations (increment,
+#   setdefault, compute, pop) are atomic with respect to each other.
+# - get_size() and table_load() sum per-stripe counters without locking: exact when
+#   no writes are in flight, otherwise some value between the sizes before and after
+#   the concurrent writes.
+# - keys(), values(), items(), iteration and get_keys_and_values() work on a
+#   point-in-time snapshot taken under all locks; they never raise and do not see
+#   later updates.
+# - compute() calls its function while holding a stripe lock, so the function must
+#   not use the map itself.
+
+import threading
+
+from a6_include import (DynamicArray, LinkedList, SLNode,
+                        hash_function_1, hash_function_2)
+from capacity_policy import next_table_prime
+from hash_functions import get_hash_function
+
+DEFAULT_STRIPES = 16
+
+
+class HashMap:
+    def __init__(self, capacity: int = 11, function=hash_function_1,
+                 stripes: int = DEFAULT_STRIPES) -> None:
+        """
+        Initialize new thread-safe HashMap that uses
+        separate chaining for collision resolution
+
+        :param capacity: The initial number of buckets, rounded up to a growth prime.
+        :param function: The hash function applied to keys,
+            or the name of one registered in hash_functions.
+        :param stripes: The number of locks guarding the buckets.
+        """
+        if stripes < 1:
+            raise ValueError("a concurrent HashMap needs at least one stripe")
+        self._hash_function = get_hash_function(function)
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._resize_lock = threading.Lock()
+        # buckets and capacity are replaced together, so a thread reading the
+        # tuple always sees a matching pair
+        self._table = self._new_table(next_table_prime(max(capacity, 1)))
+        # number of pairs in the buckets of each stripe
+        self._counts = [0] * stripes
+
+    @staticmethod
+    def _new_table(capacity: int) -> tuple[DynamicArray, int]:
+        """
+        Allocates an empty table.
+
+        :param capacity: The number of buckets.
+        :return: Tuple of (buckets, capacity).
+        """
+        return DynamicArray([LinkedList() for _ in range(capacity)]), capacity
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        buckets, capacity = self._table
+        out = ''
+        for i in range(capacity):
+            out += str(i) + ': ' + str(buckets[i]) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map, see the consistency contract above
+        """
+        return sum(self._counts)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table[1]
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_bucket(self, hashcode: int) -> tuple[LinkedList, int]:
+        """
+        Acquires the stripe lock of the bucket a hash code maps to. A resize that
+        completes between reading the table and acquiring the lock moves the key
+        to another bucket, so the table is checked again under the lock.
+
+        :param hashcode: The hash code of the key.
+        :return: Tuple of (bucket, stripe); the caller releases self._locks[stripe].
+        """
+        while True:
+            table = self._table
+            index = hashcode % table[1]
+            stripe = index % self._stripes
+            lock = self._locks[stripe]
+            lock.acquire()
+            if self._table is table:
+                return table[0][index], stripe
+            lock.release()
+
+    def _link(self, bucket: LinkedList, stripe: int, key: str, value: object,
+              hashcode: int) -> bool:
+        """
+        Links a new node into a locked bucket and counts it.
+
+        :param bucket: The bucket, whose stripe lock is held.
+        :param stripe: The stripe of the bucket.
+        :param key: The new key.
+        :param value: The value associated with the key.
+        :param hashcode: The hash code of the key.
+        :return: True if the map may have reached a load factor of 1.
+        """
+        bucket.insert(key, value, hashcode)
+        self._counts[stripe] += 1
+        # only sum every stripe once this one holds more than its share
+        capacity = self._table[1]
+        return self._counts[stripe] * self._stripes >= capacity and sum(self._counts) >= capacity
+
+    def _grow(self, capacity: int) -> None:
+        """
+        Doubles the capacity once the load factor reaches 1, unless another
+        thread already resized the table.
+
+        :param capacity: The capacity the caller saw when it triggered the resize.
+        :return: None
+        """
+        with self._resize_lock:
+            if self._table[1] == capacity and sum(self._counts) >= capacity:
+                self._rehash(next_table_prime(capacity * 2))
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Relinks every node into a new table of the given capacity.
+        The caller holds the resize lock; every stripe lock is taken here.
+
+        :param capacity: The capacity of the new table.
+        :return: None
+        """
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            old_buckets, old_capacity = self._table
+            buckets, capacity = self._new_table(capacity)
+            counts = [0] * self._stripes
+            for i in range(old_capacity):
+                for node in old_buckets[i]:
+                    index = node.hashcode % capacity
+                    buckets[index].insert_node(node)
+                    counts[index % self._stripes] += 1
+            self._counts = counts
+            self._table = (buckets, capacity)
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair. Adding a key that brings the load
+        factor to 1 doubles the capacity.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        hashcode = self._hash_function(key)
+        bucket, stripe = self._lock_bucket(hashcode)
+        try:
+            node = bucket.contains(key)
+            if node is not None:
+                node.value = value
+                return
+            capacity = self._table[1]
+            full = self._link(bucket, stripe, key, value, hashcode)
+        finally:
+            self._locks[stripe].release()
+        if full:
+            self._grow(capacity)
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        bucket, stripe = self._lock_bucket(self._hash_function(key))
+        try:
+            node = bucket.contains(key)
+            return None if node is None else node.value
+        finally:
+            self._locks[stripe].release()
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the hash map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        bucket, stripe = self._lock_bucket(self._hash_function(key))
+        try:
+            return bucket.contains(key) is not None
+        finally:
+            self._locks[stripe].release()
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self.pop(key)
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Removes a key and returns its value.
+
+        :param key: The key to remove.
+        :param default: The value returned when the key is not found.
+        :return: The removed value, or default if the key was not present.
+        """
+        bucket, stripe = self._lock_bucket(self._hash_function(key))
+        try:
+            node = bucket.remove_node(key)
+            if node is None:
+                return default
+            self._counts[stripe] -= 1
+            return node.value
+        finally:
+            self._locks[stripe].release()
+
+    def _upsert(self, key: str, update, missing):
+        """
+        Runs one atomic read-modify-write of a key under its stripe lock.
+
+        :param key: The key to update.
+        :param update: Called with the node of a present key; returns the result.
+        :param missing: Called for a missing key; returns (value to insert, result).
+        :return: The result of update or missing.
+        """
+        hashcode = self._hash_function(key)
+        bucket, stripe = self._lock_bucket(hashcode)
+        try:
+            node = bucket.contains(key)
+            if node is not None:
+                return update(node)
+            value, result = missing()
+            capacity = self._table[1]
+            full = self._link(bucket, stripe, key, value, hashcode)
+        finally:
+            self._locks[stripe].release()
+        if full:
+            self._grow(capacity)
+        return result
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        Atomically adds delta to the value of a key, inserting delta for a missing key.
+
+        :param key: The key whose value is incremented.
+        :param delta: The amount added to the value.
+        :return: The new value.
+        """
+        def update(node: SLNode) -> object:
+            node.value += delta
+            return node.value
+
+        return self._upsert(key, update, lambda: (delta, delta))
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Atomically returns the value of a key, inserting default first if it is missing.
+
+        :param key: The key to look up.
+        :param default: The value inserted for a missing key.
+        :return: The value of the key.
+        """
+        return self._upsert(key, lambda node: node.value, lambda: (default, default))
+
+    def compute(self, key: str, function) -> object:
+        """
+        Atomically replaces the value of a key with function(value), where value
+        is None for a missing key. The function runs under a stripe lock and must
+        not use the map; nothing is stored if it raises.
+
+        :param key: The key whose value is computed.
+        :param function: Maps the current value to the new one.
+        :return: The new value.
+        """
+        def update(node: SLNode) -> object:
+            node.value = function(node.value)
+            return node.value
+
+        def missing() -> tuple:
+            value = function(None)
+            return value, value
+
+        return self._upsert(key, update, missing)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table to at least the given capacity, growing further
+        if the pairs would not fit under a load factor of 1.
+
+        :param new_capacity: The new capacity for the hash map table.
+        :return: None
+        """
+        if new_capacity < 1:
+            return
+        with self._resize_lock:
+            capacity = next_table_prime(new_capacity)
+            size = sum(self._counts)
+            while size and (size - 1) / capacity >= 1:
+                capacity = next_table_prime(capacity * 2)
+            self._rehash(capacity)
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the current load factor of the hash map.
+
+        :return: The load factor as a float.
+        """
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the buckets without any pair, from a consistent snapshot.
+
+        :return: The count of empty buckets.
+        """
+        with self._resize_lock:
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                buckets, capacity = self._table
+                return sum(1 for i in range(capacity) if buckets[i].length() == 0)
+            finally:
+                for lock in reversed(self._locks):
+                    lock.release()
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, removing all key-value pairs. The capacity is kept.
+
+        :return: None
+        """
+        with self._resize_lock:
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                self._counts = [0] * self._stripes
+                self._table = self._new_table(self._table[1])
+            finally:
+                for lock in reversed(self._locks):
+                    lock.release()
+
+    def _snapshot(self) -> list:
+        """
+        Copies every pair while holding the resize lock and every stripe lock.
+
+        :return: List of (key, value) tuples.
+        """
+        with self._resize_lock:
+            for lock in self._locks:
+                lock.acquire()
+            try:
+                buckets, capacity = self._table
+                return [(node.key, node.value) for i in range(capacity) for node in buckets[i]]
+            finally:
+                for lock in reversed(self._locks):
+                    lock.release()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the hash map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        return DynamicArray(self._snapshot())
+
+    def keys(self):
+        """
+        Returns the keys of a point-in-time snapshot.
+
+        :return: Iterator of keys.
+        """
+        return (key for key, _ in self._snapshot())
+
+    def values(self):
+        """
+        Returns the values of a point-in-time snapshot.
+
+        :return: Iterator of values.
+        """
+        return (value for _, value in self._snapshot())
+
+    def items(self):
+        """
+        Returns the (key, value) pairs of a point-in-time snapshot.
+
+        :return: Iterator of (key, value) tuples.
+        """
+        return iter(self._snapshot())
+
+    def __iter__(self):
+        """
+        Iterate over a point-in-time snapshot as SLNode copies, which hold
+        .key and .value like the nodes yielded by hash_map_sc.HashMap
+        """
+        for key, value in self._snapshot():
+            yield SLNode(key, value)
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("\nconcurrent increments")
+    print("---------------------")
+    m = HashMap(11, hash_function_2)
+
+    def count(worker: int) -> None:
+        for i in range(2000):
+            m.increment('key' + str(i % 100))
+
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(count, range(8)))
+    print(m.get_size(), m.get_capacity(), m.get('key0'), sum(m.values()))
@@ -0,0 +1,572 @@
+# Course: CS261 - Data Structures
+# Description:File-backed variant of the open addressing HashMap in hash_map_oa, for
+# data larger than RAM and for instant startup. The table lives in one file that is
+# memory-mapped, so opening a table reads only its header, whatever its size, and a
+# lookup faults in just the pages it touches: one or two slot pages and the page
+# holding the record it compares.
+#
+# File layout (little-endian):
+#
+#   header  magic, capacity, size, tombstones, heap end, garbage bytes, hash function name
+#   slots   capacity x (hash u64, record offset u64); offset 0 marks an empty slot and
+#           offset 1 a tombstone
+#   heap    records appended in write order: key length u32, value length u32,
+#           UTF-8 key, pickled value
+#
+# Probing is quadratic over prime capacities, with the load factor kept below 0.5,
+# as in hash_map_oa. Updating or removing a key leaves its old record in the heap as
+# garbage; rehashing copies only live records, and the table is rehashed at its own
+# capacity once garbage fills half of the heap, so a file of frequently updated keys
+# stays bounded. Growth rehashes into a new file that
+# is synced and then renamed over the old one, so a crash during growth leaves the
+# previous table intact. Other changes are written through the mapping, and flush()
+# or close() makes them durable; a crash before that can leave a damaged table, so
+# pair the table with a write-ahead log (write_ahead_log.py) when that matters.
+#
+# One process may write a table at a time; any number may open it read-only, but
+# they keep seeing the file they opened if a writer grows it.
+
+import mmap
+import os
+import pickle
+import struct
+
+from a6_include import DynamicArray, HashEntry
+from capacity_policy import next_table_prime
+from hash_functions import MASK_64, get_hash_function, persistent_name
+
+MAGIC = b'KVMMAP\x00\x01'
+HEADER = struct.Struct('<8sQQQQQ32s')
+# size, tombstones, heap end, garbage: the header fields that change after creation
+COUNTS = struct.Struct('<QQQQ')
+COUNTS_OFFSET = 16
+SLOT = struct.Struct('<QQ')
+RECORD = struct.Struct('<II')
+
+# record offsets with a special meaning; real records start after the slot array
+EMPTY = 0
+TOMBSTONE = 1
+
+# the heap starts with room for this many bytes per slot, and at least MIN_HEAP bytes
+HEAP_PER_SLOT = 32
+MIN_HEAP = 4096
+
+# the heap is compacted once garbage records fill this fraction of it, but not before
+# they take MIN_GARBAGE bytes, so each rewrite of the file pays for many updates
+GARBAGE_FRACTION = 0.5
+MIN_GARBAGE = 2 ** 20
+
+
+def _create(path: str, capacity: int, function_name: str, heap: int) -> None:
+    """
+    Writes an empty table file, with every slot empty.
+
+    :param path: The file to create; an existing file is replaced.
+    :param capacity: The number of slots.
+    :param function_name: The registered name of the hash function.
+    :param heap: Bytes reserved for records.
+    :return: None
+    """
+    heap_start = HEADER.size + capacity * SLOT.size
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, capacity, 0, 0, heap_start, 0, function_name.encode('ascii')))
+        # the file is extended with zeros, i.e. empty slots
+        file.truncate(heap_start + heap)
+
+
+def _sync_directory(path: str) -> None:
+    """
+    Forces the directory entry of a renamed file to disk.
+
+    :param path: The file.
+    :return: None
+    """
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+class HashMap:
+    def __init__(self, path: str, capacity: int = 11, function='fnv1a',
+                 readonly: bool = False) -> None:
+        """
+        Opens the table stored at path, creating it if the file does not exist
+
+        :param path: The table file.
+        :param capacity: The initial number of slots of a new table, rounded up to a prime.
+        :param function: The hash function of a new table; it is stored by name,
+            so it must be registered in hash_functions. An existing table keeps its own.
+        :param readonly: Map the file read-only; changes raise TypeError.
+        """
+        self._path = path
+        self._readonly = readonly
+        if not os.path.exists(path):
+            if readonly:
+                raise FileNotFoundError(path)
+            capacity = next_table_prime(max(capacity, 2))
+            _create(path, capacity, persistent_name(function),
+                    max(MIN_HEAP, capacity * HEAP_PER_SLOT))
+        self._open()
+
+    def _open(self) -> None:
+        """
+        Maps the table file and reads its header; nothing else is read.
+
+        :return: None
+        """
+        self._file = open(self._path, 'rb' if self._readonly else 'r+b')
+        access = mmap.ACCESS_READ if self._readonly else mmap.ACCESS_WRITE
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=access)
+        if hasattr(self._mm, 'madvise'):
+            # lookups jump around the file, so reading ahead of them only wastes memory
+            self._mm.madvise(mmap.MADV_RANDOM)
+        magic, capacity, size, tombstones, heap_end, garbage, function = HEADER.unpack_from(self._mm)
+        if magic != MAGIC:
+            self._close_file()
+            raise ValueError(f"{self._path} is not a memory-mapped table")
+        self._capacity = capacity
+        self._size = size
+        self._tombstones = tombstones
+        self._heap_end = heap_end
+        self._garbage = garbage
+        self._function_name = function.rstrip(b'\0').decode('ascii')
+        self._hash_function = get_hash_function(self._function_name)
+
+    def _close_file(self) -> None:
+        """
+        Unmaps and closes the table file.
+
+        :return: None
+        """
+        self._mm.close()
+        self._file.close()
+
+    def _write_counts(self) -> None:
+        """
+        Stores the counters that changed in the header.
+
+        :return: None
+        """
+        COUNTS.pack_into(self._mm, COUNTS_OFFSET, self._size, self._tombstones,
+                         self._heap_end, self._garbage)
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            _, offset = self._slot(i)
+            if offset == EMPTY:
+                out += str(i) + ': None\n'
+            elif offset == TOMBSTONE:
+                out += str(i) + ': (tombstone)\n'
+            else:
+                key, value = self._record(offset)
+                out += str(i) + ': ' + str(HashEntry(key, value)) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def get_tombstone_count(self) -> int:
+        """
+        Return the number of tombstones in the slot array
+        """
+        return self._tombstones
+
+    def get_garbage_bytes(self) -> int:
+        """
+        Return the heap bytes held by records that were updated or removed
+        """
+        return self._garbage
+
+    def get_path(self) -> str:
+        """
+        Return the path of the table file
+        """
+        return self._path
+
+    # ------------------------------------------------------------------ #
+
+    def _slot(self, index: int) -> tuple[int, int]:
+        """
+        Reads one slot.
+
+        :param index: The slot index.
+        :return: Tuple of (hash, record offset).
+        """
+        return SLOT.unpack_from(self._mm, HEADER.size + index * SLOT.size)
+
+    def _record(self, offset: int) -> tuple[str, object]:
+        """
+        Reads one record from the heap.
+
+        :param offset: The record offset.
+        :return: Tuple of (key, value).
+        """
+        key_length, value_length = RECORD.unpack_from(self._mm, offset)
+        start = offset + RECORD.size
+        key = self._mm[start:start + key_length].decode('utf-8')
+        start += key_length
+        return key, pickle.loads(self._mm[start:start + value_length])
+
+    def _record_size(self, offset: int) -> int:
+        """
+        Returns the number of heap bytes a record occupies.
+
+        :param offset: The record offset.
+        :return: The record size in bytes.
+        """
+        key_length, value_length = RECORD.unpack_from(self._mm, offset)
+        return RECORD.size + key_length + value_length
+
+    def _locate(self, key_bytes: bytes, hashcode: int) -> tuple[int, int]:
+        """
+        Finds the slot of a key, or the slot where it belongs, with one probe
+        sequence. Keys are only compared when the stored hash matches.
+
+        :param key_bytes: The UTF-8 encoded key.
+        :param hashcode: The hash code of the key.
+        :return: (slot, record offset) if the key is present, otherwise
+            (free slot, EMPTY), preferring the first tombstone on the way.
+        """
+        mm = self._mm
+        capacity = self._capacity
+        index = hashcode % capacity
+        initial = index
+        j = 1
+        free = -1
+        while True:
+            stored, offset = SLOT.unpack_from(mm, HEADER.size + index * SLOT.size)
+            if offset == EMPTY:
+                break
+            if offset == TOMBSTONE:
+                if free == -1:
+                    free = index
+            elif stored == hashcode:
+                key_length = RECORD.unpack_from(mm, offset)[0]
+                start = offset + RECORD.size
+                if key_length == len(key_bytes) and mm[start:start + key_length] == key_bytes:
+                    return index, offset
+            if j > capacity // 2:
+                break
+            index = (initial + j ** 2) % capacity
+            j += 1
+        return (index if free == -1 else free), EMPTY
+
+    def _append(self, record: bytes) -> int:
+        """
+        Appends a record to the heap, extending the file when it is full.
+
+        :param record: The encoded record.
+        :return: The offset of the record.
+        """
+        offset = self._heap_end
+        end = offset + len(record)
+        if end > len(self._mm):
+            self._mm.resize(max(end, 2 * len(self._mm)))
+        self._mm[offset:end] = record
+        self._heap_end = end
+        return offset
+
+    @staticmethod
+    def _encode(key_bytes: bytes, value: object) -> bytes:
+        """
+        Encodes one record.
+
+        :param key_bytes: The UTF-8 encoded key.
+        :param value: The value.
+        :return: The record.
+        """
+        value_bytes = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return RECORD.pack(len(key_bytes), len(value_bytes)) + key_bytes + value_bytes
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair. The table is rehashed into a new file
+        when live entries and tombstones reach half of the slots: at the same
+        capacity while live entries fill less than a quarter of the slots, so only
+        the tombstones are dropped, and at double the capacity otherwise.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        key_bytes = key.encode('utf-8')
+        hashcode = self._hash_function(key) & MASK_64
+        index, offset = self._locate(key_bytes, hashcode)
+        if offset == EMPTY and (self._size + self._tombstones + 1) / self._capacity >= 0.5:
+            capacity = self._capacity
+            # purging many live entries at the same capacity would only make room
+            # for a few inserts before the next rehash, so grow instead
+            if (self._size + 1) / capacity >= 0.25:
+                capacity = next_table_prime(capacity * 2)
+            self._rehash(capacity)
+            index, offset = self._locate(key_bytes, hashcode)
+        record = self._append(self._encode(key_bytes, value))
+        if offset != EMPTY:
+            self._garbage += self._record_size(offset)
+        else:
+            if self._slot(index)[1] == TOMBSTONE:
+                self._tombstones -= 1
+            self._size += 1
+        SLOT.pack_into(self._mm, HEADER.size + index * SLOT.size, hashcode, record)
+        self._write_counts()
+        self._collect_garbage()
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        _, offset = self._locate(key.encode('utf-8'), self._hash_function(key) & MASK_64)
+        if offset == EMPTY:
+            return None
+        return self._record(offset)[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the hash map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._locate(key.encode('utf-8'), self._hash_function(key) & MASK_64)[1] != EMPTY
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._delete(key)
+
+    def _delete(self, key: str) -> bool:
+        """
+        Replaces the slot of a key with a tombstone.
+
+        :param key: The key to remove.
+        :return: True if the key was present.
+        """
+        hashcode = self._hash_function(key) & MASK_64
+        index, offset = self._locate(key.encode('utf-8'), hashcode)
+        if offset == EMPTY:
+            return False
+        self._garbage += self._record_size(offset)
+        SLOT.pack_into(self._mm, HEADER.size + index * SLOT.size, hashcode, TOMBSTONE)
+        self._size -= 1
+        self._tombstones += 1
+        self._write_counts()
+        self._collect_garbage()
+        return True
+
+    def _collect_garbage(self) -> None:
+        """
+        Rehashes the table at its capacity, dropping garbage records, once they fill
+        GARBAGE_FRACTION of the heap and at least MIN_GARBAGE bytes.
+
+        :return: None
+        """
+        heap = self._heap_end - HEADER.size - self._capacity * SLOT.size
+        if self._garbage >= MIN_GARBAGE and self._garbage >= GARBAGE_FRACTION * heap:
+            self._rehash(self._capacity)
+
+    def put_many(self, keys, values) -> None:
+        """
+        Inserts or updates a batch of pairs.
+
+        :param keys: Sequence of keys.
+        :param values: Sequence of values, aligned with keys.
+        :return: None
+        """
+        keys, values = list(keys), list(values)
+        if len(keys) != len(values):
+            raise ValueError("keys and values must have the same length")
+        for key, value in zip(keys, values):
+            self.put(key, value)
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of a batch of keys.
+
+        :param keys: Sequence of keys.
+        :return: List of values (None for missing keys), in the order of keys.
+        """
+        get = self.get
+        return [get(key) for key in keys]
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes a batch of keys.
+
+        :param keys: Sequence of keys.
+        :return: List of booleans, True where a key was removed.
+        """
+        delete = self._delete
+        return [delete(key) for key in keys]
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Rehashes the table into a new file with at least the given capacity,
+        growing further if the pairs would not fit under a load factor of 0.5.
+        Tombstones and garbage records are dropped.
+
+        :param new_capacity: The new capacity for the hash map table.
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+        capacity = next_table_prime(max(new_capacity, 2))
+        while self._size and (self._size - 1) / capacity >= 0.5:
+            capacity = next_table_prime(capacity * 2)
+        self._rehash(capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Copies every live record into a new table file using the stored hash codes,
+        syncs it and renames it over the current file.
+
+        :param capacity: The prime capacity of the new table.
+        :return: None
+        """
+        if self._readonly:
+            raise TypeError("a read-only table cannot be changed")
+        temporary = self._path + '.rehash'
+        live = self._heap_end - HEADER.size - self._capacity * SLOT.size - self._garbage
+        _create(temporary, capacity, self._function_name,
+                max(MIN_HEAP, live, capacity * HEAP_PER_SLOT))
+        with open(temporary, 'r+b') as file:
+            mm = mmap.mmap(file.fileno(), 0)
+            heap_end = HEADER.size + capacity * SLOT.size
+            for i in range(self._capacity):
+                hashcode, offset = self._slot(i)
+                if offset <= TOMBSTONE:
+                    continue
+                end = offset + self._record_size(offset)
+                index = initial = hashcode % capacity
+                j = 1
+                while SLOT.unpack_from(mm, HEADER.size + index * SLOT.size)[1] != EMPTY:
+                    index = (initial + j ** 2) % capacity
+                    j += 1
+                SLOT.pack_into(mm, HEADER.size + index * SLOT.size, hashcode, heap_end)
+                mm[heap_end:heap_end + end - offset] = self._mm[offset:end]
+                heap_end += end - offset
+            COUNTS.pack_into(mm, COUNTS_OFFSET, self._size, 0, heap_end, 0)
+            mm.flush()
+            mm.close()
+            os.fsync(file.fileno())
+        self._close_file()
+        os.replace(temporary, self._path)
+        _sync_directory(self._path)
+        self._open()
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the current load factor of the hash map.
+
+        :return: The load factor as a float.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Counts the number of slots without a live entry.
+
+        :return: The count of empty slots.
+        """
+        return self._capacity - self._size
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, removing all key-value pairs. The capacity is kept
+        and the heap is shrunk back to its initial size.
+
+        :return: None
+        """
+        if self._readonly:
+            raise TypeError("a read-only table cannot be changed")
+        heap_start = HEADER.size + self._capacity * SLOT.size
+        self._mm[HEADER.size:heap_start] = bytes(heap_start - HEADER.size)
+        self._mm.resize(heap_start + max(MIN_HEAP, self._capacity * HEAP_PER_SLOT))
+        self._size = self._tombstones = self._garbage = 0
+        self._heap_end = heap_start
+        self._write_counts()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the hash map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        return DynamicArray([(entry.key, entry.value) for entry in self])
+
+    def __iter__(self):
+        """
+        Iterate over the live entries in slot order, as HashEntry objects
+        """
+        for i in range(self._capacity):
+            offset = self._slot(i)[1]
+            if offset > TOMBSTONE:
+                yield HashEntry(*self._record(offset))
+
+    def flush(self) -> None:
+        """
+        Writes every change made through the mapping back to the file.
+
+        :return: None
+        """
+        if not self._readonly:
+            self._mm.flush()
+
+    def close(self) -> None:
+        """
+        Flushes and closes the table.
+
+        :return: None
+        """
+        if self._mm.closed:
+            return
+        self.flush()
+        self._close_file()
+
+    def __enter__(self) -> "HashMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nreopen a table")
+    print("--------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'table.kv')
+        with HashMap(path) as m:
+            for i in range(100):
+                m.put('key' + str(i), i * 10)
+            m.remove('key5')
+            m.put('key6', 'six')
+        with HashMap(path, readonly=True) as m:
+            print(m.get_size(), m.get_capacity(), m.get('key6'), m.get('key5'),
+                  m.get('key99'), m.get_garbage_bytes(), m.table_load())
@@ -11,27 +11,132 @@
 # The get_keys_and_values method returns a DynamicArray of all key-value pairs, while clear resets the hash map.
 # Overall, these methods provide a versatile toolset for managing dynamic key-value data in a hash map structure.
 
+import time
+
 from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
                         hash_function_1, hash_function_2)
+from bulk_ops import BulkOps
+from capacity_policy import (check_capacity_policy, next_power_of_two,
+                             next_table_prime)
+from hash_functions import get_hash_function, hash_batch, mixed
+from map_stats import SAMPLED_OPERATIONS, MapStats
+from snapshot import SnapshotReader, SnapshotWriter, stored_function_name
+
+# placeholder left in the old table for entries already moved by an incremental rehash;
+# it is a tombstone so probe sequences through the slot stay intact
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
+
+# methods shadowed on the instance while statistics are collected, see map_stats
+_COUNTING_METHODS = ('_locate', '_lookup', '_delete', '_rehash', '_grow', '_migrate')
 
 
-class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+# Prime tables probe squares, which reach (capacity + 1) // 2 distinct slots.
+# Power-of-two tables probe triangular numbers instead, which reach every slot;
+# the probe loops tell them apart with `not capacity & (capacity - 1)`.
+
+
+class HashMap(BulkOps):
+    def __init__(self, capacity: int, function,
+                 incremental: bool = False, rehash_step: int = 8,
+                 capacity_policy: str = 'prime', collect_stats: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        :param capacity: The initial number of slots, rounded up to a capacity
+            allowed by the capacity policy.
+        :param function: The hash function applied to keys,
+            or the name of one registered in hash_functions.
+        :param incremental: When True, growth triggered by put() is spread over
+            later operations instead of rehashing the table at once.
+        :param rehash_step: Old slots migrated per operation in incremental mode.
+        :param capacity_policy: 'prime', 'prime_table' or 'pow2'; see capacity_policy.
+            Power-of-two tables probe triangular offsets instead of squares.
+        :param collect_stats: When True, statistics are kept from the start;
+            see enable_stats().
         """
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two under the 'pow2' policy
+        self._capacity_policy = check_capacity_policy(capacity_policy)
+        self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
-        self._hash_function = function
+        self._hash_function = get_hash_function(function)
+        # power-of-two tables keep only the low bits of a hash code, so mix them first
+        if capacity_policy == 'pow2':
+            self._hash = mixed(self._hash_function)
+        else:
+            self._hash = self._hash_function
         self._size = 0
-        self._index = 0
+        self._tombstones = 0
+        # bumped whenever keys are added or removed or entries move between slots,
+        # so that iterators can detect modification
+        self._version = 0
+
+        # incremental rehash state: the table being drained into self._buckets
+        self._incremental = incremental
+        self._rehash_step = rehash_step
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        self._stats = None
+        self._sampler = None
+        if collect_stats:
+            self.enable_stats()
+
+    @classmethod
+    def _bulk_capacity(cls, expected_size: int, **options) -> int:
+        """
+        Returns the capacity from_items() builds a map of the given size with:
+        twice the size, so the load factor stays below 0.5.
+
+        :param expected_size: The number of pairs.
+        :param options: The constructor arguments, which do not affect it.
+        :return: The requested capacity, rounded up by the constructor under its
+            capacity policy.
+        """
+        return max(2 * expected_size, 1)
+
+    def save(self, path) -> None:
+        """
+        Writes the map to a binary snapshot (see snapshot.py). The cached hash
+        codes are stored next to the pairs, so load() does not re-hash the keys.
+
+        :param path: A path, or a binary file object opened for writing.
+        :return: None
+        """
+        with SnapshotWriter(path, stored_function_name(self._hash_function),
+                            self._capacity_policy, self._size) as writer:
+            for entry in self:
+                writer.write(entry.key, entry.value, entry.hashcode)
+
+    @classmethod
+    def load(cls, path, function=None, capacity_policy: str = None) -> "HashMap":
+        """
+        Reads a map written by save(). The table is sized once for the recorded
+        number of pairs, then each block is bulk-inserted with its stored hash
+        codes; keys are only re-hashed if the map is loaded with another hash
+        function, or with a capacity policy that mixes hash codes differently.
+
+        :param path: A path, or a binary file object positioned at the snapshot.
+        :param function: The hash function, or None for the saved one.
+        :param capacity_policy: The capacity policy, or None for the saved one.
+        :return: The loaded map.
+        """
+        with SnapshotReader(path) as reader:
+            function, capacity_policy, reuse = reader.resolve(function, capacity_policy)
+            m = cls(max(2 * (reader.count or 1), 1), function, capacity_policy=capacity_policy)
+            for keys, values, hashes in reader.blocks():
+                if not reuse:
+                    hashes = m._hash_batch(keys)
+                m._reserve(m._size + len(keys))
+                for i in range(len(keys)):
+                    m._insert(keys[i], values[i], hashes[i])
+        return m
 
     def __str__(self) -> str:
         """
@@ -76,6 +181,23 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int, growth: bool = False) -> int:
+        """
+        Returns the smallest capacity allowed by the capacity policy
+        that is at least the given capacity. Under 'prime_table' only growth
+        steps use GROWTH_PRIMES; a capacity chosen by the caller or by bulk
+        loading is rounded to the next prime, not the next table entry.
+
+        :param capacity: The requested capacity.
+        :param growth: Whether the table is doubling its capacity.
+        :return: A prime capacity, or a power of two under the 'pow2' policy.
+        """
+        if self._capacity_policy == 'pow2':
+            return next_power_of_two(capacity)
+        if self._capacity_policy == 'prime_table' and growth:
+            return next_table_prime(capacity)
+        return self._next_prime(capacity)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -90,35 +212,125 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstone_count(self) -> int:
+        """
+        Return the number of tombstones in the current table
+        """
+        return self._tombstones
+
     # ------------------------------------------------------------------ #
 
     def put(self, key: str, value: object) -> None:
         """
         Inserts or updates a key-value pair in the hash map.
+        When a new key is added, the table grows once live entries reach a load
+        of 0.5. When live entries plus tombstones reach it first, the tombstones
+        are purged in place if live entries fill less than a quarter of the
+        table, and the table grows otherwise. Updating an existing key never resizes.
 
         :param key: The key to insert or update.
         :param value: The value associated with the key.
         :return: None
         """
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
-        hashcode = self._hash_function(key)
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        self._insert(key, value, self._hash(key))
+
+    def _insert(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Inserts or updates a pair whose hash code is already known,
+        without checking the load factor.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :param hashcode: The hash code of the key.
+        :return: None
+        """
+        entry, index = self._locate(key, hashcode)
+        if entry is not None:
+            entry.value = value
+        else:
+            self._add_entry(index, HashEntry(key, value, hashcode))
+
+    def _locate(self, key: str, hashcode: int) -> tuple[HashEntry | None, int]:
+        """
+        Finds the live entry of a key, or the slot of the current table where
+        the key belongs, with a single probe sequence.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: (entry, -1) if the key is present, otherwise (None, free slot index).
+        """
+        if self._old_buckets is not None:
+            index = self._find_index(self._old_buckets, self._old_capacity, key, hashcode)
+            if index != -1:
+                return self._old_buckets[index], -1
         index = hashcode % self._capacity
         initial = index
         j = 1
-        while True:
-            if self._buckets[index] is None or self._buckets[index].is_tombstone:
-                self._buckets[index] = HashEntry(key, value)
-                self._size += 1
+        free = -1
+        triangular = not self._capacity & (self._capacity - 1)
+        limit = self._capacity - 1 if triangular else self._capacity // 2
+        # the key may sit past a tombstone, so probe to the first empty slot
+        # and only then reuse the first tombstone seen on the way
+        while self._buckets[index] is not None:
+            if self._buckets[index].is_tombstone:
+                if free == -1:
+                    free = index
+            elif self._buckets[index].key == key:
+                return self._buckets[index], -1
+            if j > limit:
+                # every reachable probe position has been visited
                 break
+            index = (initial + (j * (j + 1) >> 1 if triangular else j ** 2)) % self._capacity
+            j += 1
+        if free != -1:
+            index = free
+        return None, index
+
+    def _add_entry(self, index: int, entry: HashEntry) -> None:
+        """
+        Stores a new entry in a free slot found by _locate(). If the table has to
+        grow or be purged of tombstones first, the slot is located again.
+
+        :param index: The free slot, empty or holding a tombstone.
+        :param entry: The entry to store.
+        :return: None
+        """
+        if self.table_load() >= 0.5:
+            self._grow()
+            index = self._locate(entry.key, entry.hashcode)[1]
+        elif (self._size + self._tombstones) / self._capacity >= 0.5:
+            # a purge at the same capacity leaves room for few inserts when many
+            # entries are live, and would be repeated soon after; grow instead
+            if self.table_load() < 0.25:
+                self.purge_tombstones()
             else:
-                if self._buckets[index].key == key:
-                    self._buckets[index] = HashEntry(key, value)
-                    break
-                else:
-                    index = (initial + j ** 2) % self._capacity
-                    j += 1
-        return
+                self._grow()
+            index = self._locate(entry.key, entry.hashcode)[1]
+        if self._buckets[index] is not None:
+            self._tombstones -= 1
+        self._buckets[index] = entry
+        self._size += 1
+        self._version += 1
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of entries
+        without put() having to resize it or purge tombstones. Growth at least
+        doubles the capacity, so repeated small reservations stay amortized.
+
+        :param count: The number of entries the table must hold.
+        :return: None
+        """
+        self._finish_rehash()
+        if count * 2 > self._capacity:
+            self._rehash(self._round_capacity(max(count, self._capacity) * 2,
+                                              count <= self._capacity))
+        elif (count + self._tombstones) * 2 > self._capacity:
+            # as in _add_entry(), only purge in place when a quarter or less is live
+            self._rehash(self._capacity if count * 4 < self._capacity
+                         else self._round_capacity(self._capacity * 2, growth=True))
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -129,23 +341,125 @@ class HashMap:
         """
         if new_capacity < self._size:
             return
-        elif self._is_prime(new_capacity):
-            self._capacity = new_capacity
+
+        self._finish_rehash()
+        if self._capacity_policy == 'prime' and self._is_prime(new_capacity):
+            capacity = new_capacity
         else:
-            self._capacity = self._next_prime(new_capacity)
+            capacity = self._round_capacity(new_capacity)
+
+        # grow further if re-inserting every entry would push the load past 0.5
+        while self._size and (self._size - 1) / capacity >= 0.5:
+            capacity = self._round_capacity(capacity * 2, growth=True)
+
+        self._rehash(capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Moves every live entry into a new table of the given capacity.
+        Entries are placed using their cached hash codes, so no key is re-hashed,
+        no entry is copied and tombstones are dropped.
 
+        :param capacity: The capacity of the new table, a prime or, under the
+            'pow2' policy, a power of two probed with triangular offsets.
+        :return: None
+        """
         new_buckets = DynamicArray()
-        for _ in range(self._capacity):
+        for _ in range(capacity):
             new_buckets.append(None)
 
-        arr_key_val = self.get_keys_and_values()
+        triangular = not capacity & (capacity - 1)
+        for i in range(self._buckets.length()):
+            entry = self._buckets[i]
+            if entry is None or entry.is_tombstone:
+                continue
+            initial = entry.hashcode % capacity
+            index = initial
+            j = 1
+            while new_buckets[index] is not None:
+                index = (initial + (j * (j + 1) >> 1 if triangular else j ** 2)) % capacity
+                j += 1
+            new_buckets[index] = entry
+
         self._buckets = new_buckets
-        self._size = 0
-        for i in range(arr_key_val.length()):
-            k = arr_key_val[i][0]
-            v = arr_key_val[i][1]
-            self.put(k, v)
-        return
+        self._capacity = capacity
+        self._tombstones = 0
+        self._version += 1
+
+    def purge_tombstones(self) -> None:
+        """
+        Rebuilds the table in place at its current capacity, dropping every
+        tombstone so probe sequences only pass over live entries.
+
+        :return: None
+        """
+        self._finish_rehash()
+        self._rehash(self._capacity)
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of the table once the load factor reaches 0.5.
+        In incremental mode the current table becomes the old table and its
+        entries are moved a few slots at a time by _advance_rehash().
+
+        :return: None
+        """
+        if not self._incremental:
+            self._rehash(self._round_capacity(self._capacity * 2, growth=True))
+            return
+        self._finish_rehash()
+        self._old_buckets, self._old_capacity = self._buckets, self._capacity
+        self._capacity = self._round_capacity(self._capacity * 2, growth=True)
+        self._buckets = DynamicArray([None] * self._capacity)
+        self._tombstones = 0
+        self._rehash_index = 0
+        self._version += 1
+
+    def _advance_rehash(self) -> None:
+        """
+        Performs one bounded unit of incremental rehash work by migrating
+        the next rehash_step slots of the old table.
+
+        :return: None
+        """
+        self._migrate(self._rehash_index + self._rehash_step)
+
+    def _migrate(self, end: int) -> None:
+        """
+        Moves the live entries of the old slots up to (not including) the given
+        index into the new table, leaving a migrated tombstone in their place.
+
+        :param end: The index of the first old slot left in place.
+        :return: None
+        """
+        end = min(end, self._old_capacity)
+        old_buckets = self._old_buckets
+        capacity = self._capacity
+        triangular = not capacity & (capacity - 1)
+        for i in range(self._rehash_index, end):
+            entry = old_buckets[i]
+            if entry is None or entry.is_tombstone:
+                continue
+            initial = entry.hashcode % capacity
+            index = initial
+            j = 1
+            while self._buckets[index] is not None:
+                index = (initial + (j * (j + 1) >> 1 if triangular else j ** 2)) % capacity
+                j += 1
+            self._buckets[index] = entry
+            old_buckets[i] = _MIGRATED
+        self._rehash_index = end
+        if end == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes any incremental rehash in progress.
+
+        :return: None
+        """
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
 
     def table_load(self) -> float:
         """
@@ -175,6 +489,8 @@ class HashMap:
         :param key: The key to search for.
         :return: The value associated with the key, or None if not found.
         """
+        if self._old_buckets is not None:
+            self._advance_rehash()
         entry = self._get_entry(key)
         if entry:
             return entry.value
@@ -187,17 +503,52 @@ class HashMap:
         :param key: The key to search for.
         :return: The HashEntry object or None if not found.
         """
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
+        return self._lookup(key, self._hash(key))
+
+    def _lookup(self, key: str, hashcode: int) -> HashEntry | None:
+        """
+        Retrieves the hash entry for a key whose hash code is already known,
+        looking in the old table as well while an incremental rehash is in progress.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The HashEntry object or None if not found.
+        """
+        index = self._find_index(self._buckets, self._capacity, key, hashcode)
+        if index != -1:
+            return self._buckets[index]
+        if self._old_buckets is not None:
+            index = self._find_index(self._old_buckets, self._old_capacity, key, hashcode)
+            if index != -1:
+                return self._old_buckets[index]
+        return None
+
+    @staticmethod
+    def _find_index(buckets: DynamicArray, capacity: int, key: str, hashcode: int) -> int:
+        """
+        Probes a table for the live entry holding the given key.
+
+        :param buckets: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The index of the entry, or -1 if not found.
+        """
+        index = hashcode % capacity
         initial = index
         j = 1
-        while self._buckets[index] is not None:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                return self._buckets[index]
+        triangular = not capacity & (capacity - 1)
+        limit = capacity - 1 if triangular else capacity // 2
+        while buckets[index] is not None:
+            if buckets[index].key == key and not buckets[index].is_tombstone:
+                return index
+            elif j > limit:
+                # every reachable probe position has been visited
+                return -1
             else:
-                index = (initial + j ** 2) % self._capacity
+                index = (initial + (j * (j + 1) >> 1 if triangular else j ** 2)) % capacity
                 j += 1
-        return None
+        return -1
 
     def contains_key(self, key: str) -> bool:
         """
@@ -206,6 +557,8 @@ class HashMap:
         :param key: The key to check for.
         :return: True if the key is present, False otherwise.
         """
+        if self._old_buckets is not None:
+            self._advance_rehash()
         entry = self._get_entry(key)
         if entry and not entry.is_tombstone:
             return True
@@ -218,18 +571,162 @@ class HashMap:
         :param key: The key to remove.
         :return: None
         """
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        self._delete(key, self._hash(key))
+
+    def _delete(self, key: str, hashcode: int) -> HashEntry | None:
+        """
+        Removes the entry for a key whose hash code is already known.
+
+        :param key: The key to remove.
+        :param hashcode: The hash code of the key.
+        :return: The entry, now a tombstone, or None if the key was not present.
+        """
+        index = self._find_index(self._buckets, self._capacity, key, hashcode)
+        if index != -1:
+            self._buckets[index].is_tombstone = True
+            self._tombstones += 1
+            self._size -= 1
+            self._version += 1
+            return self._buckets[index]
+        if self._old_buckets is not None:
+            # tombstones left in the old table are discarded with it
+            index = self._find_index(self._old_buckets, self._old_capacity, key, hashcode)
+            if index != -1:
+                self._old_buckets[index].is_tombstone = True
+                self._size -= 1
+                self._version += 1
+                return self._old_buckets[index]
+        return None
+
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        Adds delta to the value of a key, inserting delta for a missing key.
+        The key is hashed once and probed once.
+
+        :param key: The key whose value is incremented.
+        :param delta: The amount added to the value.
+        :return: The new value.
+        """
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        entry, index = self._locate(key, hashcode)
+        if entry is None:
+            self._add_entry(index, HashEntry(key, delta, hashcode))
+            return delta
+        entry.value += delta
+        return entry.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of a key, inserting default first if the key is missing.
+        The key is hashed once and probed once.
+
+        :param key: The key to look up.
+        :param default: The value inserted for a missing key.
+        :return: The value of the key.
+        """
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        entry, index = self._locate(key, hashcode)
+        if entry is None:
+            self._add_entry(index, HashEntry(key, default, hashcode))
+            return default
+        return entry.value
+
+    def compute(self, key: str, function) -> object:
+        """
+        Replaces the value of a key with function(value), where value is None
+        for a missing key, and stores the result. The key is hashed once and
+        probed once; nothing is stored if the function raises.
+
+        :param key: The key whose value is computed.
+        :param function: Maps the current value to the new one.
+        :return: The new value.
+        """
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        entry, index = self._locate(key, hashcode)
+        if entry is None:
+            value = function(None)
+            self._add_entry(index, HashEntry(key, value, hashcode))
+            return value
+        entry.value = function(entry.value)
+        return entry.value
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Removes a key and returns its value, with a single probe sequence.
+
+        :param key: The key to remove.
+        :param default: The value returned when the key is not found.
+        :return: The removed value, or default if the key was not present.
+        """
+        if self._old_buckets is not None:
+            self._advance_rehash()
+        entry = self._delete(key, self._hash(key))
+        if entry is None:
+            return default
+        return entry.value
+
+    def probe_length(self, key: str) -> int:
+        """
+        Counts the slots a lookup of the given key inspects in the current table,
+        including the slot that ends the search.
+
+        :param key: The key to look up.
+        :return: The number of slots inspected.
+        """
+        return self._probe_count(self._buckets, self._capacity, key, self._hash(key))
+
+    @staticmethod
+    def _probe_count(buckets: DynamicArray, capacity: int, key: str, hashcode: int) -> int:
+        """
+        Counts the slots _find_index() inspects, including the slot that ends the search.
+
+        :param buckets: The table to search.
+        :param capacity: The capacity of that table.
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The number of slots inspected.
+        """
+        index = hashcode % capacity
         initial = index
         j = 1
-        while self._buckets[index] is not None:
-            if self._buckets[index].key == key and not self._buckets[index].is_tombstone:
-                self._buckets[index].is_tombstone = True
-                self._size -= 1
-                return
-            else:
-                index = (initial + j ** 2) % self._capacity
-                j += 1
+        triangular = not capacity & (capacity - 1)
+        limit = capacity - 1 if triangular else capacity // 2
+        while buckets[index] is not None:
+            if buckets[index].key == key and not buckets[index].is_tombstone:
+                break
+            if j > limit:
+                break
+            index = (initial + (j * (j + 1) >> 1 if triangular else j ** 2)) % capacity
+            j += 1
+        return j
+
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Hashes a batch of keys, mixed for power-of-two tables like _hash().
+
+        :param keys: The keys.
+        :return: Their hash codes.
+        """
+        return hash_batch(self._hash, keys)
+
+    def _get_hashed(self, key: str, hashcode: int) -> object:
+        """
+        Retrieves the value of a key whose hash code is already known.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The value, or None if the key is not found.
+        """
+        entry = self._lookup(key, hashcode)
+        return entry.value if entry is not None else None
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -238,37 +735,192 @@ class HashMap:
         :return: DynamicArray of (key, value) tuples.
         """
         arr = DynamicArray()
-        for i in range(self._buckets.length()):
-            if self._buckets[i] is not None and not self._buckets[i].is_tombstone:
-                arr.append((self._buckets[i].key, self._buckets[i].value))
+        for pair in self.items():
+            arr.append(pair)
         return arr
 
+    def keys(self):
+        """
+        Returns a lazy view of the keys, see __iter__.
+
+        :return: Generator of the keys of the hash map.
+        """
+        return (entry.key for entry in self)
+
+    def values(self):
+        """
+        Returns a lazy view of the values, see __iter__.
+
+        :return: Generator of the values of the hash map.
+        """
+        return (entry.value for entry in self)
+
+    def items(self):
+        """
+        Returns a lazy view of the (key, value) pairs, see __iter__.
+
+        :return: Generator of (key, value) tuples.
+        """
+        return ((entry.key, entry.value) for entry in self)
+
     def clear(self) -> None:
         """
         Clears the hash map, removing all key-value pairs.
 
         :return: None
         """
-        self.__init__(self._capacity, self._hash_function)
+        version = self._version
+        stats, sampler = self._stats, self._sampler
+        self.__init__(self._capacity, self._hash_function,
+                      self._incremental, self._rehash_step, self._capacity_policy)
+        self._version = version + 1
+        # the counting and sampling methods are still bound; keep their state too
+        self._stats, self._sampler = stats, sampler
 
     def __iter__(self):
         """
-        Create iterator for loop
+        Create iterator for loop. Each loop gets its own generator, so loops
+        can be nested or interleaved. Any incremental rehash in progress is
+        finished first. Adding or removing keys, or resizing the table, while
+        a loop is suspended makes its next step raise RuntimeError.
+        """
+        self._finish_rehash()
+        version = self._version
+        buckets = self._buckets
+        for i in range(buckets.length()):
+            entry = buckets[i]
+            if entry is not None and not entry.is_tombstone:
+                yield entry
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
         """
-        self._index = 0
-        return self
+        Starts keeping statistics, see stats(). Counting versions of the methods in
+        _COUNTING_METHODS are bound to this map, so maps without statistics run
+        the class methods untouched.
 
-    def __next__(self):
+        :return: None
         """
-        Obtain next value and advance iterator
+        if self._stats is not None:
+            return
+        self._stats = MapStats(('put_probes', 'get_probes', 'remove_probes'))
+        for name in _COUNTING_METHODS:
+            setattr(self, name, getattr(self, '_counting' + name))
+
+    def disable_stats(self) -> None:
+        """
+        Stops keeping statistics and drops them.
+
+        :return: None
+        """
+        for name in _COUNTING_METHODS:
+            self.__dict__.pop(name, None)
+        self._stats = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the map's statistics.
+
+        :return: Dictionary with keys enabled, size, capacity, load and tombstones;
+            while statistics are kept, also the hit and miss counts of lookups
+            (get, contains_key, get_many), the number of resizes, of in-place purges
+            of tombstones and the seconds spent in both, and put_probes, get_probes
+            and remove_probes, the distributions of the number of slots inspected
+            in the current table by each probe sequence of those operations (see
+            map_stats.Histogram.snapshot()).
+        """
+        out = {
+            'enabled': self._stats is not None,
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+            'tombstones': self._tombstones,
+        }
+        if self._stats is not None:
+            out.update(self._stats.snapshot())
+        return out
+
+    def _counting_locate(self, key: str, hashcode: int) -> tuple[HashEntry | None, int]:
+        self._stats.histograms['put_probes'].add(
+            self._probe_count(self._buckets, self._capacity, key, hashcode))
+        return HashMap._locate(self, key, hashcode)
+
+    def _counting_lookup(self, key: str, hashcode: int) -> HashEntry | None:
+        self._stats.histograms['get_probes'].add(
+            self._probe_count(self._buckets, self._capacity, key, hashcode))
+        entry = HashMap._lookup(self, key, hashcode)
+        self._stats.count_lookup(entry is not None)
+        return entry
+
+    def _counting_delete(self, key: str, hashcode: int) -> HashEntry | None:
+        self._stats.histograms['remove_probes'].add(
+            self._probe_count(self._buckets, self._capacity, key, hashcode))
+        return HashMap._delete(self, key, hashcode)
+
+    def _counting_rehash(self, capacity: int) -> None:
+        if capacity == self._capacity:
+            self._stats.purges += 1
+        else:
+            self._stats.resizes += 1
+        self._stats.timed(HashMap._rehash, self, capacity)
+
+    def _counting_grow(self) -> None:
+        if self._incremental:
+            self._stats.resizes += 1
+        self._stats.timed(HashMap._grow, self)
+
+    def _counting_migrate(self, end: int) -> None:
+        self._stats.timed(HashMap._migrate, self, end)
+
+    def set_sampler(self, sampler) -> None:
+        """
+        Starts sampling put(), get() and remove() into a map_stats.Sampler, or
+        stops with None. Like enable_stats(), this binds wrappers of the three
+        methods to this map, so a map without a sampler runs the class methods.
+
+        :param sampler: The sampler, which may be shared by several maps, or None.
+        :return: None
+        """
+        self._sampler = sampler
+        for name in SAMPLED_OPERATIONS:
+            if sampler is not None:
+                setattr(self, name, getattr(self, '_sampled_' + name))
+            else:
+                self.__dict__.pop(name, None)
+
+    def _sample(self, operation: str, function, key: str, *args) -> object:
+        """
+        Calls an operation, timing it if the sampler says the call is due.
+
+        :param operation: 'put', 'get' or 'remove'.
+        :param function: The unsampled method, taking the map first.
+        :param key: The key.
+        :param args: The other arguments of the method.
+        :return: What the method returns.
         """
-        while self._index < self._capacity:
-            value = self._buckets[self._index]
-            if value and not value.is_tombstone:
-                self._index += 1
-                return value
-            self._index += 1
-        raise StopIteration
+        sampler = self._sampler
+        if not sampler.due():
+            return function(self, key, *args)
+        depth = self._probe_count(self._buckets, self._capacity, key, self._hash(key))
+        # an in-place purge of tombstones keeps the capacity and is not a resize
+        capacity = self._capacity
+        start = time.perf_counter_ns()
+        result = function(self, key, *args)
+        latency = time.perf_counter_ns() - start
+        sampler.record(operation, latency, depth, self._capacity != capacity)
+        return result
+
+    def _sampled_put(self, key: str, value: object) -> None:
+        return self._sample('put', HashMap.put, key, value)
+
+    def _sampled_get(self, key: str) -> object:
+        return self._sample('get', HashMap.get, key)
+
+    def _sampled_remove(self, key: str) -> None:
+        return self._sample('remove', HashMap.remove, key)
 
 # ------------------- BASIC TESTING ---------------------------------------- #
 
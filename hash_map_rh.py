@@ -0,0 +1,390 @@
+# Course: CS261 - Data Structures
+# Description:Robin Hood variant of the open addressing HashMap in hash_map_oa.
+# Collisions are resolved with linear probing, and every entry records its probe
+# distance (how far it sits from its home slot). On insert, an entry that is
+# farther from home than the resident of a slot takes the slot and the resident
+# moves on, which keeps probe distances short and even. Lookups stop as soon as
+# they reach an entry closer to home than the current distance, and removals
+# shift the following entries back instead of leaving tombstones.
+# Together these keep probe lengths short at loads of 0.8-0.9, so the table
+# does not need the 2x over-allocation of quadratic probing.
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from bulk_ops import BulkOps
+from capacity_policy import is_prime, next_prime
+from hash_functions import get_hash_function
+
+
+class RobinHoodEntry(HashEntry):
+
+    def __init__(self, key: str, value: object, hashcode: int, distance: int = 0) -> None:
+        """Initialize an entry that knows how far it sits from its home slot."""
+        super().__init__(key, value, hashcode)
+        self.distance = distance
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return f"K: {self.key} V: {self.value} D: {self.distance}"
+
+
+class HashMap(BulkOps):
+    def __init__(self, capacity: int, function, load_factor: float = 0.9) -> None:
+        """
+        Initialize new HashMap that uses
+        Robin Hood linear probing for collision resolution
+
+        :param capacity: The initial number of slots, rounded up to a prime.
+        :param function: The hash function applied to keys,
+            or the name of one registered in hash_functions.
+        :param load_factor: The load at which put() doubles the table (below 1).
+        """
+        if not 0 < load_factor < 1:
+            raise ValueError("load_factor must be between 0 and 1")
+        self._buckets = DynamicArray()
+
+        # capacity must be a prime number
+        self._capacity = next_prime(capacity)
+        for _ in range(self._capacity):
+            self._buckets.append(None)
+
+        self._hash_function = get_hash_function(function)
+        self._load_factor = load_factor
+        self._size = 0
+
+    @classmethod
+    def _bulk_capacity(cls, expected_size: int, load_factor: float = 0.9, **options) -> int:
+        """
+        Returns the capacity from_items() builds a map of the given size with,
+        so that the load stays below load_factor.
+
+        :param expected_size: The number of pairs.
+        :param load_factor: The load at which put() doubles the table.
+        :param options: The other constructor arguments, which do not affect it.
+        :return: The requested capacity, rounded up to a prime by the constructor.
+        """
+        return int(expected_size / load_factor) + 1
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._buckets.length()):
+            out += str(i) + ': ' + str(self._buckets[i]) + '\n'
+        return out
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair in the hash map.
+        The table doubles once the load factor reaches the configured limit.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        if self.table_load() >= self._load_factor:
+            self.resize_table(self._capacity * 2)
+        self._insert(key, value, self._hash_function(key))
+
+    def _insert(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Inserts or updates a pair whose hash code is already known,
+        without checking the load factor.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :param hashcode: The hash code of the key.
+        :return: None
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        index = hashcode % capacity
+        distance = 0
+        # an existing entry for the key can only sit before the first slot
+        # whose resident is closer to home than we are
+        while buckets[index] is not None and buckets[index].distance >= distance:
+            entry = buckets[index]
+            if entry.hashcode == hashcode and entry.key == key:
+                entry.value = value
+                return
+            index = (index + 1) % capacity
+            distance += 1
+
+        self._place(buckets, capacity, RobinHoodEntry(key, value, hashcode, distance), index)
+        self._size += 1
+
+    @staticmethod
+    def _place(buckets: DynamicArray, capacity: int, entry: RobinHoodEntry, index: int) -> None:
+        """
+        Stores an entry at the given slot, or further along its probe sequence.
+        Whenever the carried entry is farther from home than a slot's resident,
+        they swap and the resident is carried on instead.
+
+        :param buckets: The table to insert into.
+        :param capacity: The capacity of that table.
+        :param entry: The entry to place, with its distance at index.
+        :param index: The slot to start from.
+        :return: None
+        """
+        while buckets[index] is not None:
+            if buckets[index].distance < entry.distance:
+                entry, buckets[index] = buckets[index], entry
+            index = (index + 1) % capacity
+            entry.distance += 1
+        buckets[index] = entry
+
+    def _find_index(self, key: str, hashcode: int) -> int:
+        """
+        Probes for the entry holding the given key. The search stops early at an
+        empty slot or at an entry closer to home than the current probe distance.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The index of the entry, or -1 if not found.
+        """
+        buckets = self._buckets
+        capacity = self._capacity
+        index = hashcode % capacity
+        distance = 0
+        while buckets[index] is not None and buckets[index].distance >= distance:
+            entry = buckets[index]
+            if entry.hashcode == hashcode and entry.key == key:
+                return index
+            index = (index + 1) % capacity
+            distance += 1
+        return -1
+
+    def _delete(self, key: str, hashcode: int) -> bool:
+        """
+        Removes the entry for a key whose hash code is already known, shifting
+        the entries that follow it one slot back towards their home slots.
+
+        :param key: The key to remove.
+        :param hashcode: The hash code of the key.
+        :return: True if the key was present, False otherwise.
+        """
+        index = self._find_index(key, hashcode)
+        if index == -1:
+            return False
+        buckets = self._buckets
+        following = (index + 1) % self._capacity
+        while buckets[following] is not None and buckets[following].distance > 0:
+            entry = buckets[following]
+            entry.distance -= 1
+            buckets[index] = entry
+            index = following
+            following = (following + 1) % self._capacity
+        buckets[index] = None
+        self._size -= 1
+        return True
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of entries
+        without put() having to resize it. Growth at least doubles the capacity,
+        so repeated small reservations stay amortized.
+
+        :param count: The number of entries the table must hold.
+        :return: None
+        """
+        if count > self._capacity * self._load_factor:
+            needed = int(count / self._load_factor) + 1
+            self._rehash(next_prime(max(needed, self._capacity * 2)))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the internal hash map table to the specified capacity.
+
+        :param new_capacity: The new capacity for the hash map table.
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+        elif is_prime(new_capacity):
+            capacity = new_capacity
+        else:
+            capacity = next_prime(new_capacity)
+
+        # grow further if re-inserting every entry would push the load past the limit
+        while self._size and (self._size - 1) / capacity >= self._load_factor:
+            capacity = next_prime(capacity * 2)
+
+        self._rehash(capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Moves every entry into a new table of the given prime capacity,
+        placing it from its cached hash code.
+
+        :param capacity: The prime capacity of the new table.
+        :return: None
+        """
+        new_buckets = DynamicArray()
+        for _ in range(capacity):
+            new_buckets.append(None)
+
+        for i in range(self._buckets.length()):
+            entry = self._buckets[i]
+            if entry is None:
+                continue
+            entry.distance = 0
+            self._place(new_buckets, capacity, entry, entry.hashcode % capacity)
+
+        self._buckets = new_buckets
+        self._capacity = capacity
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the current load factor of the hash map.
+
+        :return: The load factor as a float.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Counts and returns the number of empty buckets in the hash map.
+
+        :return: The count of empty buckets.
+        """
+        return self._capacity - self._size
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        index = self._find_index(key, self._hash_function(key))
+        if index == -1:
+            return None
+        return self._buckets[index].value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the hash map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._find_index(key, self._hash_function(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._delete(key, self._hash_function(key))
+
+    def probe_length(self, key: str) -> int:
+        """
+        Counts the slots a lookup of the given key inspects,
+        including the slot that ends the search.
+
+        :param key: The key to look up.
+        :return: The number of slots inspected.
+        """
+        hashcode = self._hash_function(key)
+        index = hashcode % self._capacity
+        distance = 0
+        while self._buckets[index] is not None and self._buckets[index].distance >= distance:
+            entry = self._buckets[index]
+            if entry.hashcode == hashcode and entry.key == key:
+                break
+            index = (index + 1) % self._capacity
+            distance += 1
+        return distance + 1
+
+    def _get_hashed(self, key: str, hashcode: int) -> object:
+        """
+        Retrieves the value of a key whose hash code is already known.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key.
+        :return: The value, or None if the key is not found.
+        """
+        index = self._find_index(key, hashcode)
+        return self._buckets[index].value if index != -1 else None
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the hash map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        arr = DynamicArray()
+        for i in range(self._buckets.length()):
+            if self._buckets[i] is not None:
+                arr.append((self._buckets[i].key, self._buckets[i].value))
+        return arr
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, removing all key-value pairs.
+
+        :return: None
+        """
+        self.__init__(self._capacity, self._hash_function, self._load_factor)
+
+    def __iter__(self):
+        """
+        Iterate over the entries of the map
+        """
+        for i in range(self._buckets.length()):
+            if self._buckets[i] is not None:
+                yield self._buckets[i]
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('missing'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    m.remove('21')
+    result = not m.contains_key('21')
+    for key in keys[2:]:
+        result &= m.contains_key(str(key))
+        result &= not m.contains_key(str(key + 1))
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\nbackward shift example")
+    print("----------------------")
+    m = HashMap(7, hash_function_1)
+    for key in ('ab', 'ba', 'c'):
+        m.put(key, key.upper())
+    print(m)
+    m.remove('ab')
+    print(m)
@@ -10,29 +10,140 @@
 # and their frequency in a dynamic array using a hash map, returning a tuple with the mode(s) and frequency.
 
 
-from a6_include import (DynamicArray, LinkedList,
+import time
+
+from a6_include import (DynamicArray, LinkedList, SLNode,
                         hash_function_1, hash_function_2)
+from bulk_ops import BulkOps
+from capacity_policy import (check_capacity_policy, next_power_of_two,
+                             next_table_prime)
+from hash_functions import get_hash_function, hash_batch, mixed
+from map_stats import SAMPLED_OPERATIONS, MapStats
+from snapshot import SnapshotReader, SnapshotWriter, stored_function_name
+
+# methods shadowed on the instance while statistics are collected, see map_stats
+_COUNTING_METHODS = ('get', 'contains_key', 'empty_buckets', '_add_node', '_delete',
+                     '_rehash', '_grow', '_advance_rehash', '_migrate', '_finish_rehash')
 
 
-class HashMap:
+class HashMap(BulkOps):
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 incremental: bool = False,
+                 rehash_step: int = 8,
+                 capacity_policy: str = 'prime',
+                 collect_stats: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+
+        Args:
+            capacity (int): The initial number of buckets, rounded up to a
+                capacity allowed by the capacity policy.
+            function (callable | str): The hash function applied to keys,
+                or the name of one registered in hash_functions.
+            incremental (bool): When True, growth triggered by put() is spread
+                over later operations instead of rehashing the table at once.
+            rehash_step (int): Buckets migrated per operation in incremental mode.
+            capacity_policy (str): 'prime', 'prime_table' or 'pow2';
+                see capacity_policy.
+            collect_stats (bool): When True, statistics are kept from the start;
+                see enable_stats().
         """
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity must be a prime number, or a power of two under the 'pow2' policy
+        self._capacity_policy = check_capacity_policy(capacity_policy)
+        self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        self._hash_function = function
+        self._hash_function = get_hash_function(function)
+        # bumped whenever keys are added or removed or nodes move between buckets,
+        # so that iterators can detect modification
+        self._version = 0
+        # power-of-two tables keep only the low bits of a hash code, so mix them first
+        if capacity_policy == 'pow2':
+            self._hash = mixed(self._hash_function)
+        else:
+            self._hash = self._hash_function
         self._size = 0
 
+        # incremental rehash state: the table being allocated, then the table being drained
+        self._incremental = incremental
+        self._rehash_step = rehash_step
+        self._next_buckets = None
+        self._next_capacity = 0
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._rehash_index = 0
+
+        self._stats = None
+        self._sampler = None
+        if collect_stats:
+            self.enable_stats()
+
+    @classmethod
+    def _bulk_capacity(cls, expected_size: int, **options) -> int:
+        """
+        Returns the capacity from_items() builds a map of the given size with:
+        the size itself, so the load factor stays at most 1.
+
+        Args:
+            expected_size (int): The number of pairs.
+            options: The constructor arguments, which do not affect it.
+
+        Returns:
+            int: The requested capacity, rounded up by the constructor under its
+                capacity policy.
+        """
+        return max(expected_size, 1)
+
+    def save(self, path) -> None:
+        """
+        Writes the map to a binary snapshot (see snapshot.py). The cached hash
+        codes are stored next to the pairs, so load() does not re-hash the keys.
+
+        Args:
+            path: A path, or a binary file object opened for writing.
+
+        Returns:
+            None
+        """
+        with SnapshotWriter(path, stored_function_name(self._hash_function),
+                            self._capacity_policy, self._size) as writer:
+            for node in self:
+                writer.write(node.key, node.value, node.hashcode)
+
+    @classmethod
+    def load(cls, path, function: callable = None,
+             capacity_policy: str = None) -> "HashMap":
+        """
+        Reads a map written by save(). The table is sized once for the recorded
+        number of pairs, then each block is bulk-inserted with its stored hash
+        codes; keys are only re-hashed if the map is loaded with another hash
+        function, or with a capacity policy that mixes hash codes differently.
+
+        Args:
+            path: A path, or a binary file object positioned at the snapshot.
+            function (callable | str): The hash function, None for the saved one.
+            capacity_policy (str): The capacity policy, None for the saved one.
+
+        Returns:
+            HashMap: The loaded map.
+        """
+        with SnapshotReader(path) as reader:
+            function, capacity_policy, reuse = reader.resolve(function, capacity_policy)
+            m = cls(max(reader.count or 1, 1), function, capacity_policy=capacity_policy)
+            for keys, values, hashes in reader.blocks():
+                if not reuse:
+                    hashes = m._hash_batch(keys)
+                m._reserve(m._size + len(keys))
+                for i in range(len(keys)):
+                    m._insert(keys[i], values[i], hashes[i])
+        return m
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -76,6 +187,26 @@ class HashMap:
 
         return True
 
+    def _round_capacity(self, capacity: int, growth: bool = False) -> int:
+        """
+        Returns the smallest capacity allowed by the capacity policy
+        that is at least the given capacity. Under 'prime_table' only growth
+        steps use GROWTH_PRIMES; a capacity chosen by the caller or by bulk
+        loading is rounded to the next prime, not the next table entry.
+
+        Args:
+            capacity (int): The requested capacity.
+            growth (bool): Whether the table is doubling its capacity.
+
+        Returns:
+            int: A prime capacity, or a power of two under the 'pow2' policy.
+        """
+        if self._capacity_policy == 'pow2':
+            return next_power_of_two(capacity)
+        if self._capacity_policy == 'prime_table' and growth:
+            return next_table_prime(capacity)
+        return self._next_prime(capacity)
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -94,8 +225,11 @@ class HashMap:
 
     def put(self, key: str, value: object) -> None:
         """
-        Inserts a key-value pair into the hash map. If the load factor exceeds 1,
-        the table is resized to double its current capacity.
+        Inserts a key-value pair into the hash map. If the load factor exceeds 1
+        when a new key is added, the table is resized to double its current capacity.
+        Updating the value of an existing key never resizes the table.
+
+        In incremental mode the resize is spread over the following operations.
 
         Args:
             key (str): The key to be inserted.
@@ -104,20 +238,106 @@ class HashMap:
         Returns:
             None
         """
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
-        list = self._buckets[index]
-        if not list.contains(key):
-            list.insert(key, value)
-            self._size += 1
-        else:
-            for node in list:
-                if node.key == key:
-                    node.value = value
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        self._insert(key, value, self._hash(key))
         return
 
+    def _insert(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Inserts or updates a pair whose hash code is already known,
+        without checking the load factor.
+
+        Args:
+            key (str): The key to be inserted.
+            value (object): The value associated with the key.
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            None
+        """
+        node = self._find_node(key, hashcode)
+        if node is not None:
+            node.value = value
+            return
+        self._add_node(key, value, hashcode)
+
+    def _add_node(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Links a new node for a key known to be absent, without searching its chain.
+        The table grows first if the load factor has reached 1.
+
+        Args:
+            key (str): The key to be inserted.
+            value (object): The value associated with the key.
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            None
+        """
+        if self.table_load() >= 1 and self._next_buckets is None:
+            self._grow()
+        self._buckets[hashcode % self._capacity].insert(key, value, hashcode)
+        self._size += 1
+        self._version += 1
+
+    def _find_node(self, key: str, hashcode: int) -> SLNode | None:
+        """
+        Finds the node holding the given key, looking in the old table as well
+        while an incremental rehash is in progress.
+
+        Args:
+            key (str): The key to search for.
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            SLNode | None: The node, or None if the key is not found.
+        """
+        node = self._buckets[hashcode % self._capacity].contains(key)
+        if node is None and self._old_buckets is not None:
+            list = self._old_bucket(hashcode)
+            if list is not None:
+                node = list.contains(key)
+        return node
+
+    def _delete(self, key: str, hashcode: int) -> SLNode | None:
+        """
+        Removes the pair for a key whose hash code is already known.
+
+        Args:
+            key (str): The key to be removed.
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            SLNode | None: The unlinked node, or None if the key was not present.
+        """
+        node = self._buckets[hashcode % self._capacity].remove_node(key)
+        if node is None and self._old_buckets is not None:
+            list = self._old_bucket(hashcode)
+            if list is not None:
+                node = list.remove_node(key)
+        if node is not None:
+            self._size -= 1
+            self._version += 1
+        return node
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of pairs
+        without put() having to resize it. Growth at least doubles the capacity,
+        so repeated small reservations stay amortized.
+
+        Args:
+            count (int): The number of pairs the table must hold.
+
+        Returns:
+            None
+        """
+        self._finish_rehash()
+        if count > self._capacity:
+            growth = count <= self._capacity * 2
+            self._rehash(self._round_capacity(max(count, self._capacity * 2), growth))
+
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes the hash map's internal table to the specified capacity.
@@ -131,23 +351,131 @@ class HashMap:
         """
         if new_capacity < 1:
             return
-        elif self._is_prime(new_capacity):
-            self._capacity = new_capacity
+
+        self._finish_rehash()
+        if self._capacity_policy == 'prime' and self._is_prime(new_capacity):
+            capacity = new_capacity
         else:
-            self._capacity = self._next_prime(new_capacity)
+            capacity = self._round_capacity(new_capacity)
+
+        # grow further if re-inserting every pair would push the load past 1
+        while self._size and (self._size - 1) / capacity >= 1:
+            capacity = self._round_capacity(capacity * 2, growth=True)
+
+        self._rehash(capacity)
+        return
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Moves every node into a new table of the given capacity.
+        Nodes are relinked using their cached hash codes, so no key is
+        re-hashed and no node is copied.
+
+        Args:
+            capacity (int): The capacity of the new table, a prime or, under the
+                'pow2' policy, a power of two.
 
+        Returns:
+            None
+        """
         new_buckets = DynamicArray()
-        for _ in range(self._capacity):
+        for _ in range(capacity):
             new_buckets.append(LinkedList())
 
-        arr_key_val = self.get_keys_and_values()
+        for i in range(self._buckets.length()):
+            for node in self._buckets[i]:
+                new_buckets[node.hashcode % capacity].insert_node(node)
+
         self._buckets = new_buckets
-        self._size = 0
-        for i in range(arr_key_val.length()):
-            k = arr_key_val[i][0]
-            v = arr_key_val[i][1]
-            self.put(k, v)
-        return
+        self._capacity = capacity
+        self._version += 1
+
+    def _grow(self) -> None:
+        """
+        Doubles the capacity of the table once the load factor reaches 1.
+        In incremental mode only the bookkeeping for the new table is set up;
+        the work itself is done a few buckets at a time by _advance_rehash().
+
+        Returns:
+            None
+        """
+        if not self._incremental:
+            self._rehash(self._round_capacity(self._capacity * 2, growth=True))
+            return
+        self._finish_rehash()
+        self._next_capacity = self._round_capacity(self._capacity * 2, growth=True)
+        self._next_buckets = DynamicArray()
+        self._version += 1
+
+    def _advance_rehash(self) -> None:
+        """
+        Performs one bounded unit of incremental rehash work. While the new table
+        is being allocated, up to 2 * rehash_step empty buckets are created and all
+        operations still use the current table. Once it is allocated, the current
+        table becomes the old table and rehash_step old buckets are migrated per call.
+
+        Returns:
+            None
+        """
+        if self._next_buckets is not None:
+            buckets = self._next_buckets
+            count = min(2 * self._rehash_step, self._next_capacity - buckets.length())
+            for _ in range(count):
+                buckets.append(LinkedList())
+            if buckets.length() == self._next_capacity:
+                self._old_buckets, self._old_capacity = self._buckets, self._capacity
+                self._buckets, self._capacity = buckets, self._next_capacity
+                self._next_buckets = None
+                self._rehash_index = 0
+            return
+        self._migrate(self._rehash_index + self._rehash_step)
+
+    def _migrate(self, end: int) -> None:
+        """
+        Moves the nodes of the old buckets up to (not including) the given index
+        into the new table. Migrated buckets are replaced by None.
+
+        Args:
+            end (int): The index of the first old bucket left in place.
+
+        Returns:
+            None
+        """
+        end = min(end, self._old_capacity)
+        for i in range(self._rehash_index, end):
+            for node in self._old_buckets[i]:
+                self._buckets[node.hashcode % self._capacity].insert_node(node)
+            self._old_buckets[i] = None
+        self._rehash_index = end
+        if end == self._old_capacity:
+            self._old_buckets = None
+
+    def _finish_rehash(self) -> None:
+        """
+        Completes any incremental rehash in progress. A new table that is still
+        being allocated is discarded, since nothing has been moved into it yet.
+
+        Returns:
+            None
+        """
+        self._next_buckets = None
+        if self._old_buckets is not None:
+            self._migrate(self._old_capacity)
+
+    def _old_bucket(self, hashcode: int) -> LinkedList | None:
+        """
+        Returns the not yet migrated old bucket for a hash code, if there is one.
+
+        Args:
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            LinkedList | None: The old bucket, or None if it was already migrated.
+        """
+        index = hashcode % self._old_capacity
+        if index < self._rehash_index:
+            return None
+        return self._old_buckets[index]
 
     def table_load(self) -> float:
         """
@@ -182,11 +510,11 @@ class HashMap:
         Returns:
             object: The value associated with the key, or None if the key is not found.
         """
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
-        list = self._buckets[index]
-        if list.contains(key) is not None:
-            return list.contains(key).value
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        node = self._find_node(key, self._hash(key))
+        if node is not None:
+            return node.value
         return None
 
     def contains_key(self, key: str) -> bool:
@@ -199,10 +527,9 @@ class HashMap:
         Returns:
             bool: True if the key is present, False otherwise.n
         """
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
-        list = self._buckets[index]
-        return list.contains(key) is not None
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        return self._find_node(key, self._hash(key)) is not None
 
     def remove(self, key: str) -> None:
         """
@@ -214,14 +541,122 @@ class HashMap:
         Returns:
             None
         """
-        hashcode = self._hash_function(key)
-        index = hashcode % self._capacity
-        list = self._buckets[index]
-        res = list.remove(key)
-        if res:
-            self._size -= 1
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        self._delete(key, self._hash(key))
         return
 
+    def increment(self, key: str, delta: object = 1) -> object:
+        """
+        Adds delta to the value of a key, inserting delta for a missing key.
+        The key is hashed once and its chain walked once.
+
+        Args:
+            key (str): The key whose value is incremented.
+            delta (object): The amount added to the value.
+
+        Returns:
+            object: The new value.
+        """
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        node = self._find_node(key, hashcode)
+        if node is None:
+            self._add_node(key, delta, hashcode)
+            return delta
+        node.value += delta
+        return node.value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Returns the value of a key, inserting default first if the key is missing.
+        The key is hashed once and its chain walked once.
+
+        Args:
+            key (str): The key to look up.
+            default (object): The value inserted for a missing key.
+
+        Returns:
+            object: The value of the key.
+        """
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        node = self._find_node(key, hashcode)
+        if node is None:
+            self._add_node(key, default, hashcode)
+            return default
+        return node.value
+
+    def compute(self, key: str, function: callable) -> object:
+        """
+        Replaces the value of a key with function(value), where value is None
+        for a missing key, and stores the result. The key is hashed once and
+        its chain walked once; nothing is stored if the function raises.
+
+        Args:
+            key (str): The key whose value is computed.
+            function (callable): Maps the current value to the new one.
+
+        Returns:
+            object: The new value.
+        """
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        hashcode = self._hash(key)
+        node = self._find_node(key, hashcode)
+        if node is None:
+            value = function(None)
+            self._add_node(key, value, hashcode)
+            return value
+        node.value = function(node.value)
+        return node.value
+
+    def pop(self, key: str, default: object = None) -> object:
+        """
+        Removes a key and returns its value, with a single walk of its chain.
+
+        Args:
+            key (str): The key to be removed.
+            default (object): The value returned when the key is not found.
+
+        Returns:
+            object: The removed value, or default if the key was not present.
+        """
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        node = self._delete(key, self._hash(key))
+        if node is None:
+            return default
+        return node.value
+
+    def _hash_batch(self, keys: list) -> list:
+        """
+        Hashes a batch of keys, mixed for power-of-two tables like _hash().
+
+        Args:
+            keys (list): The keys.
+
+        Returns:
+            list: Their hash codes.
+        """
+        return hash_batch(self._hash, keys)
+
+    def _get_hashed(self, key: str, hashcode: int) -> object:
+        """
+        Retrieves the value of a key whose hash code is already known.
+
+        Args:
+            key (str): The key to search for.
+            hashcode (int): The hash code of the key.
+
+        Returns:
+            object: The value, or None if the key is not found.
+        """
+        node = self._find_node(key, hashcode)
+        return node.value if node is not None else None
+
     def get_keys_and_values(self) -> DynamicArray:
         """
         Returns a dynamic array containing tuples of all key-value pairs in the hash map.
@@ -230,11 +665,37 @@ class HashMap:
             DynamicArray: A dynamic array containing tuples of key-value pairs.
         """
         arr = DynamicArray()
-        for i in range(self._buckets.length()):
-            for node in self._buckets[i]:
-                arr.append((node.key, node.value))
+        for pair in self.items():
+            arr.append(pair)
         return arr
 
+    def keys(self):
+        """
+        Returns a lazy view of the keys, see __iter__.
+
+        Returns:
+            generator: The keys of the hash map.
+        """
+        return (node.key for node in self)
+
+    def values(self):
+        """
+        Returns a lazy view of the values, see __iter__.
+
+        Returns:
+            generator: The values of the hash map.
+        """
+        return (node.value for node in self)
+
+    def items(self):
+        """
+        Returns a lazy view of the (key, value) pairs, see __iter__.
+
+        Returns:
+            generator: The (key, value) tuples of the hash map.
+        """
+        return ((node.key, node.value) for node in self)
+
     def clear(self) -> None:
         """
         Clears the contents of the hash map, resetting it to an empty state.
@@ -242,7 +703,225 @@ class HashMap:
         Returns:
             None
         """
-        self.__init__(self._capacity, self._hash_function)
+        version = self._version
+        stats, sampler = self._stats, self._sampler
+        self.__init__(self._capacity, self._hash_function,
+                      self._incremental, self._rehash_step, self._capacity_policy)
+        self._version = version + 1
+        # the counting and sampling methods are still bound; keep their state too
+        self._sampler = sampler
+        if stats is not None:
+            self._stats = stats
+            self._count_chains()
+
+    def __iter__(self):
+        """
+        Iterates over the nodes of the hash map, which hold .key and .value.
+        Each iteration is an independent generator, so iterations can be nested
+        or interleaved. Any incremental rehash in progress is finished first.
+        Adding or removing keys, or resizing the table, while an iteration is
+        suspended makes its next step raise RuntimeError; updating values does not.
+
+        Returns:
+            generator: The SLNode of every pair.
+        """
+        self._finish_rehash()
+        version = self._version
+        buckets = self._buckets
+        for i in range(buckets.length()):
+            for node in buckets[i]:
+                yield node
+                if self._version != version:
+                    raise RuntimeError("HashMap changed during iteration")
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
+        """
+        Starts keeping statistics, see stats(). Counting versions of the methods in
+        _COUNTING_METHODS are bound to this map, so maps without statistics run
+        the class methods untouched. empty_buckets() becomes O(1) meanwhile.
+
+        Returns:
+            None
+        """
+        if self._stats is not None:
+            return
+        self._stats = MapStats(('chain_length',))
+        self._count_chains()
+        for name in _COUNTING_METHODS:
+            setattr(self, name, getattr(self, '_counting_' + name.lstrip('_')))
+        # get() is both counted and sampled; the sampling wrapper stays outermost
+        self.set_sampler(self._sampler)
+
+    def disable_stats(self) -> None:
+        """
+        Stops keeping statistics and drops them.
+
+        Returns:
+            None
+        """
+        for name in _COUNTING_METHODS:
+            self.__dict__.pop(name, None)
+        self._stats = None
+        self.set_sampler(self._sampler)
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the map's statistics.
+
+        Returns:
+            dict: enabled, size, capacity and load; while statistics are kept, also
+                the hit and miss counts of get() and contains_key(), the number of
+                resizes and the seconds spent in them, and chain_length, the
+                distribution of chain lengths over the buckets of the current table
+                (see map_stats.Histogram.snapshot()).
+        """
+        out = {
+            'enabled': self._stats is not None,
+            'size': self._size,
+            'capacity': self._capacity,
+            'load': self.table_load(),
+        }
+        if self._stats is not None:
+            out.update(self._stats.snapshot())
+        return out
+
+    def _count_chains(self) -> None:
+        """
+        Rebuilds the chain length histogram from the current table.
+
+        Returns:
+            None
+        """
+        chains = self._stats.histograms['chain_length']
+        chains.reset()
+        for i in range(self._buckets.length()):
+            chains.add(self._buckets[i].length())
+
+    def _counting_get(self, key: str):
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        node = self._find_node(key, self._hash(key))
+        self._stats.count_lookup(node is not None)
+        return node.value if node is not None else None
+
+    def _counting_contains_key(self, key: str) -> bool:
+        if self._next_buckets is not None or self._old_buckets is not None:
+            self._advance_rehash()
+        found = self._find_node(key, self._hash(key)) is not None
+        self._stats.count_lookup(found)
+        return found
+
+    def _counting_empty_buckets(self) -> int:
+        return self._stats.histograms['chain_length'].get_count(0)
+
+    def _counting_add_node(self, key: str, value: object, hashcode: int) -> None:
+        HashMap._add_node(self, key, value, hashcode)
+        length = self._buckets[hashcode % self._capacity].length()
+        self._stats.histograms['chain_length'].move(length - 1, length)
+
+    def _counting_delete(self, key: str, hashcode: int) -> SLNode | None:
+        bucket = self._buckets[hashcode % self._capacity]
+        length = bucket.length()
+        node = HashMap._delete(self, key, hashcode)
+        if bucket.length() < length:
+            self._stats.histograms['chain_length'].move(length, length - 1)
+        return node
+
+    def _counting_rehash(self, capacity: int) -> None:
+        self._stats.resizes += 1
+        self._stats.timed(HashMap._rehash, self, capacity)
+        self._count_chains()
+
+    def _counting_grow(self) -> None:
+        if self._incremental:
+            self._stats.resizes += 1
+        self._stats.timed(HashMap._grow, self)
+
+    def _counting_advance_rehash(self) -> None:
+        buckets = self._buckets
+        self._stats.timed(HashMap._advance_rehash, self)
+        if self._buckets is not buckets:
+            # the new table has just become the current one, and it is empty
+            self._count_chains()
+
+    def _counting_migrate(self, end: int) -> None:
+        # count the nodes each new bucket receives, then update their chain lengths
+        received = {}
+        for i in range(self._rehash_index, min(end, self._old_capacity)):
+            for node in self._old_buckets[i]:
+                index = node.hashcode % self._capacity
+                received[index] = received.get(index, 0) + 1
+        self._stats.timed(HashMap._migrate, self, end)
+        chains = self._stats.histograms['chain_length']
+        for index, count in received.items():
+            length = self._buckets[index].length()
+            chains.add(length - count, -1)
+            chains.add(length)
+
+    def _counting_finish_rehash(self) -> None:
+        self._stats.timed(HashMap._finish_rehash, self)
+
+    def set_sampler(self, sampler) -> None:
+        """
+        Starts sampling put(), get() and remove() into a map_stats.Sampler, or
+        stops with None. Like enable_stats(), this binds wrappers of the three
+        methods to this map, so a map without a sampler runs the class methods.
+
+        Args:
+            sampler (Sampler | None): The sampler, which may be shared by several maps.
+
+        Returns:
+            None
+        """
+        self._sampler = sampler
+        for name in SAMPLED_OPERATIONS:
+            if sampler is not None:
+                setattr(self, name, getattr(self, '_sampled_' + name))
+            elif self._stats is not None and name in _COUNTING_METHODS:
+                setattr(self, name, getattr(self, '_counting_' + name))
+            else:
+                self.__dict__.pop(name, None)
+
+    def _sample(self, operation: str, function: callable, key: str, *args) -> object:
+        """
+        Calls an operation, timing it if the sampler says the call is due.
+
+        Args:
+            operation (str): 'put', 'get' or 'remove'.
+            function (callable): The unsampled method, taking the map first.
+            key (str): The key.
+            *args: The other arguments of the method.
+
+        Returns:
+            object: What the method returns.
+        """
+        sampler = self._sampler
+        if not sampler.due():
+            return function(self, key, *args)
+        depth = 0
+        for node in self._buckets[self._hash(key) % self._capacity]:
+            depth += 1
+            if node.key == key:
+                break
+        # the table being filled changes only when a resize starts
+        table = self._buckets if self._next_buckets is None else self._next_buckets
+        start = time.perf_counter_ns()
+        result = function(self, key, *args)
+        latency = time.perf_counter_ns() - start
+        resized = (self._buckets if self._next_buckets is None else self._next_buckets) is not table
+        sampler.record(operation, latency, depth, resized)
+        return result
+
+    def _sampled_put(self, key: str, value: object) -> None:
+        return self._sample('put', HashMap.put, key, value)
+
+    def _sampled_get(self, key: str):
+        return self._sample('get', HashMap.get if self._stats is None else HashMap._counting_get, key)
+
+    def _sampled_remove(self, key: str) -> None:
+        return self._sample('remove', HashMap.remove, key)
 
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
@@ -259,21 +938,16 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     # use this instance of your Separate Chaining HashMap
     map = HashMap()
     for i in range (da.length()):
-        if not map.contains_key(da[i]):
-            map.put(da[i], 1)
-        else:
-            value = map.get(da[i]) + 1
-            map.put(da[i], value)
+        map.increment(da[i])
     cur_max = 0
     cur_arr = DynamicArray()
-    arr = map.get_keys_and_values()
-    for j in range(arr.length()):
-        if arr[j][1] > cur_max:
-            cur_max = arr[j][1]
+    for key, count in map.items():
+        if count > cur_max:
+            cur_max = count
             cur_arr = DynamicArray()
-            cur_arr.append(arr[j][0])
-        elif arr[j][1] == cur_max:
-            cur_arr.append(arr[j][0])
+            cur_arr.append(key)
+        elif count == cur_max:
+            cur_arr.append(key)
     return cur_arr, cur_max
 # ------------------- BASIC TESTING ---------------------------------------- #
 
@@ -0,0 +1,479 @@
+# Course: CS261 - Data Structures
+# Description:Swiss-table style open addressing HashMap for read-heavy workloads.
+# Next to the key, value and hash arrays, the table keeps one control byte per slot:
+# EMPTY, DELETED, or the low 7 bits of the (mixed) hash of the key stored there.
+# Slots are probed a group of 16 at a time: one comparison of the 16 control bytes
+# against the key's 7-bit tag yields every candidate slot in the group, and only
+# those candidates need a full key comparison. A miss usually ends in its first
+# group without comparing a single key.
+#
+# Single lookups compare a group as one 128-bit integer (SIMD within a register),
+# which beats NumPy's per-call overhead on 16 bytes. get_many() uses NumPy to
+# gather and compare the first probed group of every key in the batch at once,
+# and falls back to the scalar path when NumPy is not installed.
+# The public API matches the other engines.
+
+from a6_include import (DynamicArray, HashEntry,
+                        hash_function_1, hash_function_2)
+from bulk_ops import BulkOps
+from hash_functions import (MASK_64, get_hash_function, hash_batch,
+                            mix64, mix64_batch, np)
+
+GROUP_WIDTH = 16
+
+# control byte values; a full slot holds a 7-bit tag (0-127)
+EMPTY = 0x80
+DELETED = 0xFE
+
+# the table grows once live entries plus DELETED markers reach 7/8 of the slots
+MAX_LOAD = 7 / 8
+
+# byte-wise constants for comparing a whole group as one integer
+_ONES = int.from_bytes(b'\x01' * GROUP_WIDTH, 'little')
+_LOW_7 = 0x7F * _ONES
+_HIGH = 0x80 * _ONES
+_EMPTY_PATTERN = EMPTY * _ONES
+
+
+def _match_byte(word: int, pattern: int) -> int:
+    """
+    Compares the 16 bytes of a group with one byte value at once.
+
+    :param word: The group's control bytes as a little-endian integer.
+    :param pattern: The byte value repeated 16 times.
+    :return: Integer with bit 8*i+7 set for every byte i equal to the value.
+    """
+    x = word ^ pattern
+    return ~(((x & _LOW_7) + _LOW_7) | x) & _HIGH
+
+
+class HashMap(BulkOps):
+    def __init__(self, capacity: int, function) -> None:
+        """
+        Initialize new HashMap that probes groups of 16 control bytes
+
+        :param capacity: The minimum number of slots, rounded up to a power-of-two
+            number of 16-slot groups.
+        :param function: The hash function applied to keys,
+            or the name of one registered in hash_functions.
+        """
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+
+        self._hash_function = get_hash_function(function)
+        self._size = 0
+        self._deleted = 0
+
+    @classmethod
+    def _bulk_capacity(cls, expected_size: int, **options) -> int:
+        """
+        Returns the capacity from_items() builds a map of the given size with,
+        so that the load stays below the maximum of 7/8.
+
+        :param expected_size: The number of pairs.
+        :param options: The constructor arguments, which do not affect it.
+        :return: The requested capacity, rounded up by the constructor.
+        """
+        return int(expected_size / MAX_LOAD) + 1
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._control[i] & 0x80:
+                entry = None
+            else:
+                entry = f"K: {self._keys[i]} V: {self._values[i]} TAG: {self._control[i]}"
+            out += str(i) + ': ' + str(entry) + '\n'
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """
+        Rounds a capacity up to a power-of-two number of groups.
+
+        :param capacity: The requested number of slots.
+        :return: The number of slots to allocate.
+        """
+        groups = 1
+        while groups * GROUP_WIDTH < capacity:
+            groups *= 2
+        return groups * GROUP_WIDTH
+
+    def _allocate(self, capacity: int) -> None:
+        """
+        Replace the storage with empty arrays of the given capacity.
+
+        :param capacity: The number of slots, a power-of-two multiple of 16.
+        :return: None
+        """
+        self._control = bytearray([EMPTY]) * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+        self._hashes = [0] * capacity
+        self._group_mask = capacity // GROUP_WIDTH - 1
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _find_slot(self, key: str, mixed: int) -> int:
+        """
+        Probes group by group for the slot holding the given key.
+
+        :param key: The key to search for.
+        :param mixed: The mixed hash of the key.
+        :return: The slot index, or -1 if the key is not present.
+        """
+        control = self._control
+        keys = self._keys
+        pattern = (mixed & 0x7F) * _ONES
+        group = (mixed >> 7) & self._group_mask
+        step = 0
+        while True:
+            base = group * GROUP_WIDTH
+            word = int.from_bytes(control[base:base + GROUP_WIDTH], 'little')
+            matches = _match_byte(word, pattern)
+            while matches:
+                bit = matches & -matches
+                slot = base + (bit.bit_length() >> 3) - 1
+                if keys[slot] == key:
+                    return slot
+                matches ^= bit
+            # a group with an EMPTY slot ends every probe sequence through it
+            if _match_byte(word, _EMPTY_PATTERN) or step > self._group_mask:
+                return -1
+            step += 1
+            group = (group + step) & self._group_mask
+
+    def _find_free(self, mixed: int) -> int:
+        """
+        Finds the first EMPTY or DELETED slot on a hash's probe sequence.
+
+        :param mixed: The mixed hash of the key.
+        :return: The slot index.
+        """
+        control = self._control
+        group = (mixed >> 7) & self._group_mask
+        step = 0
+        while True:
+            base = group * GROUP_WIDTH
+            # EMPTY and DELETED both have the high bit set, tags never do
+            free = int.from_bytes(control[base:base + GROUP_WIDTH], 'little') & _HIGH
+            if free:
+                return base + ((free & -free).bit_length() >> 3) - 1
+            step += 1
+            group = (group + step) & self._group_mask
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair in the hash map.
+        Once live entries plus DELETED markers reach 7/8 of the slots the table
+        doubles, or is rebuilt in place when most of them are DELETED markers.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        if self._size + self._deleted >= self._capacity * MAX_LOAD:
+            if self._size < self._capacity * MAX_LOAD / 2:
+                self._rehash(self._capacity)
+            else:
+                self._rehash(self._capacity * 2)
+        self._insert(key, value, self._hash_function(key))
+
+    def _insert(self, key: str, value: object, hashcode: int) -> None:
+        """
+        Inserts or updates a pair whose hash code is already known,
+        without checking the load factor.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :param hashcode: The hash code of the key.
+        :return: None
+        """
+        mixed = mix64(hashcode)
+        slot = self._find_slot(key, mixed)
+        if slot != -1:
+            self._values[slot] = value
+            return
+        slot = self._find_free(mixed)
+        if self._control[slot] == DELETED:
+            self._deleted -= 1
+        self._control[slot] = mixed & 0x7F
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._hashes[slot] = hashcode
+        self._size += 1
+
+    def _delete(self, key: str, hashcode: int) -> bool:
+        """
+        Removes the entry for a key whose hash code is already known.
+        The slot becomes EMPTY when its group still has an EMPTY slot, since then
+        no probe sequence ever continued past the group; otherwise it is DELETED.
+
+        :param key: The key to remove.
+        :param hashcode: The hash code of the key.
+        :return: True if the key was present, False otherwise.
+        """
+        slot = self._find_slot(key, mix64(hashcode))
+        if slot == -1:
+            return False
+        base = slot - slot % GROUP_WIDTH
+        word = int.from_bytes(self._control[base:base + GROUP_WIDTH], 'little')
+        if _match_byte(word, _EMPTY_PATTERN):
+            self._control[slot] = EMPTY
+        else:
+            self._control[slot] = DELETED
+            self._deleted += 1
+        self._keys[slot] = None
+        self._values[slot] = None
+        self._size -= 1
+        return True
+
+    def _reserve(self, count: int) -> None:
+        """
+        Grows the table once so that it can hold the given number of entries
+        without put() having to resize it. Growth at least doubles the capacity,
+        so repeated small reservations stay amortized.
+
+        :param count: The number of entries the table must hold.
+        :return: None
+        """
+        if count + self._deleted >= self._capacity * MAX_LOAD:
+            needed = int(count / MAX_LOAD) + 1
+            if needed > self._capacity:
+                needed = max(needed, self._capacity * 2)
+            self._rehash(max(needed, self._capacity))
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the internal hash map table to at least the specified capacity.
+
+        :param new_capacity: The new capacity for the hash map table.
+        :return: None
+        """
+        if new_capacity < self._size:
+            return
+        capacity = self._round_capacity(new_capacity)
+        # grow further if the entries would not fit under the maximum load
+        while self._size >= capacity * MAX_LOAD:
+            capacity *= 2
+        self._rehash(capacity)
+
+    def _rehash(self, capacity: int) -> None:
+        """
+        Moves every live entry into new arrays of the given capacity,
+        placing it from its cached hash code and dropping DELETED markers.
+
+        :param capacity: The new number of slots.
+        :return: None
+        """
+        old_control, old_keys = self._control, self._keys
+        old_values, old_hashes = self._values, self._hashes
+        self._capacity = self._round_capacity(capacity)
+        self._allocate(self._capacity)
+        for i in range(len(old_control)):
+            if old_control[i] & 0x80:
+                continue
+            mixed = mix64(old_hashes[i])
+            slot = self._find_free(mixed)
+            self._control[slot] = mixed & 0x7F
+            self._keys[slot] = old_keys[i]
+            self._values[slot] = old_values[i]
+            self._hashes[slot] = old_hashes[i]
+        self._deleted = 0
+
+    def table_load(self) -> float:
+        """
+        Calculates and returns the current load factor of the hash map.
+
+        :return: The load factor as a float.
+        """
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Counts and returns the number of slots without a live entry.
+
+        :return: The count of empty buckets.
+        """
+        return self._capacity - self._size
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        slot = self._find_slot(key, mix64(self._hash_function(key)))
+        if slot == -1:
+            return None
+        return self._values[slot]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the hash map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._find_slot(key, mix64(self._hash_function(key))) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._delete(key, self._hash_function(key))
+
+    def probe_length(self, key: str) -> int:
+        """
+        Counts the groups a lookup of the given key inspects.
+
+        :param key: The key to look up.
+        :return: The number of groups inspected.
+        """
+        mixed = mix64(self._hash_function(key))
+        pattern = (mixed & 0x7F) * _ONES
+        group = (mixed >> 7) & self._group_mask
+        step = 0
+        while True:
+            base = group * GROUP_WIDTH
+            word = int.from_bytes(self._control[base:base + GROUP_WIDTH], 'little')
+            matches = _match_byte(word, pattern)
+            while matches:
+                bit = matches & -matches
+                if self._keys[base + (bit.bit_length() >> 3) - 1] == key:
+                    return step + 1
+                matches ^= bit
+            if _match_byte(word, _EMPTY_PATTERN) or step > self._group_mask:
+                return step + 1
+            step += 1
+            group = (group + step) & self._group_mask
+
+    def _get_hashed(self, key: str, hashcode: int) -> object:
+        """
+        Retrieves the value of a key whose hash code is already known.
+
+        :param key: The key to search for.
+        :param hashcode: The hash code of the key, before mixing.
+        :return: The value, or None if the key is not found.
+        """
+        slot = self._find_slot(key, mix64(hashcode))
+        return self._values[slot] if slot != -1 else None
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of many keys. With NumPy, the first probed group of
+        every key is gathered into one matrix and compared against all tags at
+        once; only keys whose first group is full and holds no match keep probing.
+
+        :param keys: Sequence or iterator of keys.
+        :return: The value of each key, or None for keys that are not found.
+        """
+        keys = list(keys)
+        if np is None or not keys:
+            return BulkOps.get_many(self, keys)
+        hashes = hash_batch(self._hash_function, keys)
+
+        mixed = mix64_batch(np.array([h & MASK_64 for h in hashes], dtype=np.uint64))
+        tags = (mixed & np.uint64(0x7F)).astype(np.uint8)
+        groups = ((mixed >> np.uint64(7)) & np.uint64(self._group_mask)).astype(np.int64)
+        control = np.frombuffer(self._control, dtype=np.uint8).reshape(-1, GROUP_WIDTH)
+        rows = control[groups]
+        has_empty = (rows == EMPTY).any(axis=1).tolist()
+        candidates, offsets = np.nonzero(rows == tags[:, None])
+        del control, rows
+
+        values = [None] * len(keys)
+        resolved = [False] * len(keys)
+        bases = (groups * GROUP_WIDTH).tolist()
+        for i, offset in zip(candidates.tolist(), offsets.tolist()):
+            slot = bases[i] + offset
+            if not resolved[i] and self._keys[slot] == keys[i]:
+                values[i] = self._values[slot]
+                resolved[i] = True
+        mixed = mixed.tolist()
+        for i in range(len(keys)):
+            if not resolved[i] and not has_empty[i]:
+                slot = self._find_slot(keys[i], mixed[i])
+                if slot != -1:
+                    values[i] = self._values[slot]
+        return values
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the hash map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        arr = DynamicArray()
+        for i in range(self._capacity):
+            if not self._control[i] & 0x80:
+                arr.append((self._keys[i], self._values[i]))
+        return arr
+
+    def clear(self) -> None:
+        """
+        Clears the hash map, removing all key-value pairs.
+
+        :return: None
+        """
+        self.__init__(self._capacity, self._hash_function)
+
+    def __iter__(self):
+        """
+        Iterate over the live entries as HashEntry objects,
+        matching the items produced by hash_map_oa.HashMap
+        """
+        for i in range(self._capacity):
+            if not self._control[i] & 0x80:
+                yield HashEntry(self._keys[i], self._values[i])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nput / get example")
+    print("-----------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+    print(m.get('str42'), m.get('missing'))
+
+    print("\nremove / contains_key example")
+    print("-----------------------------")
+    m = HashMap(79, hash_function_2)
+    keys = [i for i in range(1, 1000, 20)]
+    for key in keys:
+        m.put(str(key), key * 42)
+    m.remove('21')
+    result = not m.contains_key('21')
+    for key in keys[2:]:
+        result &= m.contains_key(str(key))
+        result &= not m.contains_key(str(key + 1))
+    print(m.get_size(), m.get_capacity(), result)
+
+    print("\nget_many example")
+    print("----------------")
+    print(m.get_many(['1', '2', '41', '981']))
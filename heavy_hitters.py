@@ -0,0 +1,332 @@
+# Course: CS261 - Data Structures
+# Description:Streaming top-k / mode over iterators of any length, consumed in chunks.
+# ExactTopK keeps one counter per distinct key in a separate chaining HashMap, so its
+# memory grows with the number of distinct keys. SpaceSaving (Metwally, Agrawal and
+# El Abbadi, 2005) keeps a fixed number of counters, whatever the stream holds:
+#
+#   With `capacity` counters over a stream of n elements, every reported count
+#   over-estimates the true frequency by at most its `error`, and error <= n / capacity.
+#   Every key whose true frequency exceeds n / capacity is guaranteed to be reported.
+#
+# Both report (key, count, error) tuples (error is always 0 for ExactTopK), and both
+# merge partial results computed over separate streams with merge(); merged Space-Saving
+# summaries keep the bound above for the combined stream (Cafaro et al., 2016).
+
+import heapq
+import math
+from itertools import count as _sequence
+from itertools import islice
+
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1
+
+# number of elements read from the stream at a time
+STREAM_CHUNK = 4096
+
+
+def _chunks(stream):
+    """
+    Splits an iterable into lists of at most STREAM_CHUNK elements.
+
+    :param stream: Any iterable, including one-shot iterators, or a DynamicArray.
+    :return: Generator of lists.
+    """
+    if isinstance(stream, DynamicArray):
+        # DynamicArray deliberately does not support iteration
+        da = stream
+        stream = (da[i] for i in range(da.length()))
+    stream = iter(stream)
+    while True:
+        chunk = list(islice(stream, STREAM_CHUNK))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _mode(items) -> tuple[DynamicArray, int]:
+    """
+    Picks the keys with the highest count, in the format of hash_map_sc.find_mode.
+
+    :param items: Iterable of (key, count, error) tuples.
+    :return: A DynamicArray of the keys with the highest count, and that count.
+    """
+    modes, frequency = DynamicArray(), 0
+    for key, count, _ in items:
+        if count > frequency:
+            modes, frequency = DynamicArray(), count
+        if count == frequency:
+            modes.append(key)
+    return modes, frequency
+
+
+class ExactTopK:
+    def __init__(self, function=hash_function_1) -> None:
+        """
+        Initialize an exact counter with one entry per distinct key
+
+        :param function: The hash function applied to keys, or a registered name.
+        """
+        self._counts = hash_map_sc.HashMap(11, function)
+        self._total = 0
+
+    def get_total(self) -> int:
+        """
+        Return the number of elements counted so far
+        """
+        return self._total
+
+    def add(self, key: object, count: int = 1) -> None:
+        """
+        Counts a key count times.
+
+        :param key: The key to count.
+        :param count: The number of occurrences.
+        :return: None
+        """
+        self._counts.increment(key, count)
+        self._total += count
+
+    def update(self, stream) -> None:
+        """
+        Counts every element of a stream, reading it in chunks.
+
+        :param stream: Any iterable of keys.
+        :return: None
+        """
+        counts = self._counts
+        for chunk in _chunks(stream):
+            for key in chunk:
+                counts.increment(key)
+            self._total += len(chunk)
+
+    def merge(self, other: "ExactTopK") -> None:
+        """
+        Adds the counts of another counter, e.g. one fed by a separate stream.
+
+        :param other: The counter to merge into this one.
+        :return: None
+        """
+        for key, count, _ in other.items():
+            self._counts.increment(key, count)
+        self._total += other.get_total()
+
+    def items(self):
+        """
+        Iterate over (key, count, error) tuples in no particular order
+        """
+        for key, count in self._counts.items():
+            yield key, count, 0
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k most frequent keys.
+
+        :param k: The number of keys to return.
+        :return: List of (key, count, error) tuples, most frequent first.
+        """
+        return heapq.nlargest(k, self.items(), key=lambda item: item[1])
+
+    def mode(self) -> tuple[DynamicArray, int]:
+        """
+        Returns the most frequent key(s) and their frequency.
+
+        :return: A DynamicArray of modes and their frequency.
+        """
+        return _mode(self.items())
+
+
+class SpaceSaving:
+    def __init__(self, capacity: int, function=hash_function_1) -> None:
+        """
+        Initialize a Space-Saving summary with a fixed number of counters
+
+        :param capacity: The number of counters kept; counts are accurate to within
+            n / capacity for a stream of n elements.
+        :param function: The hash function applied to keys, or a registered name.
+        """
+        if capacity < 1:
+            raise ValueError("SpaceSaving needs at least one counter")
+        self._capacity = capacity
+        self._function = function
+        # key -> [count, error], and a min-heap of [count, sequence, key, counter]
+        # holding exactly one entry per monitored key
+        self._counters = hash_map_sc.HashMap(capacity, function)
+        self._heap = []
+        self._sequence = _sequence()
+        self._total = 0
+
+    @classmethod
+    def for_error(cls, epsilon: float, function=hash_function_1) -> "SpaceSaving":
+        """
+        Builds a summary whose counts are accurate to within epsilon * n.
+
+        :param epsilon: The relative error, between 0 and 1.
+        :param function: The hash function applied to keys, or a registered name.
+        :return: An empty summary with ceil(1 / epsilon) counters.
+        """
+        if not 0 < epsilon < 1:
+            raise ValueError("epsilon must be between 0 and 1")
+        return cls(math.ceil(1 / epsilon), function)
+
+    def get_capacity(self) -> int:
+        """
+        Return the number of counters
+        """
+        return self._capacity
+
+    def get_total(self) -> int:
+        """
+        Return the number of elements counted so far
+        """
+        return self._total
+
+    def error_bound(self) -> float:
+        """
+        Returns the largest possible over-estimate of any reported count, n / capacity.
+
+        :return: The error bound for the elements counted so far.
+        """
+        return self._total / self._capacity
+
+    def _min_counter(self) -> list:
+        """
+        Returns the heap entry of the monitored key with the lowest count.
+        Counts only grow, so an entry whose count is stale is refreshed and
+        sifted down until the top of the heap is current.
+
+        :return: The [count, sequence, key, counter] entry at the top of the heap.
+        """
+        heap = self._heap
+        while True:
+            entry = heap[0]
+            counter = entry[3]
+            if counter[0] == entry[0]:
+                return entry
+            heapq.heapreplace(heap, [counter[0], next(self._sequence), entry[2], counter])
+
+    def add(self, key: object, count: int = 1) -> None:
+        """
+        Counts a key count times. When every counter is in use and the key is
+        not monitored, it takes over the counter with the lowest count c, with
+        count c + count and error c.
+
+        :param key: The key to count.
+        :param count: The number of occurrences.
+        :return: None
+        """
+        self._total += count
+        counter = [count, 0]
+        current = self._counters.setdefault(key, counter)
+        if current is not counter:
+            current[0] += count
+            return
+        if self._counters.get_size() <= self._capacity:
+            heapq.heappush(self._heap, [count, next(self._sequence), key, counter])
+            return
+        # the new key is not in the heap yet, so it cannot be the one evicted
+        low, _, evicted, _ = self._min_counter()
+        self._counters.remove(evicted)
+        counter[0] += low
+        counter[1] = low
+        heapq.heapreplace(self._heap, [counter[0], next(self._sequence), key, counter])
+
+    def update(self, stream) -> None:
+        """
+        Counts every element of a stream, reading it in chunks.
+
+        :param stream: Any iterable of keys.
+        :return: None
+        """
+        add = self.add
+        for chunk in _chunks(stream):
+            for key in chunk:
+                add(key)
+
+    def merge(self, other: "SpaceSaving") -> None:
+        """
+        Merges the summary of a separate stream into this one. A key missing from
+        a full summary may still have occurred up to that summary's lowest count
+        times, so that count is added to both its count and its error. The
+        capacity of this summary is kept.
+
+        :param other: The summary to merge into this one.
+        :return: None
+        """
+        own_low = self._min_counter()[0] if self._counters.get_size() >= self._capacity else 0
+        other_low = other._min_counter()[0] if other._counters.get_size() >= other._capacity else 0
+        merged = hash_map_sc.HashMap(self._capacity + other.get_capacity(), self._function)
+        for key, count, error in self.items():
+            merged.put(key, [count + other_low, error + other_low])
+        for key, count, error in other.items():
+            counter = merged.get(key)
+            if counter is None:
+                merged.put(key, [count + own_low, error + own_low])
+            else:
+                # the key was monitored by both summaries, undo the other_low added above
+                counter[0] += count - other_low
+                counter[1] += error - other_low
+        kept = heapq.nlargest(self._capacity, merged.items(),
+                              key=lambda pair: pair[1][0])
+
+        total = self._total + other.get_total()
+        self.__init__(self._capacity, self._function)
+        self._total = total
+        for key, counter in kept:
+            self._counters.put(key, counter)
+            self._heap.append([counter[0], next(self._sequence), key, counter])
+        heapq.heapify(self._heap)
+
+    def items(self):
+        """
+        Iterate over (key, count, error) tuples of the monitored keys in no
+        particular order; the true frequency of each key lies in [count - error, count]
+        """
+        for key, counter in self._counters.items():
+            yield key, counter[0], counter[1]
+
+    def top(self, k: int) -> list:
+        """
+        Returns the k keys with the highest estimated counts. A reported key is
+        guaranteed to be among the true top k when count - error is at least the
+        (k + 1)-th highest count.
+
+        :param k: The number of keys to return.
+        :return: List of (key, count, error) tuples, highest count first.
+        """
+        return heapq.nlargest(k, self.items(), key=lambda item: item[1])
+
+    def mode(self) -> tuple[DynamicArray, int]:
+        """
+        Returns the key(s) with the highest estimated count, and that count.
+
+        :return: A DynamicArray of modes and their estimated frequency.
+        """
+        return _mode(self.items())
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nexact mode")
+    print("----------")
+    stream = iter(["apple", "apple", "grape", "melon", "peach", "melon", "apple"])
+    exact = ExactTopK()
+    exact.update(stream)
+    modes, frequency = exact.mode()
+    print(f"Input: stream, Mode : {modes}, Frequency: {frequency}")
+
+    print("\nspace-saving with 2 counters")
+    print("----------------------------")
+    summary = SpaceSaving(2)
+    summary.update(["Arch", "Manjaro", "Manjaro", "Mint", "Mint", "Mint", "Ubuntu", "Ubuntu"])
+    print(summary.top(2), "error bound", summary.error_bound())
+
+    print("\nmerging two streams")
+    print("-------------------")
+    left, right = SpaceSaving(3), SpaceSaving(3)
+    left.update(str(i % 7) for i in range(1000))
+    right.update(str(i % 5) for i in range(1000))
+    left.merge(right)
+    print(left.top(3), left.get_total(), "error bound", left.error_bound())
@@ -0,0 +1,484 @@
+# Course: CS261 - Data Structures
+# Description:Clients of the key-value server (kv_server.py).
+#
+#   Client       blocking client for threaded code. Connections are kept in a pool and
+#                reused, so a call does not open a socket; up to pool_size threads
+#                talk to the server at once and the rest wait for a free connection.
+#   AsyncClient  asyncio client on one connection. Every call is pipelined: its frame
+#                is queued, the queue is written out once per batch window, and replies
+#                are matched to callers by order.
+#
+# Both offer get, put, delete, incr and the bulk mget / mput, which map onto the
+# server's MGET / MPUT, so a batch of keys costs one round trip and one command.
+# Client.pipeline() collects calls and sends them together on execute(). With a
+# batch_window, Client also coalesces calls that different threads make within that
+# many seconds of each other into one round trip, the way AsyncClient always does.
+# round_trips counts the batches written to the server.
+#
+# Keys are str; values are bytes (str is sent as UTF-8). A command the server
+# rejects raises kv_protocol.ServerError.
+
+import asyncio
+import collections
+import queue
+import socket
+import threading
+import time
+
+from kv_protocol import (DEL, GET, INCR, MGET, MPUT, PUT, STATUS_OK, ServerError,
+                         decode_frames, encode_frame)
+
+
+def _result(command: int, code: int, items: list) -> object:
+    """
+    Converts a reply to the value a client call returns.
+
+    :param command: The command the reply answers.
+    :param code: The reply code.
+    :param items: The reply items.
+    :return: bytes or None for GET, a list for MGET, True / False for DEL,
+        an int for INCR and None for PUT and MPUT.
+    """
+    if code != STATUS_OK:
+        raise ServerError(items[0].decode('utf-8', 'replace') if items else "server error")
+    if command == GET:
+        return items[0]
+    if command == MGET:
+        return items
+    if command == DEL:
+        return items[0] == b'1'
+    if command == INCR:
+        return int(items[0])
+    return None
+
+
+def _mput_items(pairs) -> list:
+    """
+    Flattens pairs for MPUT.
+
+    :param pairs: A mapping or an iterable of (key, value) pairs.
+    :return: The list key, value, key, value, ...
+    """
+    if hasattr(pairs, 'items'):
+        pairs = pairs.items()
+    return [item for pair in pairs for item in pair]
+
+
+class _Connection:
+    """A blocking socket that sends frames and reads their replies in order."""
+
+    def __init__(self, address, timeout: float | None) -> None:
+        if isinstance(address, str):
+            self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.socket.settimeout(timeout)
+        self.socket.connect(address)
+        self._buffer = bytearray()
+
+    def round_trip(self, frames: list) -> list:
+        """
+        Sends frames in one write and reads one reply per frame.
+
+        :param frames: Encoded request frames.
+        :return: List of (code, items) replies.
+        """
+        self.socket.sendall(b''.join(frames))
+        replies = []
+        while len(replies) < len(frames):
+            data = self.socket.recv(65536)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self._buffer += data
+            decoded, consumed = decode_frames(self._buffer)
+            del self._buffer[:consumed]
+            replies.extend(decoded)
+        return replies
+
+    def close(self) -> None:
+        self.socket.close()
+
+
+class Pipeline:
+    """Calls collected by Client.pipeline(), sent in one round trip by execute()."""
+
+    def __init__(self, client: "Client") -> None:
+        self._client = client
+        self._commands = []
+        self._frames = []
+
+    def _queue(self, command: int, items) -> "Pipeline":
+        self._commands.append(command)
+        self._frames.append(encode_frame(command, items))
+        return self
+
+    def get(self, key: str) -> "Pipeline":
+        return self._queue(GET, (key,))
+
+    def put(self, key: str, value) -> "Pipeline":
+        return self._queue(PUT, (key, value))
+
+    def delete(self, key: str) -> "Pipeline":
+        return self._queue(DEL, (key,))
+
+    def incr(self, key: str, delta: int = 1) -> "Pipeline":
+        return self._queue(INCR, (key, delta))
+
+    def mget(self, keys) -> "Pipeline":
+        return self._queue(MGET, list(keys))
+
+    def mput(self, pairs) -> "Pipeline":
+        return self._queue(MPUT, _mput_items(pairs))
+
+    def execute(self) -> list:
+        """
+        Sends the collected calls and clears the pipeline.
+
+        :return: The result of each call, in order; a call the server rejected
+            has its ServerError in its place instead of raising.
+        """
+        commands, frames = self._commands, self._frames
+        self._commands, self._frames = [], []
+        if not frames:
+            return []
+        results = []
+        for command, (code, items) in zip(commands, self._client._send(frames)):
+            try:
+                results.append(_result(command, code, items))
+            except ServerError as error:
+                results.append(error)
+        return results
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.execute()
+
+
+class _Waiter:
+    """A call waiting in a batch window for its reply."""
+
+    __slots__ = ('frame', 'reply', 'error', 'done')
+
+    def __init__(self, frame: bytes) -> None:
+        self.frame = frame
+        self.reply = None
+        self.error = None
+        self.done = threading.Event()
+
+
+class Client:
+    def __init__(self, address=('127.0.0.1', 7379), pool_size: int = 8,
+                 timeout: float = None, batch_window: float = None) -> None:
+        """
+        Initialize a client; connections are opened when they are first needed
+
+        :param address: A (host, port) pair, or the path of a Unix socket.
+        :param pool_size: The most connections open at once.
+        :param timeout: Socket timeout in seconds, or None to block.
+        :param batch_window: If set, seconds a call waits for calls from other
+            threads to share its round trip.
+        """
+        self._address = address
+        self._timeout = timeout
+        self._batch_window = batch_window
+        self._pool = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._batch_lock = threading.Lock()
+        self._batch = None
+        self.round_trips = 0
+
+    def _send(self, frames: list) -> list:
+        """
+        Runs frames in one round trip on a pooled connection. A connection that
+        fails is closed instead of being returned to the pool.
+
+        :param frames: Encoded request frames.
+        :return: List of (code, items) replies.
+        """
+        self._slots.acquire()
+        try:
+            try:
+                connection = self._pool.get_nowait()
+            except queue.Empty:
+                connection = _Connection(self._address, self._timeout)
+            try:
+                replies = connection.round_trip(frames)
+            except BaseException:
+                connection.close()
+                raise
+            self._pool.put(connection)
+            self.round_trips += 1
+            return replies
+        finally:
+            self._slots.release()
+
+    def _call(self, command: int, items) -> object:
+        """
+        Runs one command, in a shared batch when there is a batch window.
+
+        :param command: The command.
+        :param items: Its arguments.
+        :return: The converted result, see _result.
+        """
+        frame = encode_frame(command, items)
+        if self._batch_window is None:
+            code, reply = self._send([frame])[0]
+            return _result(command, code, reply)
+        waiter = _Waiter(frame)
+        with self._batch_lock:
+            leader = self._batch is None
+            if leader:
+                self._batch = []
+            self._batch.append(waiter)
+        if leader:
+            self._flush_batch()
+        waiter.done.wait()
+        if waiter.error is not None:
+            raise waiter.error
+        return _result(command, *waiter.reply)
+
+    def _flush_batch(self) -> None:
+        """
+        Run by the first call of a batch: waits out the window, then sends every
+        call that joined in one round trip and hands each its reply.
+
+        :return: None
+        """
+        time.sleep(self._batch_window)
+        with self._batch_lock:
+            batch, self._batch = self._batch, None
+        try:
+            replies = self._send([waiter.frame for waiter in batch])
+            for waiter, reply in zip(batch, replies):
+                waiter.reply = reply
+        except Exception as error:
+            for waiter in batch:
+                waiter.error = error
+        for waiter in batch:
+            waiter.done.set()
+
+    def get(self, key: str) -> bytes | None:
+        """
+        Retrieves the value of a key.
+
+        :param key: The key.
+        :return: The value, or None if the key is not stored.
+        """
+        return self._call(GET, (key,))
+
+    def put(self, key: str, value) -> None:
+        """
+        Inserts or updates a pair.
+
+        :param key: The key.
+        :param value: The value, as bytes or str.
+        :return: None
+        """
+        self._call(PUT, (key, value))
+
+    def delete(self, key: str) -> bool:
+        """
+        Removes a key.
+
+        :param key: The key.
+        :return: True if the key was stored, False otherwise.
+        """
+        return self._call(DEL, (key,))
+
+    def incr(self, key: str, delta: int = 1) -> int:
+        """
+        Adds delta to the integer stored at a key, starting from 0 for a new key.
+
+        :param key: The key.
+        :param delta: The amount to add.
+        :return: The new value.
+        """
+        return self._call(INCR, (key, delta))
+
+    def mget(self, keys) -> list:
+        """
+        Retrieves many keys with one MGET.
+
+        :param keys: Iterable of keys.
+        :return: The value of each key, or None for keys that are not stored.
+        """
+        return self._call(MGET, list(keys))
+
+    def mput(self, pairs) -> None:
+        """
+        Stores many pairs with one MPUT.
+
+        :param pairs: A mapping or an iterable of (key, value) pairs.
+        :return: None
+        """
+        self._call(MPUT, _mput_items(pairs))
+
+    def pipeline(self) -> Pipeline:
+        """
+        Returns a pipeline whose calls are sent together by execute(), or when a
+        with block around it ends.
+
+        :return: A new Pipeline.
+        """
+        return Pipeline(self)
+
+    def close(self) -> None:
+        """
+        Closes the idle pooled connections.
+
+        :return: None
+        """
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def __enter__(self) -> "Client":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class AsyncClient:
+    def __init__(self, address=('127.0.0.1', 7379), batch_window: float = 0.0) -> None:
+        """
+        Initialize a client; call connect() before use
+
+        :param address: A (host, port) pair, or the path of a Unix socket.
+        :param batch_window: Seconds queued calls wait before their batch is
+            written; 0 writes once per event loop iteration, after every task
+            that is ready has queued its calls.
+        """
+        self._address = address
+        self._batch_window = batch_window
+        self._writer = None
+        self._reader_task = None
+        self._outgoing = []
+        # (command, future) of every call sent or queued, oldest first
+        self._pending = collections.deque()
+        self._flush_handle = None
+        self.round_trips = 0
+
+    async def connect(self) -> "AsyncClient":
+        """
+        Opens the connection.
+
+        :return: The client.
+        """
+        if isinstance(self._address, str):
+            reader, self._writer = await asyncio.open_unix_connection(self._address)
+        else:
+            reader, self._writer = await asyncio.open_connection(*self._address)
+        self._reader_task = asyncio.get_running_loop().create_task(self._read_replies(reader))
+        return self
+
+    async def _read_replies(self, reader) -> None:
+        """
+        Resolves pending calls with their replies, in order, until the connection
+        closes; the calls still pending then fail.
+
+        :param reader: The connection's stream reader.
+        :return: None
+        """
+        buffer = bytearray()
+        error = ConnectionError("server closed the connection")
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                replies, consumed = decode_frames(buffer)
+                del buffer[:consumed]
+                for code, items in replies:
+                    command, future = self._pending.popleft()
+                    if not future.done():
+                        try:
+                            future.set_result(_result(command, code, items))
+                        except ServerError as rejected:
+                            future.set_exception(rejected)
+        except Exception as failure:
+            error = failure
+        for _, future in self._pending:
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+    def _flush(self) -> None:
+        """
+        Writes every queued frame in one write.
+
+        :return: None
+        """
+        self._flush_handle = None
+        if self._outgoing:
+            self._writer.write(b''.join(self._outgoing))
+            self._outgoing = []
+            self.round_trips += 1
+
+    def _call(self, command: int, items) -> asyncio.Future:
+        """
+        Queues one command for the next batch.
+
+        :param command: The command.
+        :param items: Its arguments.
+        :return: A future for the converted result, see _result.
+        """
+        if self._writer is None:
+            raise RuntimeError("call connect() first")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._outgoing.append(encode_frame(command, items))
+        self._pending.append((command, future))
+        if self._flush_handle is None:
+            if self._batch_window:
+                self._flush_handle = loop.call_later(self._batch_window, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+        return future
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._call(GET, (key,))
+
+    async def put(self, key: str, value) -> None:
+        await self._call(PUT, (key, value))
+
+    async def delete(self, key: str) -> bool:
+        return await self._call(DEL, (key,))
+
+    async def incr(self, key: str, delta: int = 1) -> int:
+        return await self._call(INCR, (key, delta))
+
+    async def mget(self, keys) -> list:
+        return await self._call(MGET, list(keys))
+
+    async def mput(self, pairs) -> None:
+        await self._call(MPUT, _mput_items(pairs))
+
+    async def close(self) -> None:
+        """
+        Sends anything still queued and closes the connection.
+
+        :return: None
+        """
+        if self._writer is None:
+            return
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+        self._flush()
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._reader_task
+        self._writer = None
+
+    async def __aenter__(self) -> "AsyncClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
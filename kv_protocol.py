@@ -0,0 +1,135 @@
+# Course: CS261 - Data Structures
+# Description:Wire protocol of the key-value server (kv_server.py) and its clients
+# (kv_client.py). Every request and reply is one length-prefixed frame:
+#
+#   header  payload length u32, code u8 (little-endian)
+#   payload a sequence of items, each a length i32 followed by that many bytes;
+#           length -1 is a missing value (nil) with no bytes
+#
+# A request's code is its command; a reply's code is STATUS_OK, or STATUS_ERROR with
+# the message as its only item. Keys are UTF-8 text and values are bytes; INCR keeps
+# its counter as ASCII digits, like Redis.
+#
+#   GET  key               -> value or nil
+#   PUT  key value         -> (nothing)
+#   DEL  key               -> b'1' if the key was present, else b'0'
+#   MGET key...            -> one value or nil per key
+#   MPUT key value ...     -> (nothing)
+#   INCR key [delta]       -> the new value
+#
+# Replies come back in request order, so a client may send many requests before
+# reading any reply (pipelining) and match them up by position.
+
+import struct
+
+HEADER = struct.Struct('<IB')
+ITEM = struct.Struct('<i')
+
+# largest payload accepted, in bytes
+MAX_FRAME = 64 * 2 ** 20
+
+# commands
+GET = 1
+PUT = 2
+DEL = 3
+MGET = 4
+MPUT = 5
+INCR = 6
+
+COMMANDS = {'GET': GET, 'PUT': PUT, 'DEL': DEL, 'MGET': MGET, 'MPUT': MPUT, 'INCR': INCR}
+
+# reply codes
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+
+class ProtocolError(ValueError):
+    """A frame that cannot be decoded; the connection cannot be resynchronized."""
+
+
+class ServerError(Exception):
+    """A command the server answered with STATUS_ERROR."""
+
+
+def _as_bytes(item) -> bytes | None:
+    """
+    Converts an item to its bytes on the wire.
+
+    :param item: bytes, str (encoded as UTF-8), int (ASCII digits) or None.
+    :return: The bytes, or None for nil.
+    """
+    if item is None or type(item) is bytes:
+        return item
+    if isinstance(item, str):
+        return item.encode('utf-8')
+    if isinstance(item, int):
+        return str(item).encode('ascii')
+    if isinstance(item, (bytearray, memoryview)):
+        return bytes(item)
+    raise TypeError(f"cannot send a {type(item).__name__}; use bytes, str or int")
+
+
+def encode_frame(code: int, items=()) -> bytes:
+    """
+    Builds one frame.
+
+    :param code: The command or reply code.
+    :param items: The items, see _as_bytes.
+    :return: The frame.
+    """
+    parts = [b'']
+    length = 0
+    for item in items:
+        data = _as_bytes(item)
+        if data is None:
+            parts.append(ITEM.pack(-1))
+            length += ITEM.size
+        else:
+            parts.append(ITEM.pack(len(data)))
+            parts.append(data)
+            length += ITEM.size + len(data)
+    if length > MAX_FRAME:
+        raise ValueError(f"frame of {length} bytes is larger than MAX_FRAME")
+    parts[0] = HEADER.pack(length, code)
+    return b''.join(parts)
+
+
+def decode_frames(buffer: bytearray) -> tuple[list, int]:
+    """
+    Decodes every complete frame at the start of a buffer.
+
+    :param buffer: Received bytes.
+    :return: Tuple of (list of (code, items) pairs, number of bytes consumed);
+        items is a list of bytes and None.
+    """
+    frames = []
+    position = 0
+    end = len(buffer)
+    view = memoryview(buffer)
+    try:
+        while end - position >= HEADER.size:
+            length, code = HEADER.unpack_from(buffer, position)
+            if length > MAX_FRAME:
+                raise ProtocolError(f"frame of {length} bytes is larger than MAX_FRAME")
+            stop = position + HEADER.size + length
+            if stop > end:
+                break
+            items = []
+            at = position + HEADER.size
+            while at < stop:
+                if stop - at < ITEM.size:
+                    raise ProtocolError("item length runs past the end of its frame")
+                size = ITEM.unpack_from(buffer, at)[0]
+                at += ITEM.size
+                if size == -1:
+                    items.append(None)
+                    continue
+                if size < 0 or at + size > stop:
+                    raise ProtocolError("item runs past the end of its frame")
+                items.append(bytes(view[at:at + size]))
+                at += size
+            frames.append((code, items))
+            position = stop
+    finally:
+        view.release()
+    return frames, position
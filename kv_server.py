@@ -0,0 +1,194 @@
+# Course: CS261 - Data Structures
+# Description:asyncio server exposing one engine instance over TCP or a Unix socket,
+# with the protocol of kv_protocol.py, so that services share one store instead of each
+# embedding its own HashMap.
+#
+# Commands run on the event loop thread, one at a time and in arrival order, so the
+# engine needs no locking. A connection is pipelined: every frame that has arrived is
+# decoded and run as soon as it is complete, without waiting for earlier replies to be
+# read, and all the replies to one read from the socket are joined and handed to the
+# transport with a single write. A client keeping many commands in flight therefore
+# costs one read and one write per batch instead of per command. Reading from a
+# connection pauses while the transport's write buffer is above its high-water mark,
+# so a client that does not read its replies cannot make the server buffer without
+# bound.
+#
+# Usage: python kv_server.py [--host HOST] [--port PORT | --unix PATH]
+#                            [--engine hash_map_sc] [--function fnv1a]
+
+import argparse
+import asyncio
+import importlib
+import os
+
+import kv_protocol
+from kv_protocol import (DEL, GET, INCR, MGET, MPUT, PUT, STATUS_ERROR, STATUS_OK,
+                         ProtocolError, encode_frame)
+
+_OK = encode_frame(STATUS_OK)
+
+
+class Store:
+    def __init__(self, engine: str = 'hash_map_sc', function='fnv1a', capacity: int = 11) -> None:
+        """
+        Initialize the engine that holds the served pairs; values are stored as bytes
+
+        :param engine: Name of the engine module, e.g. 'hash_map_sc'. Its HashMap
+            must offer put, get, put_many, get_many and remove_many.
+        :param function: The hash function, or its registered name.
+        :param capacity: The initial capacity.
+        """
+        self.map = importlib.import_module(engine).HashMap(capacity, function)
+        self.handlers = {
+            GET: self._get,
+            PUT: self._put,
+            DEL: self._del,
+            MGET: self._mget,
+            MPUT: self._mput,
+            INCR: self._incr,
+        }
+
+    @staticmethod
+    def _key(data: bytes | None) -> str:
+        """
+        Decodes a key.
+
+        :param data: The key's bytes.
+        :return: The key.
+        """
+        if data is None:
+            raise ValueError("a key cannot be nil")
+        return data.decode('utf-8')
+
+    def execute(self, code: int, items: list) -> bytes:
+        """
+        Runs one command.
+
+        :param code: The command.
+        :param items: Its arguments.
+        :return: The reply frame; an error reply if the command fails.
+        """
+        handler = self.handlers.get(code)
+        if handler is None:
+            return encode_frame(STATUS_ERROR, (f"unknown command {code}",))
+        try:
+            return handler(items)
+        except (ValueError, TypeError, UnicodeDecodeError) as error:
+            return encode_frame(STATUS_ERROR, (str(error),))
+
+    def _get(self, items: list) -> bytes:
+        if len(items) != 1:
+            raise ValueError("GET takes a key")
+        return encode_frame(STATUS_OK, (self.map.get(self._key(items[0])),))
+
+    def _put(self, items: list) -> bytes:
+        if len(items) != 2 or items[1] is None:
+            raise ValueError("PUT takes a key and a value")
+        self.map.put(self._key(items[0]), items[1])
+        return _OK
+
+    def _del(self, items: list) -> bytes:
+        if len(items) != 1:
+            raise ValueError("DEL takes a key")
+        removed = self.map.remove_many((self._key(items[0]),))[0]
+        return encode_frame(STATUS_OK, (b'1' if removed else b'0',))
+
+    def _mget(self, items: list) -> bytes:
+        return encode_frame(STATUS_OK, self.map.get_many([self._key(item) for item in items]))
+
+    def _mput(self, items: list) -> bytes:
+        if len(items) % 2 or None in items[1::2]:
+            raise ValueError("MPUT takes keys and values in pairs")
+        self.map.put_many([self._key(item) for item in items[::2]], items[1::2])
+        return _OK
+
+    def _incr(self, items: list) -> bytes:
+        if len(items) not in (1, 2):
+            raise ValueError("INCR takes a key and an optional delta")
+        key = self._key(items[0])
+        delta = int(items[1]) if len(items) == 2 else 1
+        value = self.map.get(key)
+        value = delta if value is None else int(value) + delta
+        data = str(value).encode('ascii')
+        self.map.put(key, data)
+        return encode_frame(STATUS_OK, (data,))
+
+
+class _Connection(asyncio.Protocol):
+    """One client connection: decodes frames, runs them and writes the replies."""
+
+    def __init__(self, store: Store) -> None:
+        self._store = store
+        self._buffer = bytearray()
+        self._transport = None
+
+    def connection_made(self, transport) -> None:
+        self._transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self._buffer += data
+        try:
+            frames, consumed = kv_protocol.decode_frames(self._buffer)
+        except ProtocolError:
+            # there is no way to find the next frame; drop the connection
+            self._transport.abort()
+            return
+        if not frames:
+            return
+        del self._buffer[:consumed]
+        execute = self._store.execute
+        self._transport.write(b''.join([execute(code, items) for code, items in frames]))
+
+    def pause_writing(self) -> None:
+        self._transport.pause_reading()
+
+    def resume_writing(self) -> None:
+        self._transport.resume_reading()
+
+
+async def start_server(store: Store, host: str = '127.0.0.1', port: int = 7379,
+                       path: str = None) -> asyncio.AbstractServer:
+    """
+    Starts serving a store on the running event loop.
+
+    :param store: The store.
+    :param host: The TCP host, used when path is None.
+    :param port: The TCP port; 0 picks a free one.
+    :param path: A Unix socket path to listen on instead of TCP.
+    :return: The asyncio server.
+    """
+    loop = asyncio.get_running_loop()
+    if path is not None:
+        if os.path.exists(path):
+            os.remove(path)
+        return await loop.create_unix_server(lambda: _Connection(store), path)
+    return await loop.create_server(lambda: _Connection(store), host, port)
+
+
+async def _main(arguments) -> None:
+    """
+    Runs the server until it is interrupted.
+
+    :param arguments: Parsed command-line arguments.
+    :return: None
+    """
+    store = Store(arguments.engine, arguments.function)
+    server = await start_server(store, arguments.host, arguments.port, arguments.unix)
+    address = arguments.unix or '%s:%d' % server.sockets[0].getsockname()[:2]
+    print(f"serving {arguments.engine} on {address}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Serve a HashMap engine over the network.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=7379)
+    parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    parser.add_argument('--engine', default='hash_map_sc')
+    parser.add_argument('--function', default='fnv1a')
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
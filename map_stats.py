@@ -0,0 +1,499 @@
+# Course: CS261 - Data Structures
+# Description:Live statistics of a HashMap, kept by hash_map_sc and hash_map_oa when
+# they are created with collect_stats=True or after enable_stats(), and read with
+# their stats() method.
+#
+# A map without statistics pays nothing for them: enable_stats() binds counting
+# versions of the few methods that do the work (lookup, insert, delete, rehash) on
+# the map instance, shadowing the class methods, and disable_stats() removes them
+# again. The counting versions call the class methods and do their own bookkeeping
+# around them, so the probing and chaining code itself is unchanged.
+#
+# Histograms count small non-negative integers (chain or probe lengths) exactly,
+# in a list indexed by the value.
+#
+# A Sampler, attached with set_sampler(), times one in every N put / get / remove
+# calls (N on average; the gaps are randomized so a periodic workload cannot hide from
+# it) and records each sample's latency, chain or probe depth and whether the call
+# started a resize. Latencies go into a LatencyHistogram, which like HdrHistogram
+# keeps buckets of equal relative width, so a few dozen counters cover nanoseconds to
+# seconds within a fixed relative error. Samples are also handed to hooks, e.g. a
+# JsonLinesWriter, and prometheus_text() renders the histograms in the Prometheus
+# text exposition format. Detaching the sampler removes the wrappers, as above.
+
+import json
+import random
+import time
+
+
+class Histogram:
+    """Exact counts of small non-negative integers."""
+
+    __slots__ = ('_counts', '_total')
+
+    def __init__(self) -> None:
+        self._counts = []
+        self._total = 0
+
+    def add(self, value: int, count: int = 1) -> None:
+        """
+        Records a value count times; a negative count takes occurrences away.
+
+        :param value: The value.
+        :param count: How many times to record it.
+        :return: None
+        """
+        counts = self._counts
+        if value >= len(counts):
+            counts.extend([0] * (value + 1 - len(counts)))
+        counts[value] += count
+        self._total += count
+
+    def move(self, old: int, new: int) -> None:
+        """
+        Replaces one occurrence of a value with another, e.g. a chain that grew.
+
+        :param old: The value taken away.
+        :param new: The value recorded instead.
+        :return: None
+        """
+        self.add(old, -1)
+        self.add(new)
+
+    def reset(self) -> None:
+        """
+        Forgets every value.
+
+        :return: None
+        """
+        self._counts = []
+        self._total = 0
+
+    def get_count(self, value: int) -> int:
+        """
+        Return how many times a value was recorded
+        """
+        return self._counts[value] if value < len(self._counts) else 0
+
+    def percentile(self, fraction: float) -> int:
+        """
+        Returns the smallest value at or above the given fraction of the records.
+
+        :param fraction: Between 0 and 1, e.g. 0.99.
+        :return: The value, or 0 if nothing was recorded.
+        """
+        target = fraction * self._total
+        seen = 0
+        for value, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= target:
+                return value
+        return 0
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counts and a summary.
+
+        :return: Dictionary with keys count, mean, p50, p99, max and counts,
+            the latter mapping each recorded value to its count.
+        """
+        counts = {value: count for value, count in enumerate(self._counts) if count}
+        total = self._total
+        return {
+            'count': total,
+            'mean': sum(value * count for value, count in counts.items()) / total if total else 0.0,
+            'p50': self.percentile(0.5),
+            'p99': self.percentile(0.99),
+            'max': max(counts, default=0),
+            'counts': counts,
+        }
+
+
+class MapStats:
+    """Counters of one map; see hash_map_sc.HashMap.stats() and hash_map_oa.HashMap.stats()."""
+
+    def __init__(self, histograms=()) -> None:
+        """
+        Initialize zeroed counters
+
+        :param histograms: Names of the histograms the map keeps.
+        """
+        self.histograms = {name: Histogram() for name in histograms}
+        self.hits = 0
+        self.misses = 0
+        # rehashes into a new capacity, and (open addressing) in place to drop tombstones
+        self.resizes = 0
+        self.purges = 0
+        self.resize_seconds = 0.0
+        self._timing = False
+
+    def count_lookup(self, found: bool) -> None:
+        """
+        Counts a hit or a miss.
+
+        :param found: True for a hit.
+        :return: None
+        """
+        if found:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def timed(self, function, *args) -> object:
+        """
+        Calls a rehashing function, adding its duration to resize_seconds. Calls
+        nested inside another timed call are not counted twice.
+
+        :param function: The function.
+        :param args: Its arguments.
+        :return: What the function returns.
+        """
+        if self._timing:
+            return function(*args)
+        self._timing = True
+        start = time.perf_counter()
+        try:
+            return function(*args)
+        finally:
+            self.resize_seconds += time.perf_counter() - start
+            self._timing = False
+
+    def snapshot(self) -> dict:
+        """
+        Returns the counters.
+
+        :return: Dictionary with keys hits, misses, hit_rate, resizes, purges,
+            resize_seconds and one key per histogram, see Histogram.snapshot().
+        """
+        lookups = self.hits + self.misses
+        out = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'resizes': self.resizes,
+            'purges': self.purges,
+            'resize_seconds': self.resize_seconds,
+        }
+        for name, histogram in self.histograms.items():
+            out[name] = histogram.snapshot()
+        return out
+
+
+class LatencyHistogram:
+    """
+    Counts of non-negative integers (nanoseconds) in buckets of equal relative
+    width: values below 2 ** (precision + 1) are counted exactly, and above that
+    every power-of-two range is split into 2 ** precision buckets, so a recorded
+    value is known within 1 / 2 ** precision of itself.
+    """
+
+    def __init__(self, precision: int = 4) -> None:
+        """
+        Initialize an empty histogram
+
+        :param precision: Bits of each value kept; 4 gives buckets 6.25% wide.
+        """
+        self._precision = precision
+        self._sub_buckets = 1 << precision
+        self._counts = []
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def _index(self, value: int) -> int:
+        """
+        Returns the bucket of a value.
+
+        :param value: The value.
+        :return: The index into the counts.
+        """
+        if value < 2 * self._sub_buckets:
+            return value
+        shift = value.bit_length() - self._precision - 1
+        return shift * self._sub_buckets + (value >> shift)
+
+    def _highest(self, index: int) -> int:
+        """
+        Returns the largest value that falls into a bucket.
+
+        :param index: The bucket.
+        :return: The value.
+        """
+        if index < 2 * self._sub_buckets:
+            return index
+        shift = index // self._sub_buckets - 1
+        return ((index - shift * self._sub_buckets + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        """
+        Records one value.
+
+        :param value: The value; negative values are recorded as 0.
+        :return: None
+        """
+        value = max(value, 0)
+        index = self._index(value)
+        counts = self._counts
+        if index >= len(counts):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def reset(self) -> None:
+        """
+        Forgets every value.
+
+        :return: None
+        """
+        self._counts = []
+        self.count = self.total = self.max = 0
+
+    def count_below(self, bound: int) -> int:
+        """
+        Counts the values below a power of two, exactly.
+
+        :param bound: A power of two.
+        :return: The number of recorded values smaller than bound.
+        """
+        return sum(self._counts[:self._index(bound)])
+
+    def percentile(self, fraction: float) -> int:
+        """
+        Returns the largest value of the bucket that holds the given fraction of
+        the records, which overstates the true percentile by less than the
+        bucket width.
+
+        :param fraction: Between 0 and 1, e.g. 0.99.
+        :return: The value, or 0 if nothing was recorded.
+        """
+        target = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if count and seen >= target:
+                return min(self._highest(index), self.max)
+        return 0
+
+    def snapshot(self) -> dict:
+        """
+        Returns a summary.
+
+        :return: Dictionary with keys count, mean, p50, p90, p99, p999 and max.
+        """
+        return {
+            'count': self.count,
+            'mean': self.total / self.count if self.count else 0.0,
+            'p50': self.percentile(0.5),
+            'p90': self.percentile(0.9),
+            'p99': self.percentile(0.99),
+            'p999': self.percentile(0.999),
+            'max': self.max,
+        }
+
+
+# operations a Sampler times
+SAMPLED_OPERATIONS = ('put', 'get', 'remove')
+
+
+class Sampler:
+    """
+    Latency, depth and resize samples of put / get / remove calls of the maps it
+    is attached to with set_sampler(); one sampler may serve several maps.
+    """
+
+    def __init__(self, every: int = 100, hooks=(), seed: int = None) -> None:
+        """
+        Initialize empty histograms
+
+        :param every: One call in every this many is sampled, on average;
+            1 samples every call.
+        :param hooks: Callables given each sample as a dictionary with keys time
+            (seconds since the epoch), operation, latency_ns, depth and resized.
+        :param seed: Seed of the random gaps between samples.
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.every = every
+        self.hooks = list(hooks)
+        self.latency = {operation: LatencyHistogram() for operation in SAMPLED_OPERATIONS}
+        self.depth = {operation: Histogram() for operation in SAMPLED_OPERATIONS}
+        self.resizes = dict.fromkeys(SAMPLED_OPERATIONS, 0)
+        self._random = random.Random(seed)
+        self._countdown = self._gap()
+
+    def _gap(self) -> int:
+        """
+        Draws the number of calls until the next sample, every on average.
+
+        :return: The number of calls.
+        """
+        return self._random.randint(1, 2 * self.every - 1)
+
+    def due(self) -> bool:
+        """
+        Counts one call; returns whether it is to be sampled.
+
+        :return: True for a sampled call.
+        """
+        self._countdown -= 1
+        if self._countdown:
+            return False
+        self._countdown = self._gap()
+        return True
+
+    def record(self, operation: str, latency_ns: int, depth: int, resized: bool) -> None:
+        """
+        Records one sampled call and passes it to the hooks.
+
+        :param operation: 'put', 'get' or 'remove'.
+        :param latency_ns: The wall-clock duration of the call.
+        :param depth: The chain nodes or probe slots the key's lookup inspected.
+        :param resized: Whether the call started a resize of the table.
+        :return: None
+        """
+        self.latency[operation].record(latency_ns)
+        self.depth[operation].add(depth)
+        if resized:
+            self.resizes[operation] += 1
+        if self.hooks:
+            sample = {'time': time.time(), 'operation': operation, 'latency_ns': latency_ns,
+                      'depth': depth, 'resized': resized}
+            for hook in self.hooks:
+                hook(sample)
+
+    def reset(self) -> None:
+        """
+        Forgets every sample.
+
+        :return: None
+        """
+        for operation in SAMPLED_OPERATIONS:
+            self.latency[operation].reset()
+            self.depth[operation].reset()
+            self.resizes[operation] = 0
+
+    def snapshot(self) -> dict:
+        """
+        Returns the samples so far.
+
+        :return: Dictionary mapping each operation to a dictionary with keys
+            latency_ns (see LatencyHistogram.snapshot()), depth (see
+            Histogram.snapshot()) and resizes.
+        """
+        return {operation: {'latency_ns': self.latency[operation].snapshot(),
+                            'depth': self.depth[operation].snapshot(),
+                            'resizes': self.resizes[operation]}
+                for operation in SAMPLED_OPERATIONS}
+
+
+class JsonLinesWriter:
+    """Sampler hook writing each sample to a text file as one line of JSON."""
+
+    def __init__(self, file, labels: dict = None) -> None:
+        """
+        Initialize the writer
+
+        :param file: A text file object opened for writing.
+        :param labels: Extra keys written with every sample, e.g. {'map': 'sessions'}.
+        """
+        self._file = file
+        self._labels = labels or {}
+
+    def __call__(self, sample: dict) -> None:
+        self._file.write(json.dumps({**self._labels, **sample}) + '\n')
+
+
+# upper bounds of the Prometheus buckets: powers of two, in nanoseconds for latency
+# (128 ns to 8.6 s) and in slots or nodes for depth. Powers of two are bucket edges
+# of LatencyHistogram, so each bucket counts exactly the latencies below its bound.
+LATENCY_BOUNDS = tuple(2 ** k for k in range(7, 34))
+DEPTH_BOUNDS = tuple(2 ** k for k in range(11))
+
+
+def _labels(labels: dict) -> str:
+    """
+    Formats Prometheus labels.
+
+    :param labels: Label names and values.
+    :return: The labels in braces.
+    """
+    escaped = (f'{name}="' + str(value).replace('\\', '\\\\').replace('"', '\\"')
+               .replace('\n', '\\n') + '"' for name, value in labels.items())
+    return '{' + ','.join(escaped) + '}'
+
+
+def prometheus_text(sampler: Sampler, prefix: str = 'hashmap', labels: dict = None) -> str:
+    """
+    Renders a sampler in the Prometheus text exposition format: histograms
+    <prefix>_operation_seconds and <prefix>_operation_depth, and the counter
+    <prefix>_sampled_resizes_total, each labelled with the operation.
+
+    :param sampler: The sampler.
+    :param prefix: Prefix of the metric names.
+    :param labels: Extra labels of every series, e.g. {'map': 'sessions'}.
+    :return: The text, ending with a newline.
+    """
+    labels = labels or {}
+    lines = [f'# HELP {prefix}_operation_seconds Latency of sampled HashMap operations.',
+             f'# TYPE {prefix}_operation_seconds histogram']
+    for operation in SAMPLED_OPERATIONS:
+        histogram = sampler.latency[operation]
+        series = {**labels, 'operation': operation}
+        for bound in LATENCY_BOUNDS:
+            lines.append(f'{prefix}_operation_seconds_bucket'
+                         f'{_labels({**series, "le": repr(bound / 1e9)})} '
+                         f'{histogram.count_below(bound)}')
+        lines.append(f'{prefix}_operation_seconds_bucket{_labels({**series, "le": "+Inf"})} '
+                     f'{histogram.count}')
+        lines.append(f'{prefix}_operation_seconds_sum{_labels(series)} {histogram.total / 1e9!r}')
+        lines.append(f'{prefix}_operation_seconds_count{_labels(series)} {histogram.count}')
+    lines += [f'# HELP {prefix}_operation_depth Chain nodes or probe slots inspected '
+              f'by sampled HashMap operations.',
+              f'# TYPE {prefix}_operation_depth histogram']
+    for operation in SAMPLED_OPERATIONS:
+        histogram = sampler.depth[operation]
+        series = {**labels, 'operation': operation}
+        seen = 0
+        for value in range(DEPTH_BOUNDS[-1] + 1):
+            seen += histogram.get_count(value)
+            if value in DEPTH_BOUNDS:
+                lines.append(f'{prefix}_operation_depth_bucket{_labels({**series, "le": value})} '
+                             f'{seen}')
+        snapshot = histogram.snapshot()
+        lines.append(f'{prefix}_operation_depth_bucket{_labels({**series, "le": "+Inf"})} '
+                     f'{snapshot["count"]}')
+        lines.append(f'{prefix}_operation_depth_sum{_labels(series)} '
+                     f'{sum(value * count for value, count in snapshot["counts"].items())}')
+        lines.append(f'{prefix}_operation_depth_count{_labels(series)} {snapshot["count"]}')
+    lines += [f'# HELP {prefix}_sampled_resizes_total Sampled HashMap operations '
+              f'that started a resize.',
+              f'# TYPE {prefix}_sampled_resizes_total counter']
+    for operation in SAMPLED_OPERATIONS:
+        lines.append(f'{prefix}_sampled_resizes_total{_labels({**labels, "operation": operation})} '
+                     f'{sampler.resizes[operation]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nlatency histogram")
+    print("-----------------")
+    h = LatencyHistogram()
+    for value in (90, 1_000, 1_500, 2_000, 40_000, 3_000_000):
+        h.record(value)
+    print(h.snapshot(), h.count_below(2048))
+
+    print("\nsampler and exporters")
+    print("---------------------")
+    s = Sampler(every=1, hooks=[print])
+    s.record('put', 1200, 1, False)
+    s.record('put', 850_000, 2, True)
+    s.record('get', 700, 1, False)
+    print(s.snapshot()['put'])
+    print(prometheus_text(s, labels={'map': 'demo'}).splitlines()[-3])
@@ -0,0 +1,324 @@
+# Course: CS261 - Data Structures
+# Description:HashMap partitioned across worker processes. Python threads cannot hash
+# keys on more than one core at a time, so ShardedMap starts one process per shard;
+# each owns an engine instance (hash_map_sc by default) holding the keys routed to it,
+# and the router object in the calling process speaks the usual put / get / remove API.
+#
+# Keys go to shard mix64(hash(key)) % shards, so the hash function must give the same
+# code in every process ('builtin' does not for strings). Every single-key call is one
+# round trip through a pipe; the bulk calls (put_many, get_many, remove_many) split a
+# batch by shard, send every shard its part before waiting for any reply, so the shards
+# work on a batch in parallel and the IPC cost is paid once per shard per batch.
+#
+# Read-mostly data that every process needs belongs in a FrozenTable (frozen_table.py)
+# instead, which any process reads from shared memory without IPC.
+
+import importlib
+import multiprocessing
+
+from a6_include import DynamicArray
+from hash_functions import get_hash_function, mix64
+
+# operations a shard serves; each maps to the engine method of the same name
+SHARD_OPERATIONS = frozenset((
+    'put', 'get', 'remove', 'contains_key', 'get_size',
+    'put_many', 'get_many', 'remove_many', 'clear', 'items',
+))
+
+
+def _serve(connection, engine: str, function) -> None:
+    """
+    Main loop of a shard process: runs requests until it receives None.
+    Exceptions raised by the engine are sent back to be raised by the router.
+
+    :param connection: The shard's end of the pipe.
+    :param engine: Name of the engine module, e.g. 'hash_map_sc'.
+    :param function: The hash function, or its registered name.
+    :return: None
+    """
+    m = importlib.import_module(engine).HashMap(11, function)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        operation, args = request
+        try:
+            if operation == 'items':
+                pairs = m.get_keys_and_values()
+                result = [pairs[i] for i in range(pairs.length())]
+            else:
+                result = getattr(m, operation)(*args)
+        except Exception as error:
+            connection.send((False, error))
+        else:
+            connection.send((True, result))
+    connection.close()
+
+
+class ShardedMap:
+    def __init__(self, shards: int = 2, engine: str = 'hash_map_sc',
+                 function='fnv1a', start_method: str = None) -> None:
+        """
+        Starts one worker process per shard
+
+        :param shards: The number of shard processes.
+        :param engine: Name of the engine module each shard uses.
+        :param function: The hash function applied to keys, or a registered name;
+            it is sent to the shards, so it must be picklable.
+        :param start_method: The multiprocessing start method, or None for the default.
+        """
+        if shards < 1:
+            raise ValueError("a ShardedMap needs at least one shard")
+        if function == 'builtin' or function is get_hash_function('builtin'):
+            raise ValueError("builtin hashes differ between processes; use 'fnv1a' or 'siphash'")
+        self._hash_function = get_hash_function(function)
+        context = multiprocessing.get_context(start_method)
+        self._connections = []
+        self._processes = []
+        for _ in range(shards):
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, engine, function), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def get_shard_count(self) -> int:
+        """
+        Return the number of shards
+        """
+        return len(self._connections)
+
+    def shard_of(self, key: str) -> int:
+        """
+        Returns the shard a key is stored in.
+
+        :param key: The key.
+        :return: The index of the shard.
+        """
+        return mix64(self._hash_function(key)) % len(self._connections)
+
+    # ------------------------------------------------------------------ #
+
+    @staticmethod
+    def _receive(connection) -> object:
+        """
+        Waits for the reply to one request.
+
+        :param connection: The router's end of a shard pipe.
+        :return: The result of the request; an exception raised by the shard is re-raised.
+        """
+        ok, result = connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def _call(self, shard: int, operation: str, *args) -> object:
+        """
+        Runs one operation on one shard and waits for its result.
+
+        :param shard: The index of the shard.
+        :param operation: One of SHARD_OPERATIONS.
+        :param args: The arguments of the operation.
+        :return: The result of the operation.
+        """
+        connection = self._connections[shard]
+        connection.send((operation, args))
+        return self._receive(connection)
+
+    def _broadcast(self, operation: str, requests: dict = None) -> dict:
+        """
+        Sends an operation to several shards, then collects their results, so
+        that the shards run it in parallel.
+
+        :param operation: One of SHARD_OPERATIONS.
+        :param requests: Maps shard index to argument tuple; None sends the
+            operation without arguments to every shard.
+        :return: Dictionary mapping shard index to result.
+        """
+        if requests is None:
+            requests = dict.fromkeys(range(len(self._connections)), ())
+        for shard, args in requests.items():
+            self._connections[shard].send((operation, args))
+        # read every reply, even after an error, so that no reply is left in a pipe
+        results, error = {}, None
+        for shard in requests:
+            try:
+                results[shard] = self._receive(self._connections[shard])
+            except Exception as raised:
+                error = error or raised
+        if error is not None:
+            raise error
+        return results
+
+    def _split(self, keys) -> dict:
+        """
+        Groups a batch of keys by shard.
+
+        :param keys: Sequence of keys.
+        :return: Dictionary mapping shard to the positions of its keys.
+        """
+        shard_of = self.shard_of
+        positions = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(shard_of(key), []).append(i)
+        return positions
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        self._call(self.shard_of(key), 'put', key, value)
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        return self._call(self.shard_of(key), 'get', key)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._call(self.shard_of(key), 'contains_key', key)
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._call(self.shard_of(key), 'remove', key)
+
+    def put_many(self, keys, values) -> None:
+        """
+        Inserts or updates a batch of pairs, one message per shard.
+
+        :param keys: Sequence of keys.
+        :param values: Sequence of values, aligned with keys.
+        :return: None
+        """
+        keys, values = list(keys), list(values)
+        if len(keys) != len(values):
+            raise ValueError("keys and values must have the same length")
+        positions = self._split(keys)
+        self._broadcast('put_many', {
+            shard: ([keys[i] for i in indices], [values[i] for i in indices])
+            for shard, indices in positions.items()
+        })
+
+    def _gather(self, operation: str, keys) -> list:
+        """
+        Runs a bulk lookup on every shard and restores the order of the keys.
+
+        :param operation: 'get_many' or 'remove_many'.
+        :param keys: Sequence of keys.
+        :return: List of results, in the order of keys.
+        """
+        keys = list(keys)
+        positions = self._split(keys)
+        results = self._broadcast(operation, {
+            shard: ([keys[i] for i in indices],) for shard, indices in positions.items()
+        })
+        out = [None] * len(keys)
+        for shard, indices in positions.items():
+            for i, result in zip(indices, results[shard]):
+                out[i] = result
+        return out
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of a batch of keys, one message per shard.
+
+        :param keys: Sequence of keys.
+        :return: List of values (None for missing keys), in the order of keys.
+        """
+        return self._gather('get_many', keys)
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes a batch of keys, one message per shard.
+
+        :param keys: Sequence of keys.
+        :return: List of booleans, True where a key was removed.
+        """
+        return self._gather('remove_many', keys)
+
+    def get_size(self) -> int:
+        """
+        Return the number of pairs across all shards
+        """
+        return sum(self._broadcast('get_size').values())
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values from every shard.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        pairs = self._broadcast('items')
+        return DynamicArray([pair for shard in sorted(pairs) for pair in pairs[shard]])
+
+    def items(self):
+        """
+        Iterate over the (key, value) pairs, fetching one shard at a time
+        """
+        for shard in range(len(self._connections)):
+            yield from self._call(shard, 'items')
+
+    def clear(self) -> None:
+        """
+        Clears every shard.
+
+        :return: None
+        """
+        self._broadcast('clear')
+
+    def close(self) -> None:
+        """
+        Stops the shard processes; their data is lost.
+
+        :return: None
+        """
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._connections, self._processes = [], []
+
+    def __enter__(self) -> "ShardedMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nfour shards")
+    print("-----------")
+    with ShardedMap(4) as m:
+        m.put_many(['key' + str(i) for i in range(1000)], range(1000))
+        m.put('key1', 'one')
+        m.remove('key2')
+        print(m.get_size(), m.get('key1'), m.get('key2'), m.get_many(['key3', 'key999', 'x']))
+        print([sum(1 for key in ('key' + str(i) for i in range(1000)) if m.shard_of(key) == s)
+               for s in range(4)])
@@ -0,0 +1,323 @@
+# Course: CS261 - Data Structures
+# Description:Compact binary snapshot format used by HashMap.save() / HashMap.load() in
+# hash_map_sc and hash_map_oa. Pickling a map serializes every DynamicArray, node and
+# entry object; a snapshot stores only the pairs and their cached hash codes, so a
+# load can pre-size the table and insert every pair without calling the hash function.
+#
+# File layout (little-endian):
+#
+#   header  magic, pair count (COUNT_UNKNOWN if the writer could not tell),
+#           capacity policy, hash function name (empty if it is not registered)
+#   blocks  pair count u32, payload length u32, CRC-32 of the payload u32, payload;
+#           a payload holds up to BLOCK_PAIRS pairs, each as
+#           hash u64, key length u32, value length u32, value type u8, UTF-8 key, value
+#   end     an empty block (0, 0, 0)
+#
+# Values of type str, bytes and int are stored as themselves; anything else is
+# pickled. Blocks are written as soon as they fill up, so a snapshot of any size is
+# streamed with one block in memory, and a damaged block is reported instead of
+# being loaded.
+
+import os
+import pickle
+import struct
+import zlib
+
+from hash_functions import HASH_FUNCTIONS, MASK_64, get_hash_function, persistent_name
+
+MAGIC = b'KVSNAP\x00\x01'
+HEADER = struct.Struct('<8sQ16s32s')
+BLOCK = struct.Struct('<III')
+PAIR = struct.Struct('<QIIB')
+INT64 = struct.Struct('<q')
+
+# pairs per block
+BLOCK_PAIRS = 4096
+
+COUNT_UNKNOWN = 0xFFFFFFFFFFFFFFFF
+
+# value types
+VALUE_PICKLE = 0
+VALUE_STR = 1
+VALUE_BYTES = 2
+VALUE_INT = 3
+
+
+def stored_function_name(function) -> str:
+    """
+    Returns the name to record for a hash function, see hash_functions.persistent_name;
+    '' for a function whose hash codes cannot be reused, so that load() re-hashes.
+
+    :param function: A hash function.
+    :return: The registered name, or ''.
+    """
+    try:
+        return persistent_name(function)
+    except ValueError:
+        return ''
+
+
+def _encode_value(value: object) -> tuple[int, bytes]:
+    """
+    Serializes one value.
+
+    :param value: The value.
+    :return: Tuple of (value type, bytes).
+    """
+    kind = type(value)
+    if kind is str:
+        return VALUE_STR, value.encode('utf-8')
+    if kind is bytes:
+        return VALUE_BYTES, value
+    if kind is int and -2 ** 63 <= value < 2 ** 63:
+        return VALUE_INT, INT64.pack(value)
+    return VALUE_PICKLE, pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_value(kind: int, data: bytes) -> object:
+    """
+    Deserializes one value.
+
+    :param kind: The value type.
+    :param data: The serialized value.
+    :return: The value.
+    """
+    if kind == VALUE_STR:
+        return data.decode('utf-8')
+    if kind == VALUE_BYTES:
+        return data
+    if kind == VALUE_INT:
+        return INT64.unpack(data)[0]
+    return pickle.loads(data)
+
+
+class SnapshotWriter:
+    def __init__(self, file, function_name: str = '', capacity_policy: str = 'prime',
+                 count: int = None) -> None:
+        """
+        Starts a snapshot. A path is written to a temporary file that replaces
+        it on close(), so an interrupted save never clobbers the previous snapshot
+
+        :param file: A path, or a binary file object opened for writing.
+        :param function_name: The registered name of the hash function that produced
+            the hash codes, or '' to make load() re-hash every key.
+        :param capacity_policy: The capacity policy of the saved map.
+        :param count: The number of pairs, if known. Otherwise it is filled in
+            by close() when the file is seekable.
+        """
+        self._path = None
+        if isinstance(file, (str, os.PathLike)):
+            self._path = os.fspath(file)
+            file = open(self._path + '.tmp', 'wb')
+        self._file = file
+        self._start = file.tell() if file.seekable() else None
+        self._function_name = function_name
+        self._capacity_policy = capacity_policy
+        self._count = 0
+        self._write_header(COUNT_UNKNOWN if count is None else count)
+        self._parts = []
+        self._pending = 0
+
+    def _write_header(self, count: int) -> None:
+        """
+        Writes the header at the current position.
+
+        :param count: The pair count to record.
+        :return: None
+        """
+        self._file.write(HEADER.pack(MAGIC, count, self._capacity_policy.encode('ascii'),
+                                     self._function_name.encode('ascii')))
+
+    def write(self, key: str, value: object, hashcode: int = 0) -> None:
+        """
+        Adds one pair, writing out the current block once it is full.
+
+        :param key: The key.
+        :param value: The value.
+        :param hashcode: The cached hash code of the key; ignored on load when
+            the snapshot has no hash function name.
+        :return: None
+        """
+        key_bytes = key.encode('utf-8')
+        kind, value_bytes = _encode_value(value)
+        self._parts.append(PAIR.pack(hashcode & MASK_64, len(key_bytes), len(value_bytes), kind))
+        self._parts.append(key_bytes)
+        self._parts.append(value_bytes)
+        self._pending += 1
+        if self._pending == BLOCK_PAIRS:
+            self._flush_block()
+
+    def _flush_block(self) -> None:
+        """
+        Writes the pending pairs as one checksummed block.
+
+        :return: None
+        """
+        payload = b''.join(self._parts)
+        self._file.write(BLOCK.pack(self._pending, len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._count += self._pending
+        self._parts = []
+        self._pending = 0
+
+    def close(self) -> None:
+        """
+        Writes the last block and the end marker, records the pair count when the
+        file is seekable and, for a path, renames the finished file into place.
+
+        :return: None
+        """
+        if self._file is None:
+            return
+        if self._pending:
+            self._flush_block()
+        self._file.write(BLOCK.pack(0, 0, 0))
+        if self._start is not None:
+            end = self._file.tell()
+            self._file.seek(self._start)
+            self._write_header(self._count)
+            self._file.seek(end)
+        self._file.flush()
+        if self._path is not None:
+            os.fsync(self._file.fileno())
+            self._file.close()
+            os.replace(self._path + '.tmp', self._path)
+        self._file = None
+
+    def abort(self) -> None:
+        """
+        Abandons a snapshot being written to a path; the previous file is kept.
+
+        :return: None
+        """
+        if self._path is not None and self._file is not None:
+            self._file.close()
+            os.remove(self._path + '.tmp')
+        self._file = None
+
+    def __enter__(self) -> "SnapshotWriter":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class SnapshotReader:
+    def __init__(self, file) -> None:
+        """
+        Opens a snapshot and reads its header
+
+        :param file: A path, or a binary file object positioned at the snapshot.
+        """
+        self._owned = isinstance(file, (str, os.PathLike))
+        self._file = open(file, 'rb') if self._owned else file
+        header = self._file.read(HEADER.size)
+        if len(header) < HEADER.size or header[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError("not a HashMap snapshot")
+        _, count, policy, function = HEADER.unpack(header)
+        self.count = None if count == COUNT_UNKNOWN else count
+        self.capacity_policy = policy.rstrip(b'\0').decode('ascii')
+        self.function_name = function.rstrip(b'\0').decode('ascii')
+
+    def resolve(self, function=None, capacity_policy: str = None) -> tuple:
+        """
+        Picks the hash function and capacity policy of the map being loaded, and
+        whether the stored hash codes are valid for them: they are when the function
+        is the one named in the snapshot and both policies mix hashes alike
+        (only 'pow2' does).
+
+        :param function: The hash function to load with, or None for the stored one.
+        :param capacity_policy: The capacity policy to load with, or None for the stored one.
+        :return: Tuple of (function, capacity policy, True if hashes can be reused).
+        """
+        stored = HASH_FUNCTIONS.get(self.function_name) if self.function_name else None
+        if function is None:
+            if stored is None:
+                raise ValueError("the snapshot does not name its hash function; pass one to load()")
+            function = stored
+        function = get_hash_function(function)
+        policy = capacity_policy or self.capacity_policy
+        reuse = function is stored and (policy == 'pow2') == (self.capacity_policy == 'pow2')
+        return function, policy, reuse
+
+    def blocks(self):
+        """
+        Reads the blocks in order, verifying their checksums.
+
+        :return: Generator of (keys, values, hashes) lists, one triple per block.
+        """
+        number = 0
+        while True:
+            header = self._file.read(BLOCK.size)
+            if len(header) < BLOCK.size:
+                raise ValueError(f"snapshot is truncated before block {number}")
+            pairs, length, checksum = BLOCK.unpack(header)
+            if pairs == 0:
+                return
+            payload = self._file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                raise ValueError(f"snapshot block {number} is truncated or corrupt")
+            keys, values, hashes = [], [], []
+            position = 0
+            for _ in range(pairs):
+                hashcode, key_length, value_length, kind = PAIR.unpack_from(payload, position)
+                position += PAIR.size
+                keys.append(payload[position:position + key_length].decode('utf-8'))
+                position += key_length
+                values.append(_decode_value(kind, payload[position:position + value_length]))
+                position += value_length
+                hashes.append(hashcode)
+            yield keys, values, hashes
+            number += 1
+
+    def close(self) -> None:
+        """
+        Closes the file if the reader opened it.
+
+        :return: None
+        """
+        if self._owned:
+            self._file.close()
+
+    def __enter__(self) -> "SnapshotReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    import io
+
+    from hash_functions import fnv1a
+
+    print("\nstreamed snapshot")
+    print("-----------------")
+    buffer = io.BytesIO()
+    with SnapshotWriter(buffer, 'fnv1a') as writer:
+        for i in range(10000):
+            key = 'key' + str(i)
+            writer.write(key, [i, 'value', i * 0.5][i % 3], fnv1a(key))
+    buffer.seek(0)
+    with SnapshotReader(buffer) as reader:
+        sizes = [len(keys) for keys, _, _ in reader.blocks()]
+        print(reader.count, reader.function_name, sizes, len(buffer.getvalue()), "bytes")
+
+    print("\ncorrupt block")
+    print("-------------")
+    data = bytearray(buffer.getvalue())
+    data[HEADER.size + BLOCK.size + 100] ^= 1
+    try:
+        with SnapshotReader(io.BytesIO(bytes(data))) as reader:
+            for _ in reader.blocks():
+                pass
+    except ValueError as error:
+        print(error)
@@ -0,0 +1,583 @@
+# Course: CS261 - Data Structures
+# Description:Optional durability for any engine. DurableMap wraps an engine instance
+# and appends every put, remove and clear to a binary write-ahead log before applying
+# it; opening a DurableMap on an existing log replays it into a fresh engine.
+#
+# Log format: an 8-byte magic, then one record per change:
+#
+#   payload length u32, CRC-32 of the payload u32, payload
+#   payload = operation u8, key length u32, UTF-8 key, pickled value
+#
+# A crash can leave the tail of the log torn: a record half written, a multi-record
+# write (put_many, group commit) cut off partway, or a zero-filled tail. Replay stops
+# at the first record that is incomplete, fails its checksum or does not decode,
+# truncates the log there and reports the discarded bytes, so the map comes back with
+# every change whose record was complete. If a complete, valid record follows such a
+# record, the log is not torn but damaged; replay raises ValueError then and leaves
+# the file as it is, since truncating would throw away the later changes.
+#
+# fsync policies (the `sync` argument):
+#
+#   'always'    put() returns once its record is on disk. Concurrent writers share
+#               fsync calls (group commit): one thread syncs every record written
+#               so far while the others wait for it, and put_many / remove_many
+#               sync a whole batch once.
+#   'interval'  records are handed to the OS at once and a background thread syncs
+#               every `interval_ms`; an OS crash or power loss can lose the changes
+#               of the last interval, a crash of the process alone loses nothing.
+#   'os'        records are handed to the OS, which decides when to write them.
+#
+# compact() rewrites the log as one put per live pair, so the log stays proportional
+# to the map instead of its history.
+#
+# DurableMap serializes its writes, so several threads may write through it; reads go
+# straight to the engine, so reading while other threads write needs an engine that
+# is safe for that.
+
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1
+
+MAGIC = b'KVWAL\x00\x00\x01'
+RECORD_HEADER = struct.Struct('<II')
+KEY_LENGTH = struct.Struct('<BI')
+
+# operations stored in a record
+PUT = 1
+REMOVE = 2
+CLEAR = 3
+
+SYNC_POLICIES = ('always', 'interval', 'os')
+
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _sync_directory(path: str) -> None:
+    """
+    Forces the directory entry of a file to disk, after creating or renaming it.
+
+    :param path: The file.
+    :return: None
+    """
+    directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(directory)
+    finally:
+        os.close(directory)
+
+
+def encode_record(operation: int, key: str = '', value: object = None) -> bytes:
+    """
+    Serializes one change.
+
+    :param operation: PUT, REMOVE or CLEAR.
+    :param key: The key changed; unused by CLEAR.
+    :param value: The value stored by PUT.
+    :return: The record, header included.
+    """
+    key_bytes = key.encode('utf-8')
+    payload = KEY_LENGTH.pack(operation, len(key_bytes)) + key_bytes
+    if operation == PUT:
+        payload += pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_record(data: bytes, offset: int):
+    """
+    Decodes the record at an offset of a log.
+
+    :param data: The contents of the log.
+    :param offset: Where the record starts.
+    :return: ((operation, key, value), offset just past the record), or None if
+        the record is incomplete, fails its checksum or does not decode.
+    """
+    if offset + RECORD_HEADER.size > len(data):
+        return None
+    length, checksum = RECORD_HEADER.unpack_from(data, offset)
+    start = offset + RECORD_HEADER.size
+    payload = data[start:start + length]
+    # a zero-filled tail reads as empty records, whose CRC-32 is 0 as well
+    if len(payload) < length or length < KEY_LENGTH.size or zlib.crc32(payload) != checksum:
+        return None
+    operation, key_length = KEY_LENGTH.unpack_from(payload)
+    key_end = KEY_LENGTH.size + key_length
+    if operation not in (PUT, REMOVE, CLEAR) or key_end > length or \
+            (operation != PUT and key_end != length):
+        return None
+    try:
+        key = payload[KEY_LENGTH.size:key_end].decode('utf-8')
+        value = pickle.loads(payload[key_end:]) if operation == PUT else None
+    except Exception:
+        # unpickling fails with many exception types, all meaning the same here
+        return None
+    return (operation, key, value), start + length
+
+
+def _valid_record_after(data: bytes, offset: int) -> bool:
+    """
+    Tells whether a valid record follows a bad one, skipping further bad records
+    by the lengths in their headers.
+
+    :param data: The contents of the log.
+    :param offset: Where the bad record starts.
+    :return: True if a complete record that passes its checksum and decodes follows.
+    """
+    while offset + RECORD_HEADER.size <= len(data):
+        length = RECORD_HEADER.unpack_from(data, offset)[0]
+        offset += RECORD_HEADER.size + length
+        if _decode_record(data, offset) is not None:
+            return True
+    return False
+
+
+def read_records(path: str):
+    """
+    Reads the complete records of a log, stopping at a torn tail: the first record
+    that is incomplete, fails its checksum or does not decode, when no valid record
+    follows it.
+
+    :param path: The log file.
+    :return: Generator of (operation, key, value) tuples; its return value
+        (StopIteration.value) is the offset just past the last complete record.
+    :raises ValueError: If a valid record follows a bad one.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    if data[:len(MAGIC)] != MAGIC:
+        if len(data) < len(MAGIC) and MAGIC.startswith(data):
+            # the log was created but its magic never fully reached the disk
+            return 0
+        raise ValueError(f"{path} is not a write-ahead log")
+    offset = len(MAGIC)
+    while offset < len(data):
+        decoded = _decode_record(data, offset)
+        if decoded is None:
+            if _valid_record_after(data, offset):
+                raise ValueError(f"{path} has a corrupt record at offset {offset} "
+                                 f"followed by valid records")
+            break
+        record, offset = decoded
+        yield record
+    return offset
+
+
+class WriteAheadLog:
+    def __init__(self, path: str, sync: str = 'always', interval_ms: float = 10) -> None:
+        """
+        Opens a log for appending, creating it if needed
+
+        :param path: The log file.
+        :param sync: One of SYNC_POLICIES.
+        :param interval_ms: Time between background syncs under the 'interval' policy.
+        """
+        if sync not in SYNC_POLICIES:
+            raise ValueError(f"unknown sync policy {sync!r}, "
+                             f"expected one of {', '.join(SYNC_POLICIES)}")
+        self._path = path
+        self._sync = sync
+        self._file = open(path, 'ab', buffering=0)
+        if self._file.tell() == 0:
+            self._write(MAGIC)
+            self._sync_file()
+            _sync_directory(path)
+        # records are numbered in append order; _synced is the last one known on disk
+        self._write_lock = threading.Lock()
+        self._sync_condition = threading.Condition()
+        self._appended = 0
+        self._synced = 0
+        self._syncing = False
+        self._closed = False
+        self._syncer = None
+        if sync == 'interval':
+            self._syncer = threading.Thread(target=self._sync_every, args=(interval_ms / 1000,),
+                                            name='wal-sync', daemon=True)
+            self._syncer.start()
+
+    def _write(self, data: bytes) -> None:
+        """
+        Hands bytes to the OS, retrying short writes.
+
+        :param data: The bytes to append.
+        :return: None
+        """
+        view = memoryview(data)
+        while view:
+            view = view[self._file.write(view):]
+
+    def _sync_file(self) -> None:
+        """
+        Forces the appended bytes of the log file to disk.
+
+        :return: None
+        """
+        _fdatasync(self._file.fileno())
+
+    def append(self, records: bytes, count: int = 1) -> int:
+        """
+        Appends encoded records without waiting for the disk. Callers that need
+        the records to be durable under the 'always' policy call wait() next.
+
+        :param records: One or more encoded records.
+        :param count: The number of records in records.
+        :return: The sequence number of the last record appended.
+        """
+        with self._write_lock:
+            if self._closed:
+                raise ValueError("write to a closed write-ahead log")
+            self._write(records)
+            self._appended += count
+            return self._appended
+
+    def wait(self, sequence: int) -> None:
+        """
+        Returns once the record with the given sequence number is on disk under the
+        'always' policy; returns at once under the others. The first waiting thread
+        syncs every record appended so far, the others wait for it (group commit).
+
+        :param sequence: A sequence number returned by append().
+        :return: None
+        """
+        if self._sync == 'always':
+            self._sync_through(sequence)
+
+    def _sync_through(self, sequence: int) -> None:
+        """
+        Syncs until the record with the given sequence number is on disk.
+
+        :param sequence: A sequence number returned by append().
+        :return: None
+        """
+        with self._sync_condition:
+            while self._synced < sequence:
+                if self._syncing:
+                    self._sync_condition.wait()
+                    continue
+                self._syncing = True
+                target = self._appended
+                self._sync_condition.release()
+                synced = False
+                try:
+                    self._sync_file()
+                    synced = True
+                finally:
+                    self._sync_condition.acquire()
+                    if synced:
+                        self._synced = max(self._synced, target)
+                    self._syncing = False
+                    self._sync_condition.notify_all()
+
+    def _sync_every(self, interval: float) -> None:
+        """
+        Background loop of the 'interval' policy.
+
+        :param interval: Seconds between syncs.
+        :return: None
+        """
+        while not self._closed:
+            time.sleep(interval)
+            if self._synced < self._appended and not self._closed:
+                self._sync_through(self._appended)
+
+    def sync(self) -> None:
+        """
+        Forces every appended record to disk, whatever the policy.
+
+        :return: None
+        """
+        self._sync_through(self._appended)
+
+    def close(self) -> None:
+        """
+        Syncs and closes the log.
+
+        :return: None
+        """
+        if self._closed:
+            return
+        self.sync()
+        with self._write_lock:
+            self._closed = True
+        if self._syncer is not None:
+            self._syncer.join()
+        self._file.close()
+
+
+class DurableMap:
+    def __init__(self, path: str, engine=hash_map_sc.HashMap, function=hash_function_1,
+                 sync: str = 'always', interval_ms: float = 10) -> None:
+        """
+        Opens a durable map, replaying the log at path if it exists
+
+        :param path: The log file.
+        :param engine: The engine class, constructed as engine(11, function).
+        :param function: The hash function applied to keys, or a registered name.
+        :param sync: One of SYNC_POLICIES.
+        :param interval_ms: Time between syncs under the 'interval' policy.
+        """
+        self._path = path
+        self._engine = engine
+        self._function = function
+        self._map = engine(11, function)
+        # bytes of a torn or corrupt tail cut off by replay
+        self._discarded = 0
+        if os.path.exists(path):
+            self._replay()
+        self._apply_lock = threading.Lock()
+        self._log = WriteAheadLog(path, sync, interval_ms)
+        self._sync = sync
+        self._interval_ms = interval_ms
+
+    def _replay(self) -> None:
+        """
+        Applies every complete record of the log, then truncates a torn tail.
+        The log is not modified if it is damaged before its last record.
+
+        :return: None
+        """
+        records = read_records(self._path)
+        m = self._map
+        while True:
+            try:
+                operation, key, value = next(records)
+            except StopIteration as stop:
+                end = stop.value
+                break
+            if operation == PUT:
+                m.put(key, value)
+            elif operation == REMOVE:
+                m.remove(key)
+            elif operation == CLEAR:
+                m.clear()
+        size = os.path.getsize(self._path)
+        if end < size:
+            self._discarded = size - end
+            os.truncate(self._path, end)
+
+    def get_discarded_bytes(self) -> int:
+        """
+        Return the size of the torn tail dropped when the log was replayed
+        """
+        return self._discarded
+
+    def get_map(self):
+        """
+        Return the wrapped engine instance; changes made to it directly are not logged
+        """
+        return self._map
+
+    def _commit(self, records: bytes, count: int, apply) -> None:
+        """
+        Logs records and applies the change under one lock, so that replay applies
+        changes in the order they were made, then waits for the policy's durability
+        outside of it, so that concurrent writers can share an fsync.
+
+        :param records: The encoded records.
+        :param count: The number of records.
+        :param apply: Applies the change to the map.
+        :return: None
+        """
+        with self._apply_lock:
+            sequence = self._log.append(records, count)
+            apply()
+        self._log.wait(sequence)
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Inserts or updates a key-value pair.
+
+        :param key: The key to insert or update.
+        :param value: The value associated with the key.
+        :return: None
+        """
+        self._commit(encode_record(PUT, key, value), 1, lambda: self._map.put(key, value))
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key-value pair associated with the given key.
+
+        :param key: The key to remove.
+        :return: None
+        """
+        self._commit(encode_record(REMOVE, key), 1, lambda: self._map.remove(key))
+
+    def clear(self) -> None:
+        """
+        Clears the map.
+
+        :return: None
+        """
+        self._commit(encode_record(CLEAR), 1, self._map.clear)
+
+    def put_many(self, keys, values) -> None:
+        """
+        Inserts or updates a batch of pairs, written and synced as one group.
+
+        :param keys: Sequence of keys.
+        :param values: Sequence of values, aligned with keys.
+        :return: None
+        """
+        keys, values = list(keys), list(values)
+        if len(keys) != len(values):
+            raise ValueError("keys and values must have the same length")
+        records = b''.join(encode_record(PUT, key, value) for key, value in zip(keys, values))
+        self._commit(records, len(keys), lambda: self._map.put_many(keys, values))
+
+    def remove_many(self, keys) -> list:
+        """
+        Removes a batch of keys, written and synced as one group.
+
+        :param keys: Sequence of keys.
+        :return: List of booleans, True where a key was removed.
+        """
+        keys = list(keys)
+        removed = []
+        records = b''.join(encode_record(REMOVE, key) for key in keys)
+        self._commit(records, len(keys), lambda: removed.extend(self._map.remove_many(keys)))
+        return removed
+
+    def get(self, key: str) -> object:
+        """
+        Retrieves the value associated with the given key.
+
+        :param key: The key to search for.
+        :return: The value associated with the key, or None if not found.
+        """
+        return self._map.get(key)
+
+    def get_many(self, keys) -> list:
+        """
+        Retrieves the values of a batch of keys.
+
+        :param keys: Sequence of keys.
+        :return: List of values (None for missing keys), in the order of keys.
+        """
+        return self._map.get_many(keys)
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Checks if the map contains the given key.
+
+        :param key: The key to check for.
+        :return: True if the key is present, False otherwise.
+        """
+        return self._map.contains_key(key)
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._map.get_size()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples of keys and values in the map.
+
+        :return: DynamicArray of (key, value) tuples.
+        """
+        return self._map.get_keys_and_values()
+
+    def compact(self) -> None:
+        """
+        Replaces the log with one put per live pair. The new log is written and
+        synced next to the old one, then renamed over it, so a crash at any point
+        leaves one complete log.
+
+        :return: None
+        """
+        with self._apply_lock:
+            self._log.close()
+            pairs = self._map.get_keys_and_values()
+            temporary = self._path + '.compact'
+            with open(temporary, 'wb') as file:
+                file.write(MAGIC)
+                for i in range(pairs.length()):
+                    key, value = pairs[i]
+                    file.write(encode_record(PUT, key, value))
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary, self._path)
+            _sync_directory(self._path)
+            self._log = WriteAheadLog(self._path, self._sync, self._interval_ms)
+
+    def sync(self) -> None:
+        """
+        Forces every logged change to disk, whatever the policy.
+
+        :return: None
+        """
+        self._log.sync()
+
+    def close(self) -> None:
+        """
+        Syncs and closes the log; the map stays readable.
+
+        :return: None
+        """
+        self._log.close()
+
+    def __enter__(self) -> "DurableMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    import tempfile
+
+    print("\nreplay after a torn write")
+    print("-------------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.wal')
+        with DurableMap(path) as m:
+            for i in range(10):
+                m.put('key' + str(i), i)
+            m.remove('key3')
+        with open(path, 'ab') as log:
+            # a record cut short by a crash
+            log.write(encode_record(PUT, 'key99', 99)[:-3])
+        m = DurableMap(path)
+        print(m.get_size(), m.get('key9'), m.get('key3'), m.get('key99'),
+              "discarded", m.get_discarded_bytes())
+        m.close()
+
+    print("\nreplay after torn and damaged tails")
+    print("-----------------------------------")
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'map.wal')
+        with DurableMap(path) as m:
+            for i in range(5):
+                m.put('key' + str(i), i)
+        with open(path, 'rb') as log:
+            intact = log.read()
+        first, second = encode_record(PUT, 'key10', 10), encode_record(PUT, 'key11', 11)
+        damaged = first[:-1] + bytes([first[-1] ^ 0xFF])
+        tails = {
+            'zeros 8': bytes(8),
+            'zeros 20': bytes(20),
+            # a two-record write torn partway: the first record garbled, the second cut off
+            'torn batch': damaged + second[:-4],
+            # damage in the middle of a log: the next record is complete and valid
+            'damaged': damaged + second,
+        }
+        for name, tail in tails.items():
+            with open(path, 'wb') as log:
+                log.write(intact + tail)
+            try:
+                m = DurableMap(path)
+            except ValueError:
+                print(f"{name:<12}ValueError, file kept:", os.path.getsize(path) == len(intact + tail))
+                continue
+            print(f"{name:<12}size", m.get_size(), "discarded", m.get_discarded_bytes(),
+                  "truncated:", os.path.getsize(path) == len(intact))
+            m.close()